@@ -0,0 +1,38 @@
+"""
+Best-effort on-disk pickle cache shared by the screening scripts
+Entries live under .cache/<group>/.../<name>.pkl and expire by file mtime
+"""
+
+import os
+import pickle
+import time
+
+CACHE_DIR = '.cache'
+
+
+def cache_path(*parts: str) -> str:
+    """Build a path inside the on-disk cache directory"""
+    return os.path.join(CACHE_DIR, *parts[:-1], f'{parts[-1]}.pkl')
+
+
+def cache_load(path: str, ttl: float):
+    """Return the cached object at path, or None if missing or older than ttl seconds"""
+    try:
+        if time.time() - os.path.getmtime(path) > ttl:
+            return None
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.PickleError):
+        return None
+
+
+def cache_store(path: str, obj) -> None:
+    """Atomically write obj to the on-disk cache"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # Caching is best-effort
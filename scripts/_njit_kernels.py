@@ -0,0 +1,210 @@
+"""
+Numba-compiled numeric kernels for the screening scripts
+Falls back to plain Python when numba is not installed
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit so kernels still run without numba"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+# fastmath minus the no-NaN/no-Inf flags: the kernels skip NaN gaps with
+# isfinite checks, which 'nnan'/'ninf' would let LLVM optimize away
+FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+
+@njit(cache=True, fastmath=FASTMATH, error_model='numpy')
+def compute_annualized_vol(closes, window=20, min_returns=5, periods_per_year=252.0):
+    """
+    Annualized volatility (%) of the last `window` finite log returns
+
+    Single pass over the tail of the close array accumulating sum and
+    sum of squares. `periods_per_year` is how many of these returns fit in
+    a year - 252 for gap-free daily bars. Returns -1.0 when fewer than
+    `min_returns` usable returns are available.
+    """
+    s = 0.0
+    s2 = 0.0
+    k = 0
+    i = closes.size - 1
+    while i >= 1 and k < window:
+        r = np.log(closes[i] / closes[i - 1])
+        if np.isfinite(r):
+            s += r
+            s2 += r * r
+            k += 1
+        i -= 1
+
+    if k < min_returns:
+        return -1.0
+
+    mean = s / k
+    var = (s2 - k * mean * mean) / (k - 1)
+    return np.sqrt(max(var, 0.0)) * np.sqrt(periods_per_year) * 100.0
+
+
+@njit(cache=True, fastmath=FASTMATH, error_model='numpy', parallel=True)
+def screen_kernel(closes, volumes, last_price, min_price, max_price,
+                  min_volume, min_volatility, window=20, min_returns=5,
+                  volume_window=63):
+    """
+    Fused volatility / volume / threshold screen over a (days x tickers) panel
+
+    Per ticker column: averages the last `volume_window` volumes and checks the
+    price/volume thresholds first; only columns that pass go on to the
+    return pass (finite log-return count plus a Welford mean/variance over
+    the last `window` return rows). Columns run in parallel under numba.
+    Returns (volatility %, average volume, keep mask); NaN where undefined
+    or not computed.
+    """
+    n_days, n = closes.shape
+    volatility = np.full(n, np.nan)
+    avg_volume = np.full(n, np.nan)
+    keep = np.zeros(n, dtype=np.bool_)
+    start = max(1, n_days - window)
+
+    for j in prange(n):
+        v_sum = 0.0
+        v_k = 0
+        for i in range(n_days - min(volume_window, n_days), n_days):
+            v = volumes[i, j]
+            if np.isfinite(v):
+                v_sum += v
+                v_k += 1
+        if v_k > 0:
+            avg_volume[j] = v_sum / v_k
+
+        # Cheap checks first - most of the market fails on price or liquidity
+        if not (last_price[j] >= min_price and last_price[j] <= max_price and
+                avg_volume[j] >= min_volume):
+            continue
+
+        n_returns = 0
+        k = 0
+        mean = 0.0
+        m2 = 0.0
+        for i in range(1, n_days):
+            r = np.log(closes[i, j] / closes[i - 1, j])
+            if np.isfinite(r):
+                n_returns += 1
+                if i >= start:
+                    k += 1
+                    d = r - mean
+                    mean += d / k
+                    m2 += d * (r - mean)
+
+        if k >= 2:
+            volatility[j] = np.sqrt(m2 / (k - 1)) * np.sqrt(252.0) * 100.0
+            keep[j] = n_returns >= min_returns and volatility[j] >= min_volatility
+
+    return volatility, avg_volume, keep
+
+
+@njit(cache=True, fastmath=FASTMATH, error_model='numpy')
+def _tail_stds(r, k, windows):
+    """
+    Sample std over several trailing windows of the first k values of r
+    
+    One reverse Welford pass grows the window back from the newest value and
+    reads off each std as its window fills, instead of a separate sweep per
+    window. Windows longer than k use all k values; NaN below 2 values.
+    """
+    out = np.full(len(windows), np.nan)
+    longest = 0
+    for j in range(len(windows)):
+        longest = max(longest, min(windows[j], k))
+    mean = 0.0
+    m2 = 0.0
+    for c in range(1, longest + 1):
+        x = r[k - c]
+        d = x - mean
+        mean += d / c
+        m2 += d * (x - mean)
+        if c >= 2:
+            for j in range(len(windows)):
+                if min(windows[j], k) == c:
+                    out[j] = np.sqrt(m2 / (c - 1))
+    return out
+
+
+@njit(cache=True, fastmath=FASTMATH, error_model='numpy')
+def compute_metrics_nb(open_, high, low, close, volume):
+    """
+    Per-ticker daily-bar metrics for the advanced volatility scanner
+    
+    Takes raw OHLCV arrays (oldest bar first; float32 prices, float64
+    volume - closes are widened to float64 before the log, so returns and
+    sums are float64) and returns
+    (daily_vol, weekly_vol, monthly_vol, quarterly_vol, annual_vol,
+    recent_vol, vol_30d, atr, day_change, day_range, ma_20, ma_50,
+    avg_vol_20). Volatilities are annualized % over the last 5/20/60
+    finite log returns, the full history, and the last 10/30 returns;
+    weekly/monthly/quarterly and ma_50 are NaN when the history is shorter
+    than their window. daily_vol is the last close-to-close move as a plain
+    percentage. ATR is the mean true range of the last 14 bars.
+    """
+    n = close.size
+    r = np.empty(max(n - 1, 0))
+    k = 0
+    # Widen each close before the log so float32 prices give float64 returns
+    prev = np.log(np.float64(close[0])) if n > 0 else 0.0
+    for i in range(1, n):
+        cur = np.log(np.float64(close[i]))
+        # Check the closes, not the log return: with 'afn' an isfinite test
+        # on log(NaN) is not reliable, so a gap would leak NaN into every window
+        if 0.0 < close[i] < np.inf and 0.0 < close[i - 1] < np.inf:
+            r[k] = cur - prev
+            k += 1
+        prev = cur
+    
+    scale = np.sqrt(252.0) * 100.0
+    daily_vol = abs(np.expm1(r[k - 1])) * 100.0 if k >= 1 else 0.0
+    stds = _tail_stds(r, k, (5, 20, 60, k, 10, 30)) * scale
+    weekly_vol = stds[0] if k >= 5 else np.nan
+    monthly_vol = stds[1] if k >= 20 else np.nan
+    quarterly_vol = stds[2] if k >= 60 else np.nan
+    annual_vol = stds[3]
+    recent_vol = stds[4]
+    vol_30d = stds[5]
+    
+    # Mean true range over the last 14 bars that have a previous close
+    m = min(14, n - 1)
+    tr_sum = 0.0
+    for i in range(n - m, n):
+        pc = close[i - 1]
+        tr = high[i] - low[i]
+        hc = abs(high[i] - pc)
+        lc = abs(low[i] - pc)
+        if hc > tr:
+            tr = hc
+        if lc > tr:
+            tr = lc
+        if np.isnan(high[i] + low[i] + pc):
+            tr = np.nan
+        tr_sum += tr
+    atr = tr_sum / m if m > 0 else np.nan
+    
+    day_change = (close[n - 1] - open_[n - 1]) / open_[n - 1] * 100.0
+    day_range = (high[n - 1] - low[n - 1]) / open_[n - 1] * 100.0
+    
+    ma_20 = close[n - min(20, n):].mean()
+    ma_50 = close[n - 50:].mean() if n >= 50 else np.nan
+    avg_vol_20 = volume[n - min(20, n):].mean()
+    
+    return (daily_vol, weekly_vol, monthly_vol, quarterly_vol, annual_vol,
+            recent_vol, vol_30d, atr, day_change, day_range, ma_20, ma_50,
+            avg_vol_20)
@@ -0,0 +1,143 @@
+"""
+Market data helpers shared by the volatile stock scanners
+Batched bar downloads, cached quote lookups and result files
+"""
+
+import os
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict
+
+import pandas as pd
+import yfinance as yf
+
+try:
+    from scripts._disk_cache import cache_path, cache_load, cache_store
+except ImportError:  # Run directly from the scripts directory
+    from _disk_cache import cache_path, cache_load, cache_store
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+try:
+    import pyarrow  # noqa: F401 - used through pandas (to_parquet)
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Quote (.info) lookups in flight at once - each one is a blocking HTTPS call
+INFO_WORKERS = 16
+
+# Repeat scans within this window reuse bars and quotes from .cache/scan/<TICKER>/
+SCAN_CACHE_TTL = 15 * 60
+
+# Alpaca market data feed for every script that reads bars from Alpaca, set
+# with ALPACA_DATA_FEED: 'iex' (the free plan's feed) or 'sip' (consolidated)
+DEFAULT_ALPACA_FEED = 'iex'
+
+
+def alpaca_data_feed() -> str:
+    """The Alpaca data feed named by ALPACA_DATA_FEED, DEFAULT_ALPACA_FEED if unset"""
+    return os.getenv('ALPACA_DATA_FEED', DEFAULT_ALPACA_FEED).strip().lower()
+
+
+def download_history(
+    tickers: List[str],
+    period: str = '3mo',
+    interval: str = '1d',
+    use_cache: bool = True
+) -> Dict[str, pd.DataFrame]:
+    """
+    Download bars for all tickers in one batched yf.download call
+
+    yf.download multiplexes the requests on its own thread pool and
+    returns a (field x ticker) column panel; it is split back into one
+    OHLCV frame per ticker, skipping tickers that returned no data.
+    Frames from a scan in the last 15 minutes are served from disk and
+    only the remaining tickers are downloaded.
+    """
+    name = f'{period}_{interval}'
+    frames = {}
+    if use_cache:
+        for ticker in tickers:
+            hist = cache_load(cache_path('scan', ticker, name), SCAN_CACHE_TTL)
+            if hist is not None:
+                frames[ticker] = hist
+
+    pending = [t for t in tickers if t not in frames]
+    if pending:
+        try:
+            data = yf.download(
+                pending, period=period, interval=interval, group_by='ticker',
+                auto_adjust=False, threads=True, progress=False
+            )
+        except Exception as e:
+            print(f"Error downloading {period}/{interval} bars: {str(e)}")
+            data = None
+
+        if data is not None and not data.empty:
+            available = set(data.columns.get_level_values(0))
+            for ticker in pending:
+                if ticker not in available:
+                    continue
+                hist = data[ticker].dropna(how='all')
+                if not hist.empty:
+                    frames[ticker] = hist
+                    if use_cache:
+                        cache_store(cache_path('scan', ticker, name), hist)
+
+    return {t: frames[t] for t in tickers if t in frames}
+
+
+def get_info(ticker: str, use_cache: bool = True) -> Dict:
+    """Quote info for one ticker (cached on disk), or an empty dict if the lookup fails"""
+    path = cache_path('scan', ticker, 'info')
+    if use_cache:
+        info = cache_load(path, SCAN_CACHE_TTL)
+        if info is not None:
+            return info
+
+    try:
+        info = yf.Ticker(ticker).info or {}
+    except Exception as e:
+        # tqdm.write prints above the progress bar instead of through it
+        (tqdm.write if tqdm else print)(f"Error fetching info for {ticker}: {str(e)}")
+        return {}
+
+    if use_cache and info:
+        cache_store(path, info)
+    return info
+
+
+def fetch_infos(tickers: List[str], max_workers: int = INFO_WORKERS, use_cache: bool = True) -> List[Dict]:
+    """
+    Fetch quote info for many tickers concurrently
+
+    The lookups are network-bound, so a thread pool overlaps them; the
+    results come back in the order of tickers.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        infos = pool.map(partial(get_info, use_cache=use_cache), tickers)
+        if tqdm:
+            infos = tqdm(infos, total=len(tickers), desc='Quotes', unit='ticker')
+        return list(infos)
+
+
+def save_results(df: pd.DataFrame, path_stem: str, export_csv: bool = False) -> str:
+    """
+    Write scan results to <path_stem>.parquet (typed columns, snappy)
+
+    Falls back to CSV when pyarrow is not installed; export_csv also
+    writes a CSV copy next to the Parquet file. Returns the name of the
+    primary file written.
+    """
+    if not PYARROW_AVAILABLE:
+        df.to_csv(f'{path_stem}.csv', index=False)
+        return os.path.basename(f'{path_stem}.csv')
+
+    df.to_parquet(f'{path_stem}.parquet', engine='pyarrow', compression='snappy', index=False)
+    if export_csv:
+        df.to_csv(f'{path_stem}.csv', index=False)
+    return os.path.basename(f'{path_stem}.parquet')
@@ -6,44 +6,272 @@ Automatically discovers and filters stocks from the entire market based on volat
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
+import io
+import random
+import threading
 from typing import List, Dict, Optional
 import os
+import re
 import csv
+import json
+import shutil
+import warnings
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
+try:
+    from scripts._njit_kernels import NUMBA_AVAILABLE, compute_annualized_vol, screen_kernel
+    from scripts._disk_cache import cache_path, cache_load, cache_store
+    from scripts.universe_manager import UniverseManager
+except ImportError:  # Run directly as `python scripts/universe_builder.py`
+    from _njit_kernels import NUMBA_AVAILABLE, compute_annualized_vol, screen_kernel
+    from _disk_cache import cache_path, cache_load, cache_store
+    from universe_manager import UniverseManager
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+try:
+    import pyarrow  # noqa: F401 - used through pandas (to_parquet, read_csv engine)
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 load_dotenv()
 
+# On-disk cache TTLs for Yahoo responses (organized as .cache/yf/<TICKER>/<name>.pkl)
+QUOTE_CACHE_TTL = 24 * 3600      # screening only needs a daily snapshot
+HISTORY_CACHE_TTL = 12 * 3600    # daily bars only change once per session
+LIST_CACHE_TTL = 24 * 3600       # symbol directories are regenerated daily
+
+# Bulk history downloads
+SCREEN_WORKERS = 8               # yf.download chunks in flight at once
+DOWNLOAD_RETRIES = 3             # attempts per chunk before giving up on it
+VOLUME_WINDOW = 63               # ~3 months of sessions, same span as Yahoo's averageVolume
+
+# Symbol directories (HTTPS mirrors of ftp.nasdaqtrader.com/symboldirectory)
+NASDAQ_LISTED_URL = 'https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt'
+OTHER_LISTED_URL = 'https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt'
+
+# S&P 500 constituents as a flat CSV (Symbol, Security, GICS Sector, ...)
+SP500_CONSTITUENTS_URL = 'https://datahub.io/core/s-and-p-500-companies/r/constituents.csv'
+
+# Common stock tickers: up to 5 letters/digits/dashes. The character class
+# rejects preferreds ($), indices (^) and share classes (/ .); the lookahead
+# rejects warrant/unit/rights suffixes (-WT, -WS, -U, -R)
+STOCK_TICKER_PATTERN = re.compile(r'(?!.*-(?:WT|WS|U|R)$)[A-Za-z0-9][A-Za-z0-9-]{0,4}')
+
+
+@lru_cache(maxsize=4096)
+def _ticker(symbol: str) -> yf.Ticker:
+    """Memoized yf.Ticker so a symbol touched more than once reuses the same object"""
+    # yfinance shares one curl_cffi session across Ticker objects; a requests.Session is rejected
+    return yf.Ticker(symbol)
+
+
+def observed_periods_per_year(index: pd.DatetimeIndex, window: int = 20) -> float:
+    """
+    Annualization factor for the last `window` returns of a daily bar index
+    
+    Ticker.history() simply omits sessions a symbol did not trade, so a
+    return can span several trading days. Scaling 252 by returns observed
+    per business day elapsed keeps a gappy series from being annualized as
+    if every return were one day long. Up to two missing weekdays are taken
+    to be exchange holidays, so gap-free data gives exactly 252.
+    """
+    n_bars = min(len(index), window + 1)
+    if n_bars < 2:
+        return 252.0
+    first = np.datetime64(index[-n_bars].date())
+    last = np.datetime64(index[-1].date())
+    n_returns = n_bars - 1
+    elapsed = int(np.busday_count(first, last))
+    if elapsed - n_returns <= 2:
+        return 252.0
+    return 252.0 * n_returns / elapsed
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Point dst at src's contents (hard link, copy fallback), replacing dst atomically"""
+    tmp_path = f'{dst}.tmp'
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(src, tmp_path)
+    except OSError:  # Cross-device, or filesystem without hard links
+        shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def _write_json(path: str, obj) -> None:
+    """Write obj as indented JSON, via orjson's C encoder when it is installed"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
+
 
 class UniverseBuilder:
     """Build a dynamic stock universe by screening the entire market"""
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.api_key = os.getenv('ALPACA_API_KEY')
         self.api_secret = os.getenv('ALPACA_SECRET_KEY')
         self.base_url = os.getenv('ALPACA_BASE_URL', 'https://paper-api.alpaca.markets')
+        self.use_cache = use_cache
+        
+        # Screening counters, reported at the end of batch_screen_universe
+        self.screen_stats = {'cache_hits': 0, 'inflight_dedupes': 0, 'upstream_calls': 0}
+        self._stats_lock = threading.Lock()
+        
+        # One keep-alive session for the symbol directory / S&P 500 list downloads;
+        # transient 429/5xx responses are retried with backoff by the adapter
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'Mozilla/5.0 (compatible; UniverseBuilder)'
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def fetch_text(self, url: str, name: str, ttl: float = LIST_CACHE_TTL) -> str:
+        """
+        Download a text resource, cached on disk under .cache/meta/<name>.pkl
+        
+        Within ttl the cached copy is returned without touching the network.
+        After that a conditional GET (ETag / Last-Modified) is sent, so an
+        unchanged file costs a 304 instead of a full download.
+        """
+        path = cache_path('meta', name)
+        cached = cache_load(path, float('inf')) if self.use_cache else None
+        if cached is not None and time.time() - os.path.getmtime(path) <= ttl:
+            return cached['text']
+        
+        headers = {}
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        resp = self.session.get(url, headers=headers, timeout=30)
+        if resp.status_code == 304 and cached is not None:
+            cache_store(path, cached)  # Refresh mtime so the TTL restarts
+            return cached['text']
+        resp.raise_for_status()
+        
+        if self.use_cache:
+            cache_store(path, {
+                'text': resp.text,
+                'etag': resp.headers.get('ETag'),
+                'last_modified': resp.headers.get('Last-Modified')
+            })
+        return resp.text
+    
+    def load_ticker_list(self, name: str, ttl_hours: float = 24) -> Optional[List[str]]:
+        """Return a parsed ticker list cached within ttl_hours, or None"""
+        if not self.use_cache:
+            return None
+        return cache_load(cache_path('meta', f'{name}_tickers'), ttl_hours * 3600)
+    
+    def store_ticker_list(self, name: str, tickers: List[str]) -> None:
+        """Cache a parsed ticker list so warm runs skip download and parsing"""
+        if self.use_cache and tickers:
+            cache_store(cache_path('meta', f'{name}_tickers'), tickers)
+    
+    def get_ticker_quote(self, ticker: str, stock: yf.Ticker) -> Dict:
+        """
+        Get price / average volume / market cap from yfinance fast_info,
+        cached on disk for 24h
+        
+        fast_info reads the chart endpoint instead of scraping the full
+        quoteSummary JSON behind .info. Fields Yahoo cannot provide are None.
+        """
+        path = cache_path('yf', ticker, 'quote')
+        if self.use_cache:
+            quote = cache_load(path, QUOTE_CACHE_TTL)
+            if quote is not None:
+                return quote
+        
+        fi = stock.fast_info
+        quote = {}
+        for key, field in (('price', 'last_price'),
+                           ('volume', 'three_month_average_volume'),
+                           ('market_cap', 'market_cap'),
+                           ('exchange', 'exchange')):
+            try:
+                quote[key] = fi[field]
+            except Exception:
+                quote[key] = None
+        
+        if self.use_cache and quote['price']:
+            cache_store(path, quote)
+        return quote
+    
+    def get_ticker_history(self, ticker: str, stock: yf.Ticker, period: str = '3mo') -> pd.DataFrame:
+        """Get yfinance daily history for a ticker, cached on disk for 12h"""
+        path = cache_path('yf', ticker, f'history_{period}')
+        if self.use_cache:
+            hist = cache_load(path, HISTORY_CACHE_TTL)
+            if hist is not None:
+                return hist
+        
+        hist = stock.history(period=period)
+        if self.use_cache and not hist.empty:
+            cache_store(path, hist)
+        return hist
+    
+    def read_symbol_directory(self, text: str, columns: List[str]) -> pd.DataFrame:
+        """
+        Parse a pipe-delimited NASDAQ Trader symbol file, keeping only columns
+        
+        Uses pandas' multithreaded pyarrow CSV engine when pyarrow is installed.
+        """
+        engine = {'engine': 'pyarrow'} if PYARROW_AVAILABLE else {}
+        return pd.read_csv(
+            io.BytesIO(text.encode()), sep='|', usecols=columns,
+            dtype={c: 'string' for c in columns}, **engine
+        )
     
     def get_all_nasdaq_tickers(self) -> List[str]:
         """
         Get all NASDAQ-listed tickers
-        Source: NASDAQ FTP site (public data)
+        Source: NASDAQ Trader symbol directory (public data)
         """
         print("Fetching all NASDAQ tickers...")
         
+        tickers = self.load_ticker_list('nasdaq')
+        if tickers is not None:
+            print(f"✓ Found {len(tickers)} NASDAQ tickers (cached)")
+            return tickers
+        
         try:
             # NASDAQ provides free list of all traded securities
-            url = "ftp://ftp.nasdaqtrader.com/symboldirectory/nasdaqlisted.txt"
+            # (HTTPS mirror - the FTP server often hangs before timing out)
+            url = NASDAQ_LISTED_URL
             
-            # Download using pandas
-            df = pd.read_csv(url, sep='|')
+            # Only the symbol column is needed - skip parsing/inferring the rest
+            df = self.read_symbol_directory(self.fetch_text(url, 'nasdaqlisted'), ['Symbol'])
             
             # Filter out the last row (file creation timestamp)
-            df = df[df['Symbol'] != 'File Creation Time']
+            df = df[~df['Symbol'].str.startswith('File Creation Time', na=False)]
             
-            # Get symbols - convert to string and handle NaN
-            tickers = df['Symbol'].dropna().astype(str).tolist()
+            # Get symbols - drop NaN
+            tickers = df['Symbol'].dropna().tolist()
             
             # Exclude test symbols and invalid entries
             tickers = [
@@ -53,6 +281,7 @@ class UniverseBuilder:
                 not t.lower() in ('nan', 'none', '')
             ]
             
+            self.store_ticker_list('nasdaq', tickers)
             print(f"✓ Found {len(tickers)} NASDAQ tickers")
             return tickers
             
@@ -63,23 +292,29 @@ class UniverseBuilder:
     def get_all_nyse_tickers(self) -> List[str]:
         """
         Get all NYSE-listed tickers
-        Source: NASDAQ FTP site (includes NYSE data)
+        Source: NASDAQ Trader symbol directory (includes NYSE data)
         """
         print("Fetching all NYSE tickers...")
         
+        tickers = self.load_ticker_list('nyse')
+        if tickers is not None:
+            print(f"✓ Found {len(tickers)} NYSE tickers (cached)")
+            return tickers
+        
         try:
             # NYSE data also available from NASDAQ
-            url = "ftp://ftp.nasdaqtrader.com/symboldirectory/otherlisted.txt"
+            url = OTHER_LISTED_URL
             
-            df = pd.read_csv(url, sep='|')
-            df = df[df['ACT Symbol'] != 'File Creation Time']
+            df = self.read_symbol_directory(self.fetch_text(url, 'otherlisted'), ['ACT Symbol', 'Exchange'])
+            df = df[~df['ACT Symbol'].str.startswith('File Creation Time', na=False)]
             
             # Filter for NYSE only (exchange code 'N')
             nyse_df = df[df['Exchange'] == 'N']
             
-            tickers = nyse_df['ACT Symbol'].tolist()
+            tickers = nyse_df['ACT Symbol'].dropna().tolist()
             tickers = [t for t in tickers if not t.endswith(('.TEST', '.U', '.W', '.R'))]
             
+            self.store_ticker_list('nyse', tickers)
             print(f"✓ Found {len(tickers)} NYSE tickers")
             return tickers
             
@@ -88,18 +323,21 @@ class UniverseBuilder:
             return []
     
     def get_sp500_tickers(self) -> List[str]:
-        """Get S&P 500 tickers from Wikipedia"""
+        """Get S&P 500 tickers from the DataHub constituents list"""
         print("Fetching S&P 500 tickers...")
         
+        tickers = self.load_ticker_list('sp500')
+        if tickers is not None:
+            print(f"✓ Found {len(tickers)} S&P 500 tickers (cached)")
+            return tickers
+        
         try:
-            url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-            tables = pd.read_html(url)
-            sp500_table = tables[0]
-            tickers = sp500_table['Symbol'].tolist()
+            text = self.fetch_text(SP500_CONSTITUENTS_URL, 'sp500_constituents')
             
-            # Clean up tickers (Wikipedia uses class A/B suffixes)
-            tickers = [t.replace('.', '-') for t in tickers]
+            # Clean up tickers (class A/B shares are listed as BRK.B, yfinance wants BRK-B)
+            tickers = [row['Symbol'].replace('.', '-') for row in csv.DictReader(io.StringIO(text))]
             
+            self.store_ticker_list('sp500', tickers)
             print(f"✓ Found {len(tickers)} S&P 500 tickers")
             return tickers
             
@@ -141,26 +379,16 @@ class UniverseBuilder:
         if include_sp500:
             all_tickers.extend(self.get_sp500_tickers())
         
-        # Remove duplicates
-        all_tickers = list(set(all_tickers))
+        # Remove duplicates (keeps first-seen order, so runs are reproducible)
+        all_tickers = list(dict.fromkeys(all_tickers))
         
         # Filter out ETFs, funds, warrants, units, preferred stocks
         print("\nFiltering out non-stocks...")
-        filtered = []
-        for ticker in all_tickers:
-            # Skip preferred stocks (contain $)
-            if '$' in ticker:
-                continue
-            # Skip common ETF/fund identifiers
-            if any(x in ticker for x in ['^', '/', '.', '-WT', '-WS', '-U', '-R']):
-                continue
-            # Skip if ticker is too long (usually warrants/units)
-            if len(ticker) > 5:
-                continue
-            # Skip if not alphanumeric
-            if not ticker.replace('-', '').isalnum():
-                continue
-            filtered.append(ticker)
+        # One anchored regex covers length, allowed characters and suffixes;
+        # tickers longer than 5 chars are usually warrants/units
+        symbols = pd.Series(all_tickers, dtype='string')
+        mask = symbols.str.fullmatch(STOCK_TICKER_PATTERN)
+        filtered = symbols[mask.fillna(False)].tolist()
         
         print(f"✓ Total unique stock tickers: {len(filtered)}\n")
         return filtered
@@ -171,108 +399,278 @@ class UniverseBuilder:
         Returns basic metrics or None if doesn't meet minimum criteria
         """
         try:
-            stock = yf.Ticker(ticker)
+            stock = _ticker(ticker)
             
-            # Get quick info
-            info = stock.info
+            # Price, volume and volatility all come from one history request
+            hist = self.get_ticker_history(ticker, stock, period='3mo')
+            
+            if hist.empty or len(hist) < 10:
+                return None
             
             # Fast filters - skip if doesn't meet basic criteria
-            price = info.get('currentPrice') or info.get('previousClose')
+            price = hist['Close'].dropna().iloc[-1]
             if not price or price < 0.50 or price > 50:  # Outside target range
                 return None
             
-            volume = info.get('averageVolume') or info.get('volume')
+            volume = hist['Volume'].tail(VOLUME_WINDOW).mean()
             if not volume or volume < 500_000:  # Too illiquid
                 return None
             
-            market_cap = info.get('marketCap')
-            if not market_cap or market_cap > 5_000_000_000:  # Too large (>$5B)
-                return None
-            
-            # Get minimal historical data for volatility
-            hist = stock.history(period='3mo')
-            
-            if hist.empty or len(hist) < 10:
-                return None
-            
-            # Calculate multi-timeframe volatility
-            returns = hist['Close'].pct_change().dropna()
-            if len(returns) < 5:
+            # Monthly volatility (last 20 returns, most relevant for screening)
+            closes = hist['Close'].to_numpy(dtype=np.float64)
+            volatility = compute_annualized_vol(closes, periods_per_year=observed_periods_per_year(hist.index))
+            if volatility < 0:  # Fewer than 5 usable returns
                 return None
             
-            # Monthly volatility (most relevant for screening)
-            if len(returns) >= 20:
-                monthly_returns = returns.tail(20)
-                volatility = monthly_returns.std() * np.sqrt(252) * 100
-            else:
-                volatility = returns.std() * np.sqrt(252) * 100
-            
             # Must have minimum volatility
             if volatility < 50:  # Less than 50% annualized
                 return None
             
+            # Market cap is only looked up for tickers that passed everything else
+            quote = self.get_ticker_quote(ticker, stock)
+            market_cap = quote['market_cap']
+            if not market_cap or market_cap > 5_000_000_000:  # Too large (>$5B)
+                return None
+            
             return {
                 'ticker': ticker,
-                'price': round(price, 2),
+                'price': round(float(price), 2),
                 'volume': int(volume),
                 'market_cap': market_cap,
                 'volatility': round(volatility, 2),
-                'exchange': info.get('exchange', 'Unknown')
+                'exchange': quote['exchange'] or 'Unknown'
             }
             
         except Exception as e:
             return None
     
+    def screen_history_panel(
+        self,
+        data: pd.DataFrame,
+        min_price: float = 0.50,
+        max_price: float = 50,
+        min_volume: int = 500_000,
+        min_volatility: float = 50
+    ) -> pd.DataFrame:
+        """
+        Vectorized screen of a wide yf.download(group_by='ticker') panel
+        
+        Computes last price, three-month average volume and 20-day annualized
+        log-return volatility for every ticker column at once on plain
+        (days x tickers) NumPy arrays, then applies the same thresholds as
+        quick_screen_ticker with boolean masks.
+        """
+        if data is None or data.empty:
+            return pd.DataFrame()
+        
+        close = data.xs('Close', level=1, axis=1)
+        prices = close.to_numpy(dtype=np.float64)
+        
+        # float32 is ample precision for comparing 50-200% volatilities and
+        # 500K+ volume thresholds, and halves the memory traffic of the
+        # reductions. The float64 prices are kept only to report last_price.
+        closes = prices.astype(np.float32)
+        volumes = data.xs('Volume', level=1, axis=1).to_numpy(dtype=np.float32)
+        
+        # Last non-NaN close per column (NaN for columns with no data at all)
+        valid = np.isfinite(prices)
+        last_row = prices.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+        last_price = prices[last_row, np.arange(prices.shape[1])]
+        
+        if NUMBA_AVAILABLE:
+            # One fused, parallel pass per column instead of NumPy temporaries
+            volatility, avg_volume, keep = screen_kernel(
+                closes, volumes, last_price,
+                min_price, max_price, min_volume, min_volatility,
+                volume_window=VOLUME_WINDOW
+            )
+        else:
+            with warnings.catch_warnings():
+                # All-NaN columns (delisted/unknown symbols) are expected here
+                warnings.simplefilter('ignore', RuntimeWarning)
+                avg_volume = np.nanmean(volumes[-VOLUME_WINDOW:], axis=0, dtype=np.float64)
+                
+                # Returns and volatility only for columns passing the cheap masks
+                keep = (last_price >= min_price) & (last_price <= max_price) & (avg_volume >= min_volume)
+                volatility = np.full(keep.shape, np.nan)
+                returns = np.diff(np.log(closes[:, keep]), axis=0)
+                volatility[keep] = np.nanstd(returns[-20:], axis=0, ddof=1).astype(np.float64) * np.sqrt(252) * 100
+            
+            keep[keep] = (np.isfinite(returns).sum(axis=0) >= 5) & (volatility[keep] >= min_volatility)
+        
+        return pd.DataFrame({
+            'ticker': close.columns[keep].astype(str),
+            'price': last_price[keep].round(2),
+            'volume': avg_volume[keep].astype(np.int64),
+            'volatility': volatility[keep].round(2)
+        })
+    
+    def download_chunk(self, chunk: List[str]) -> Optional[pd.DataFrame]:
+        """
+        Download 3 months of daily bars for one chunk of tickers
+        
+        yf.download swallows per-ticker errors, so a rate-limited request
+        shows up as a frame with no data. That case (and any raised error)
+        is retried with jittered exponential backoff: 3-5s, then 6-8s.
+        """
+        for attempt in range(DOWNLOAD_RETRIES):
+            with self._stats_lock:
+                self.screen_stats['upstream_calls'] += 1
+            try:
+                data = yf.download(
+                    chunk, period='3mo', group_by='ticker',
+                    auto_adjust=False, threads=False, progress=False
+                )
+                if data is not None and not data.empty and data.notna().any().any():
+                    return data
+            except Exception as e:
+                print(f"Error downloading {chunk[0]}..{chunk[-1]}: {e}")
+            
+            if attempt < DOWNLOAD_RETRIES - 1:
+                time.sleep(3 * 2 ** attempt + random.uniform(0, 2))
+        return None
+    
+    def bulk_screen(
+        self,
+        tickers: List[str],
+        chunk_size: int = 20,
+        max_workers: int = SCREEN_WORKERS,
+        verbose: bool = False
+    ) -> pd.DataFrame:
+        """
+        Screen tickers using batched yf.download calls
+        
+        Tickers are split into chunks that are downloaded concurrently on a
+        thread pool (the work is network-bound); each chunk is then screened
+        in a single vectorized pass. Results keep the input ticker order.
+        
+        Per-ticker outcomes are memoized for the day in
+        .cache/screen/<date>.pkl, so a repeat run only downloads tickers it
+        has not seen yet, and duplicate symbols are requested once.
+        """
+        memo_path = cache_path('screen', date.today().isoformat())
+        memo = (cache_load(memo_path, float('inf')) or {}) if self.use_cache else {}
+        
+        unique = list(dict.fromkeys(tickers))
+        pending = [t for t in unique if t not in memo]
+        with self._stats_lock:
+            self.screen_stats['inflight_dedupes'] += len(tickers) - len(unique)
+            self.screen_stats['cache_hits'] += len(unique) - len(pending)
+        
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        found = sum(1 for t in unique if memo.get(t))
+        done = len(unique) - len(pending)
+        
+        # tqdm throttles terminal redraws; without it fall back to a carriage-return line
+        pbar = tqdm(total=len(unique), initial=done, desc='Screening', unit='ticker') if verbose and tqdm else None
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self.download_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                data = future.result()
+                done += len(chunk)
+                
+                if data is None:
+                    print(f"\n❌ No data for {chunk[0]}..{chunk[-1]} after {DOWNLOAD_RETRIES} attempts")
+                    if pbar is not None:
+                        pbar.update(len(chunk))
+                    continue
+                
+                screened = self.screen_history_panel(data)
+                found += len(screened)
+                
+                # Remember rejections too, but only for tickers that returned data -
+                # an empty column may just be a transient per-ticker failure
+                has_data = data.xs('Close', level=1, axis=1).notna().any()
+                for t in has_data.index[has_data.to_numpy()]:
+                    memo[t] = None
+                for row in screened.to_dict('records'):
+                    memo[row['ticker']] = row
+                
+                if pbar is not None:
+                    pbar.update(len(chunk))
+                    pbar.set_postfix(found=found, refresh=False)
+                elif verbose:
+                    print(f"[{done}/{len(unique)}] Screened {chunk[0]}..{chunk[-1]} | Found {found} candidates", end='\r')
+        
+        if pbar is not None:
+            pbar.close()
+        
+        if self.use_cache and chunks:
+            cache_store(memo_path, memo)
+        
+        rows = [memo[t] for t in unique if memo.get(t)]
+        if rows:
+            return pd.DataFrame(rows)
+        return pd.DataFrame()
+    
+    def add_market_caps(
+        self,
+        df: pd.DataFrame,
+        max_market_cap: float = 5_000_000_000
+    ) -> pd.DataFrame:
+        """
+        Look up market cap and exchange for tickers that passed the history screen
+        
+        Only survivors reach this point, so the per-symbol fast_info lookups
+        cover a small fraction of the market; they run concurrently on a
+        thread pool. Tickers without a market cap or above max_market_cap
+        are dropped.
+        """
+        if df.empty:
+            return df
+        
+        with ThreadPoolExecutor(max_workers=SCREEN_WORKERS) as pool:
+            quotes = list(pool.map(lambda t: self.get_ticker_quote(t, _ticker(t)), df['ticker']))
+        market_caps = pd.to_numeric(pd.Series([q['market_cap'] for q in quotes]), errors='coerce')
+        exchanges = [q['exchange'] or 'Unknown' for q in quotes]
+        
+        df = df.assign(market_cap=market_caps.to_numpy(), exchange=exchanges)
+        keep = (market_caps > 0) & (market_caps <= max_market_cap)
+        df = df[keep.to_numpy()].astype({'market_cap': np.int64})
+        
+        return df[['ticker', 'price', 'volume', 'market_cap', 'volatility', 'exchange']].reset_index(drop=True)
+    
     def batch_screen_universe(
         self,
         tickers: List[str],
-        batch_size: int = 50,
-        max_tickers: Optional[int] = None
+        max_workers: int = SCREEN_WORKERS,
+        max_tickers: Optional[int] = None,
+        chunk_size: int = 20
     ) -> pd.DataFrame:
         """
         Screen a large universe of tickers in batches
         
         Args:
             tickers: List of ticker symbols to screen
-            batch_size: Number of tickers to process before pausing
+            max_workers: Number of download requests in flight at once
             max_tickers: Maximum number to process (for testing)
+            chunk_size: Number of tickers per yf.download request
         """
         if max_tickers:
             tickers = tickers[:max_tickers]
         
+        n_requests = -(-len(tickers) // chunk_size)
         print(f"\n{'='*80}")
         print(f"SCREENING {len(tickers)} TICKERS")
-        print(f"This will take approximately {len(tickers) // 60} minutes")
+        print(f"Downloading history in {n_requests} batched requests, {max_workers} at a time")
         print(f"{'='*80}\n")
         
-        results = []
         start_time = time.time()
         
-        for i, ticker in enumerate(tickers, 1):
-            print(f"[{i}/{len(tickers)}] Screening {ticker}...", end='\r')
-            
-            metrics = self.quick_screen_ticker(ticker)
-            if metrics:
-                results.append(metrics)
-                print(f"[{i}/{len(tickers)}] ✓ {ticker} - {metrics['volatility']:.1f}% vol", end='\r')
-            
-            # Rate limiting - pause after each batch
-            if i % batch_size == 0:
-                elapsed = time.time() - start_time
-                rate = i / elapsed
-                remaining = len(tickers) - i
-                eta = remaining / rate / 60
-                
-                print(f"\n[Batch {i//batch_size}] Processed {i} tickers | Found {len(results)} candidates | ETA: {eta:.1f} min")
-                time.sleep(2)  # Pause between batches
+        # Price / volume / volatility from bulk history, market cap only for survivors
+        df = self.bulk_screen(tickers, chunk_size=chunk_size, max_workers=max_workers, verbose=True)
+        print(f"\n\n✓ {len(df)} tickers passed price/volume/volatility screens")
+        df = self.add_market_caps(df)
         
         elapsed_total = (time.time() - start_time) / 60
-        print(f"\n\n✓ Screening complete in {elapsed_total:.1f} minutes")
-        print(f"✓ Found {len(results)} high-volatility candidates")
+        print(f"✓ Screening complete in {elapsed_total:.1f} minutes")
+        print(f"✓ Found {len(df)} high-volatility candidates")
+        stats = self.screen_stats
+        print(f"✓ Requests: {stats['upstream_calls']} | Cached: {stats['cache_hits']} | Duplicates skipped: {stats['inflight_dedupes']}")
         
-        if results:
-            return pd.DataFrame(results)
-        return pd.DataFrame()
+        return df
     
     def rank_and_filter_universe(
         self,
@@ -308,6 +706,32 @@ class UniverseBuilder:
         
         return filtered
     
+    def summarize_universe(self, df: pd.DataFrame) -> Dict:
+        """
+        Summary statistics shared by metadata.json, README.md and universe.py
+        
+        Computed with a single DataFrame.agg call instead of separate
+        mean/min/max passes in each writer.
+        """
+        agg = df.agg({
+            'volatility': ['mean', 'max', 'min'],
+            'volume': ['mean'],
+            'market_cap': ['mean'],
+            'price': ['min', 'max']
+        })
+        return {
+            'total_stocks': len(df),
+            'avg_volatility': float(agg.at['mean', 'volatility']),
+            'max_volatility': float(agg.at['max', 'volatility']),
+            'min_volatility': float(agg.at['min', 'volatility']),
+            'avg_volume': int(agg.at['mean', 'volume']),
+            'avg_market_cap': float(agg.at['mean', 'market_cap']),
+            'price_range': {
+                'min': float(agg.at['min', 'price']),
+                'max': float(agg.at['max', 'price'])
+            }
+        }
+    
     def save_universe(self, df: pd.DataFrame, filename: str = None):
         """Save the universe to a file in organized directory structure"""
         
@@ -325,64 +749,81 @@ class UniverseBuilder:
         os.makedirs(universe_dir, exist_ok=True)
         print(f"✓ Created universe directory: {universe_dir}/")
         
-        # WORKAROUND: Use native Python CSV writing instead of pandas.to_csv()
-        csv_file = os.path.join(universe_dir, f'universe_data.csv')
-        try:
-            with open(csv_file, 'w', newline='') as f:
-                writer = csv.writer(f)
-                # Write header
-                writer.writerow(df.columns.tolist())
-                # Write data
-                for _, row in df.iterrows():
-                    writer.writerow(row.tolist())
-            print(f"✓ Saved data: {csv_file}")
-        except Exception as e:
-            print(f"❌ Error saving CSV: {e}")
-            return None
-        
-        # Save ticker list
-        ticker_file = os.path.join(universe_dir, f'universe_tickers.txt')
-        with open(ticker_file, 'w') as f:
-            f.write('\n'.join(df['ticker'].tolist()))
-        print(f"✓ Saved tickers: {ticker_file}")
+        stats = self.summarize_universe(df)
         
-        # Save Python module
-        python_file = os.path.join(universe_dir, f'universe.py')
-        self.generate_python_universe_to_file(df, python_file, timestamp)
-        print(f"✓ Saved Python module: {python_file}")
+        # Sorted once; metadata and README both take their top slices from it
+        by_volatility = df.sort_values('volatility', ascending=False, kind='stable')
         
-        # Save metadata/stats
+        csv_file = os.path.join(universe_dir, 'universe_data.csv')
+        parquet_file = os.path.join(universe_dir, 'universe_data.parquet')
+        ticker_file = os.path.join(universe_dir, 'universe_tickers.txt')
+        python_file = os.path.join(universe_dir, 'universe.py')
         metadata_file = os.path.join(universe_dir, 'metadata.json')
-        metadata = {
-            'created': timestamp,
-            'total_stocks': len(df),
-            'avg_volatility': float(df['volatility'].mean()),
-            'max_volatility': float(df['volatility'].max()),
-            'min_volatility': float(df['volatility'].min()),
-            'avg_volume': int(df['volume'].mean()),
-            'avg_market_cap': float(df['market_cap'].mean()),
-            'price_range': {
-                'min': float(df['price'].min()),
-                'max': float(df['price'].max())
-            },
-            'top_10_tickers': df.nlargest(10, 'volatility')['ticker'].tolist()
-        }
-        
-        import json
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        print(f"✓ Saved metadata: {metadata_file}")
-        
-        # Create README for this universe
         readme_file = os.path.join(universe_dir, 'README.md')
-        self.create_universe_readme(df, readme_file, timestamp)
-        print(f"✓ Saved README: {readme_file}")
         
-        # Also save a copy of universe.py to main directory for easy import
+        def write_csv():
+            # WORKAROUND: Use native Python CSV writing instead of pandas.to_csv()
+            with open(csv_file, 'w', newline='') as f:
+                writer = csv.writer(f)
+                # Write header
+                writer.writerow(df.columns.tolist())
+                # Write data - plain tuples, no per-row Series
+                writer.writerows(df.itertuples(index=False, name=None))
+        
+        def write_tickers():
+            with open(ticker_file, 'w') as f:
+                f.write('\n'.join(df['ticker'].tolist()))
+        
+        def write_metadata():
+            _write_json(metadata_file, {
+                'created': timestamp,
+                **stats,
+                'top_10_tickers': by_volatility['ticker'].head(10).tolist(),
+                # Lets universe_manager compare universes without reading the CSVs
+                'all_tickers': df['ticker'].tolist()
+            })
+        
+        # (label, path, writer) - the files are independent, so overlap the writes
+        jobs = [
+            ('data', csv_file, write_csv),
+            ('tickers', ticker_file, write_tickers),
+            ('Python module', python_file,
+             lambda: self.generate_python_universe_to_file(df, python_file, timestamp, stats)),
+            ('metadata', metadata_file, write_metadata),
+            ('README', readme_file,
+             lambda: self.create_universe_readme(df, readme_file, timestamp, stats, by_volatility.head(20))),
+        ]
+        # Columnar copy for fast reloads (optional, needs pyarrow)
+        if PYARROW_AVAILABLE:
+            jobs.insert(1, ('data', parquet_file,
+                            lambda: df.to_parquet(parquet_file, compression='zstd', index=False)))
+        
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [(label, path, pool.submit(writer)) for label, path, writer in jobs]
+        
+        for label, path, future in futures:
+            error = future.exception()
+            if error is None:
+                print(f"✓ Saved {label}: {path}")
+            elif path == csv_file:
+                print(f"❌ Error saving CSV: {error}")
+                return None
+            elif path == parquet_file:
+                print(f"⚠️  Could not save Parquet copy: {error}")
+            else:
+                raise error
+        
+        # Expose universe.py (and its data sidecar) in main directory for easy import;
+        # linked rather than regenerated so both always hold the same content
         main_universe_file = 'custom_universe.py'
-        self.generate_python_universe_to_file(df, main_universe_file, timestamp)
+        _link_or_copy(python_file, main_universe_file)
+        _link_or_copy(os.path.splitext(python_file)[0] + '.json',
+                      os.path.splitext(main_universe_file)[0] + '.json')
         print(f"✓ Saved main universe file: {main_universe_file}")
         
+        # Fold the new universe into universes/index.json for universe_manager
+        UniverseManager(base_dir).rebuild_index()
+        
         print(f"\n{'='*80}")
         print(f"Universe saved to: {universe_dir}/")
         print(f"{'='*80}")
@@ -397,25 +838,48 @@ class UniverseBuilder:
         self.generate_python_universe_to_file(df, filename, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         return filename
     
-    def generate_python_universe_to_file(self, df: pd.DataFrame, filepath: str, timestamp: str):
+    def generate_python_universe_to_file(self, df: pd.DataFrame, filepath: str, timestamp: str,
+                                         stats: Optional[Dict] = None):
         """Helper to generate Python universe file to specific path"""
-        tickers = df['ticker'].tolist()
+        # Tickers go in a JSON sidecar (universe.py -> universe.json); loading it
+        # is far cheaper than compiling a large list literal on every import
+        data_file = os.path.splitext(filepath)[0] + '.json'
+        with open(data_file, 'w') as f:
+            json.dump(df['ticker'].tolist(), f)
+        
+        with open(filepath, 'w') as f:
+            f.write(self._build_universe_py(df, timestamp, stats))
+    
+    def _build_universe_py(self, df: pd.DataFrame, timestamp: str,
+                           stats: Optional[Dict] = None) -> str:
+        """Source of the universe.py module that loads the ticker sidecar"""
+        if stats is None:
+            stats = self.summarize_universe(df)
         
-        code = f'''"""
+        return f'''"""
 Auto-generated Stock Universe
 Created: {timestamp}
-Total stocks: {len(tickers)}
+Total stocks: {len(df)}
 Criteria: High volatility, sufficient liquidity
 """
 
-CUSTOM_UNIVERSE = {tickers}
+import json
+import os
+
+# Ticker list is stored next to this module
+_DATA_FILE = os.path.splitext(os.path.abspath(__file__))[0] + '.json'
+try:
+    with open(_DATA_FILE) as _f:
+        CUSTOM_UNIVERSE = json.load(_f)
+except FileNotFoundError:
+    raise ImportError(f"Universe data file not found: {{_DATA_FILE}}")
 
 # Statistics
 UNIVERSE_STATS = {{
-    'total_stocks': {len(df)},
-    'avg_volatility': {df['volatility'].mean():.2f},
-    'avg_volume': {int(df['volume'].mean())},
-    'price_range': (${df['price'].min():.2f}, ${df['price'].max():.2f}),
+    'total_stocks': {stats['total_stocks']},
+    'avg_volatility': {stats['avg_volatility']:.2f},
+    'avg_volume': {stats['avg_volume']},
+    'price_range': ({stats['price_range']['min']:.2f}, {stats['price_range']['max']:.2f}),
     'generated': '{timestamp}'
 }}
 
@@ -424,22 +888,27 @@ if __name__ == "__main__":
     print(f"Average Volatility: {{UNIVERSE_STATS['avg_volatility']}}%")
     print(f"Average Volume: {{UNIVERSE_STATS['avg_volume']:,}}")
 '''
-        
-        with open(filepath, 'w') as f:
-            f.write(code)
     
-    def create_universe_readme(self, df: pd.DataFrame, filepath: str, timestamp: str):
+    def create_universe_readme(self, df: pd.DataFrame, filepath: str, timestamp: str,
+                               stats: Optional[Dict] = None, top_20: Optional[pd.DataFrame] = None):
         """Create a README file for the universe directory"""
+        if stats is None:
+            stats = self.summarize_universe(df)
+        if top_20 is None:
+            top_20 = df.nlargest(20, 'volatility')
+        
+        parquet_line = ('- **universe_data.parquet** - Same dataset in columnar form\n'
+                        if PYARROW_AVAILABLE else '')
         
-        readme = f'''# Stock Universe - {timestamp}
+        header = f'''# Stock Universe - {timestamp}
 
 ## Summary
 
 - **Created:** {timestamp}
-- **Total Stocks:** {len(df)}
-- **Average Volatility:** {df['volatility'].mean():.2f}%
-- **Average Volume:** {int(df['volume'].mean()):,}
-- **Price Range:** ${df['price'].min():.2f} - ${df['price'].max():.2f}
+- **Total Stocks:** {stats['total_stocks']}
+- **Average Volatility:** {stats['avg_volatility']:.2f}%
+- **Average Volume:** {stats['avg_volume']:,}
+- **Price Range:** ${stats['price_range']['min']:.2f} - ${stats['price_range']['max']:.2f}
 
 ---
 
@@ -447,8 +916,9 @@ if __name__ == "__main__":
 
 ### 📊 Data Files
 - **universe_data.csv** - Complete dataset with all metrics
-- **universe_tickers.txt** - Simple list of ticker symbols
+{parquet_line}- **universe_tickers.txt** - Simple list of ticker symbols
 - **universe.py** - Python module (importable)
+- **universe.json** - Ticker list loaded by universe.py
 
 ### 📋 Metadata
 - **metadata.json** - Structured metadata and statistics
@@ -462,14 +932,16 @@ if __name__ == "__main__":
 |------|--------|-------|------------|--------|------------|
 '''
         
+        # Collect parts and join once instead of growing one string
+        parts = [header]
+        
         # Add top 20 stocks
-        top_20 = df.nlargest(20, 'volatility')
-        rank = 1
-        for idx, row in top_20.iterrows():
-            readme += f"| {rank} | {row['ticker']} | ${row['price']:.2f} | {row['volatility']:.1f}% | {int(row['volume']):,} | ${row['market_cap']/1e6:.1f}M |\n"
-            rank += 1
+        top_20 = top_20[['ticker', 'price', 'volatility', 'volume', 'market_cap']]
+        for rank, (ticker, price, volatility, volume, market_cap) in enumerate(
+                top_20.itertuples(index=False, name=None), 1):
+            parts.append(f"| {rank} | {ticker} | ${price:.2f} | {volatility:.1f}% | {int(volume):,} | ${market_cap/1e6:.1f}M |\n")
         
-        readme += '''
+        parts.append('''
 
 ---
 
@@ -480,10 +952,10 @@ from universe import CUSTOM_UNIVERSE
 # Use CUSTOM_UNIVERSE list in your scanner
 ```
 
-'''
+''')
 
         with open(filepath, 'w') as f:
-            f.write(readme)
+            f.write(''.join(parts))
 
 
 def main():
@@ -495,9 +967,11 @@ def main():
                         help='Max tickers to screen (for testing)')
     parser.add_argument('--top-n', type=int, default=200,
                         help='Number of stocks in final universe')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore cached Yahoo data and re-download everything')
     args = parser.parse_args()
 
-    builder = UniverseBuilder()
+    builder = UniverseBuilder(use_cache=not args.no_cache)
 
     # Get all tickers
     all_tickers = builder.get_all_market_tickers()
@@ -5,8 +5,20 @@ Automatically updates scanners with dynamically discovered universe
 
 import sys
 import os
+import re
 from datetime import datetime
 
+# Line-anchored matches from the method header to its closing return, so the
+# scan advances line by line instead of backtracking through the whole file
+ADVANCED_UNIVERSE_PATTERN = re.compile(
+    r'^    def get_expanded_universe\(self\).*\n(?:.*\n)*?        return all_tickers$',
+    re.MULTILINE
+)
+BASIC_UNIVERSE_PATTERN = re.compile(
+    r'^    def get_stock_universe\(self\).*\n(?:.*\n)*?        return volatile_universe$',
+    re.MULTILINE
+)
+
 
 def integrate_universe_with_scanners(universe_file: str = 'custom_universe.py'):
     """
@@ -80,13 +92,12 @@ def update_advanced_scanner(tickers: list, stats: dict):
             return {tickers[:50]}  # Fallback sample
 '''
     
-    # Find and replace the get_expanded_universe method
-    import re
-    pattern = r'def get_expanded_universe\(self\).*?return all_tickers'
+    # Find and replace the get_expanded_universe method (single pass)
+    content, replaced = ADVANCED_UNIVERSE_PATTERN.subn(
+        lambda _: new_method.rstrip() + '\n        \n        return all_tickers', content, count=1
+    )
     
-    if re.search(pattern, content, re.DOTALL):
-        content = re.sub(pattern, new_method.strip() + '\n        \n        return all_tickers', content, flags=re.DOTALL)
-        
+    if replaced:
         with open(scanner_file, 'w') as f:
             f.write(content)
         
@@ -126,13 +137,12 @@ def update_basic_scanner(tickers: list, stats: dict):
             return {tickers[:50]}  # Fallback sample
 '''
     
-    # Find and replace the get_stock_universe method
-    import re
-    pattern = r'def get_stock_universe\(self\).*?return volatile_universe'
+    # Find and replace the get_stock_universe method (single pass)
+    content, replaced = BASIC_UNIVERSE_PATTERN.subn(
+        lambda _: new_method.rstrip() + '\n        \n        return volatile_universe', content, count=1
+    )
     
-    if re.search(pattern, content, re.DOTALL):
-        content = re.sub(pattern, new_method.strip() + '\n        \n        return volatile_universe', content, flags=re.DOTALL)
-        
+    if replaced:
         with open(scanner_file, 'w') as f:
             f.write(content)
         
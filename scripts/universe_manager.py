@@ -4,11 +4,149 @@ Browse, compare, and switch between multiple stock universes
 """
 
 import os
+import sys
 import json
-import pandas as pd
+import hashlib
+import importlib.util
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, TYPE_CHECKING
 import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from tabulate import tabulate
+except ImportError:
+    tabulate = None
+
+# pandas (and pyarrow through it) is imported inside the methods that need
+# it, so listing / viewing / activating universes starts up quickly
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Checked without importing: pyarrow is only used through pandas
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Read metadata.json files on a thread pool above this many universes
+PARALLEL_LOAD_THRESHOLD = 8
+
+# Rolled-up metadata of every universe, kept in base_dir
+INDEX_FILE = 'index.json'
+
+# Rows per chunk when streaming a CSV export
+EXPORT_CHUNK_ROWS = 50_000
+
+# Linux ioctl that makes dst share src's extents (reflink on Btrfs/XFS)
+FICLONE = 0x40049409
+
+
+def _copy_file_range(infd: int, outfd: int, size: int):
+    """In-kernel copy (Linux 4.5+); may reflink on filesystems that support it"""
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(infd, outfd, size - offset, offset, offset)
+        if copied == 0:
+            # Some filesystems report 0 instead of an error; never keep a short copy
+            raise OSError(f"copy_file_range stopped at {offset} of {size} bytes")
+        offset += copied
+
+
+def _ficlone(infd: int, outfd: int, size: int):
+    """O(1) copy-on-write clone of the whole file"""
+    if fcntl is None:
+        raise OSError("fcntl not available")
+    fcntl.ioctl(outfd, FICLONE, infd)
+
+
+def _sendfile(infd: int, outfd: int, size: int):
+    """In-kernel copy through sendfile"""
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(outfd, infd, offset, size - offset)
+        if sent == 0:
+            raise OSError(f"sendfile stopped at {offset} of {size} bytes")
+        offset += sent
+
+
+def _fast_copy(src: str, dst: str):
+    """
+    Copy a file like shutil.copy2, keeping the bytes in the kernel where possible
+    
+    Tries copy_file_range, a FICLONE reflink and sendfile in turn, falling
+    back to a userspace copy when none is supported (non-Linux, cross-device)
+    or a kernel path copies fewer than st_size bytes.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(infd).st_size
+        for method in (_copy_file_range, _ficlone, _sendfile):
+            try:
+                method(infd, outfd, size)
+                if os.fstat(outfd).st_size != size:
+                    raise OSError(f"{method.__name__} copied a short file")
+                break
+            except (OSError, AttributeError):
+                # Start the next attempt from an empty destination
+                os.ftruncate(outfd, 0)
+                os.lseek(outfd, 0, os.SEEK_SET)
+        else:
+            shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst)
+
+
+def _file_digest(path: str) -> Optional[bytes]:
+    """blake2b digest of a file's contents (None if it does not exist), for equality checks"""
+    try:
+        with open(path, 'rb') as f:
+            if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+                return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).digest()
+            return hashlib.blake2b(f.read(), digest_size=16).digest()
+    except FileNotFoundError:
+        return None
+
+
+def _format_table(rows: List[tuple], headers: List[str]) -> str:
+    """
+    Render rows as an aligned plain-text table
+    
+    Uses tabulate when installed (no pandas import needed), otherwise a
+    single DataFrame.to_string render. Floats are shown with one decimal.
+    """
+    if tabulate:
+        return tabulate(rows, headers=headers, tablefmt='plain', floatfmt='.1f')
+    
+    import pandas as pd
+    return pd.DataFrame(rows, columns=headers).to_string(index=False, float_format='%.1f')
+
+
+# Details page layout, filled from a universe's metadata with str.format_map
+_DETAIL_TEMPLATE = """
+{rule}
+UNIVERSE DETAILS: {name}
+{rule}
+
+Created: {created}
+Total Stocks: {total_stocks}
+Average Volatility: {avg_volatility:.2f}%
+Volatility Range: {min_volatility:.2f}% - {max_volatility:.2f}%
+Average Volume: {avg_volume:,}
+Average Market Cap: ${avg_market_cap_m:.1f}M
+Price Range: ${price_range[min]:.2f} - ${price_range[max]:.2f}
+
+Top 10 Stocks:
+{top_10}
+
+Directory: {directory}"""
 
 
 class UniverseManager:
@@ -17,6 +155,105 @@ class UniverseManager:
     def __init__(self, base_dir: str = 'universes'):
         self.base_dir = base_dir
         
+        # list_universes() result (plus a name -> universe lookup over the same
+        # dicts), valid while base_dir's mtime is unchanged
+        self._cache = None
+        self._cache_key = None
+        self._by_name = {}
+        # Parsed metadata.json per path, keyed by the file's mtime
+        self._metadata_cache = {}
+        # Rendered show_universes() table as (list cache key, text)
+        self._table_cache = None
+        # Rendered details page per universe name as (metadata.json mtime, text)
+        self._details_cache = {}
+    
+    def invalidate(self):
+        """Drop the cached universe list and rendered views so the next call rescans base_dir"""
+        self._cache = None
+        self._cache_key = None
+        self._by_name = {}
+        self._table_cache = None
+        self._details_cache = {}
+    
+    def _load_metadata(self, metadata_file: str) -> Dict:
+        """Parse a metadata.json, reusing the previous parse if the file is unchanged"""
+        # Open first and stat the descriptor: a missing file raises
+        # FileNotFoundError here without a separate exists() check
+        with open(metadata_file, 'rb') as f:
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+            cached = self._metadata_cache.get(metadata_file)
+            if cached is not None and cached[0] == mtime:
+                return dict(cached[1])
+            raw = f.read()
+        metadata = orjson.loads(raw) if orjson else json.loads(raw)
+        self._metadata_cache[metadata_file] = (mtime, metadata)
+        return dict(metadata)
+        
+    def _read_universe_df(self, universe: Dict, columns: Optional[List[str]] = None) -> 'pd.DataFrame':
+        """
+        Load a universe's dataset, optionally only some columns
+        
+        Prefers the columnar universe_data.parquet copy (only the requested
+        columns are read from disk) and falls back to universe_data.csv for
+        universes saved without pyarrow.
+        """
+        import pandas as pd
+        parquet_file = os.path.join(universe['directory'], 'universe_data.parquet')
+        if PYARROW_AVAILABLE and os.path.exists(parquet_file):
+            return pd.read_parquet(parquet_file, columns=columns, engine='pyarrow')
+        return pd.read_csv(os.path.join(universe['directory'], 'universe_data.csv'), usecols=columns)
+    
+    def _ticker_index(self, universe: Dict) -> 'pd.Index':
+        """
+        All tickers in a universe as a pd.Index
+        
+        Uses the all_tickers list from metadata.json when present (universes
+        saved before it was added fall back to the dataset's ticker column).
+        The index is memoized on the cached universe dict.
+        """
+        import pandas as pd
+        if '_ticker_index' not in universe:
+            tickers = universe.get('all_tickers')
+            if tickers is None:
+                tickers = self._read_tickers(universe)
+            universe['_ticker_index'] = pd.Index(tickers)
+        return universe['_ticker_index']
+    
+    def _read_tickers(self, universe: Dict) -> List[str]:
+        """Ticker column of a universe's dataset, without building a full DataFrame"""
+        csv_file = os.path.join(universe['directory'], 'universe_data.csv')
+        parquet_file = os.path.join(universe['directory'], 'universe_data.parquet')
+        if PYARROW_AVAILABLE and not os.path.exists(parquet_file):
+            # pyarrow's multi-threaded CSV reader only converts the projected column
+            import pyarrow.csv as pacsv
+            table = pacsv.read_csv(csv_file,
+                                   read_options=pacsv.ReadOptions(use_threads=True),
+                                   convert_options=pacsv.ConvertOptions(include_columns=['ticker']))
+            return table.column('ticker').to_pylist()
+        return self._read_universe_df(universe, columns=['ticker'])['ticker'].tolist()
+    
+    def migrate_csv_to_parquet(self) -> int:
+        """Write a universe_data.parquet copy for every universe that only has CSV"""
+        import pandas as pd
+        if not PYARROW_AVAILABLE:
+            print("pyarrow is not installed - cannot write Parquet files")
+            return 0
+        
+        migrated = 0
+        for universe in self.list_universes():
+            parquet_file = os.path.join(universe['directory'], 'universe_data.parquet')
+            csv_file = os.path.join(universe['directory'], 'universe_data.csv')
+            if os.path.exists(parquet_file) or not os.path.exists(csv_file):
+                continue
+            
+            # Same codec as universe_builder.save_universe
+            pd.read_csv(csv_file).to_parquet(parquet_file, engine='pyarrow', compression='zstd', index=False)
+            migrated += 1
+            print(f"✓ Migrated {universe['name']}")
+        
+        print(f"✓ Migrated {migrated} universe(s) to Parquet")
+        return migrated
+    
     def list_universes(self) -> List[Dict]:
         """List all available universes"""
         
@@ -24,32 +261,140 @@ class UniverseManager:
             print(f"No universes directory found at: {self.base_dir}")
             return []
         
-        universes = []
+        # Adding or removing a universe directory bumps base_dir's mtime
+        key = (self.base_dir, os.stat(self.base_dir).st_mtime_ns)
+        if self._cache is not None and key == self._cache_key:
+            return self._cache
+        
+        stamp = self._index_stamp()
+        universes = self._read_index(stamp)
+        if universes is None:
+            universes = self._scan_universes()
+            try:
+                self.rebuild_index(universes, stamp)
+                # Writing the index touched base_dir
+                key = (self.base_dir, os.stat(self.base_dir).st_mtime_ns)
+            except OSError:
+                # Read-only or shared base_dir: listing still works without the index
+                pass
+        
+        self._cache = universes
+        self._cache_key = key
+        self._by_name = {u['name']: u for u in universes}
+        return universes
+    
+    def _index_stamp(self) -> List[list]:
+        """
+        [name, metadata.json mtime_ns] for every universe directory, sorted by name
+        
+        index.json is only trusted when its stored stamp matches: an added or
+        removed universe, a directory whose metadata.json is not written yet
+        (mtime None) and an edited metadata.json all change it. One stat per
+        universe, no reads or parses.
+        """
+        stamp = []
+        with os.scandir(self.base_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('universe_') and entry.is_dir(follow_symlinks=False):
+                    try:
+                        mtime = os.stat(os.path.join(entry.path, 'metadata.json')).st_mtime_ns
+                    except FileNotFoundError:
+                        mtime = None
+                    stamp.append([entry.name, mtime])
+        stamp.sort()
+        return stamp
+    
+    def _read_index(self, stamp: List[list]) -> Optional[List[Dict]]:
+        """Universes from index.json, or None if it is missing, unreadable or stale"""
+        index_file = os.path.join(self.base_dir, INDEX_FILE)
+        try:
+            with open(index_file, 'rb') as f:
+                raw = f.read()
+            index = orjson.loads(raw) if orjson else json.loads(raw)
+            if index['stamp'] != stamp:
+                return None
+            universes = []
+            for name, metadata in index['universes'].items():
+                metadata['directory'] = os.path.join(self.base_dir, name)
+                metadata['name'] = name
+                universes.append(metadata)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Missing, corrupt or old-format index - rescan and rewrite it
+            return None
+        return universes
+    
+    def rebuild_index(self, universes: Optional[List[Dict]] = None, stamp: Optional[List[list]] = None):
+        """
+        Roll every universe's metadata up into base_dir/index.json
         
-        # Find all universe directories
-        for item in os.listdir(self.base_dir):
-            universe_path = os.path.join(self.base_dir, item)
-            
-            if os.path.isdir(universe_path) and item.startswith('universe_'):
-                metadata_file = os.path.join(universe_path, 'metadata.json')
-                
-                if os.path.exists(metadata_file):
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                    
-                    metadata['directory'] = universe_path
-                    metadata['name'] = item
-                    universes.append(metadata)
+        Called after a universe is created, activated or deleted. Written
+        atomically with the stamp it was built from; the stamp is taken
+        before the scan, so a metadata.json written mid-scan leaves the index
+        stale rather than wrongly fresh.
+        """
+        if stamp is None:
+            stamp = self._index_stamp()
+        if universes is None:
+            universes = self._scan_universes()
+        
+        index = {
+            'stamp': stamp,
+            'universes': {u['name']: {k: v for k, v in u.items()
+                                      if k not in ('directory', 'name') and not k.startswith('_')}
+                          for u in universes}
+        }
+        # A temp file of our own, so concurrent rebuilds cannot truncate each other's
+        fd, tmp_path = tempfile.mkstemp(prefix=f'{INDEX_FILE}.', suffix='.tmp', dir=self.base_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(index) if orjson else json.dumps(index).encode())
+            os.chmod(tmp_path, 0o644)  # mkstemp creates it owner-only
+            os.replace(tmp_path, os.path.join(self.base_dir, INDEX_FILE))
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _scan_universes(self) -> List[Dict]:
+        """Read every universe_*/metadata.json under base_dir, newest first"""
+        
+        # Find all universe directories (scandir entries carry the file type,
+        # so no extra stat per entry for the directory check)
+        with os.scandir(self.base_dir) as entries:
+            candidates = [(entry.name, entry.path) for entry in entries
+                          if entry.name.startswith('universe_') and entry.is_dir(follow_symlinks=False)]
+        
+        def load(candidate):
+            name, path = candidate
+            # Just try the read - metadata.json is almost always there
+            try:
+                metadata = self._load_metadata(os.path.join(path, 'metadata.json'))
+            except FileNotFoundError:
+                return None
+            metadata['directory'] = path
+            metadata['name'] = name
+            return metadata
+        
+        # Overlap the small file reads once there are enough of them to pay for a pool
+        if len(candidates) > PARALLEL_LOAD_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=min(32, len(candidates))) as pool:
+                loaded = list(pool.map(load, candidates))
+        else:
+            loaded = [load(candidate) for candidate in candidates]
+        universes = [metadata for metadata in loaded if metadata is not None]
         
         # Sort by creation date (newest first)
         universes.sort(key=lambda x: x['created'], reverse=True)
         
         return universes
     
-    def show_universes(self):
+    def show_universes(self, universes: Optional[List[Dict]] = None):
         """Display all universes in a formatted table"""
         
-        universes = self.list_universes()
+        if universes is None:
+            universes = self.list_universes()
         
         if not universes:
             print("No universes found. Run universe_builder.py to create one.")
@@ -59,24 +404,55 @@ class UniverseManager:
         print(f"AVAILABLE STOCK UNIVERSES ({len(universes)} total)")
         print(f"{'='*100}\n")
         
-        print(f"{'#':<4} {'Created':<20} {'Stocks':<8} {'Avg Vol':<10} {'Top Stock':<10} {'Directory':<30}")
-        print("-" * 100)
-        
-        for idx, universe in enumerate(universes, 1):
-            created = universe['created']
-            total = universe['total_stocks']
-            avg_vol = f"{universe['avg_volatility']:.1f}%"
-            top_stock = universe['top_10_tickers'][0] if universe['top_10_tickers'] else 'N/A'
-            directory = universe['name']
-            
-            print(f"{idx:<4} {created:<20} {total:<8} {avg_vol:<10} {top_stock:<10} {directory:<30}")
+        # The table only changes when the cached list does
+        cached = universes is self._cache
+        if cached and self._table_cache is not None and self._table_cache[0] == self._cache_key:
+            table = self._table_cache[1]
+        else:
+            rows = [(idx, universe['created'], universe['total_stocks'], universe['avg_volatility'],
+                     (universe['top_10_tickers'] or ['N/A'])[0], universe['name'])
+                    for idx, universe in enumerate(universes, 1)]
+            headers = ['#', 'Created', 'Stocks', 'Avg Vol %', 'Top Stock', 'Directory']
+            table = _format_table(rows, headers)
+            if cached:
+                self._table_cache = (self._cache_key, table)
+        print(table)
         
         print("\n")
     
-    def get_universe_details(self, universe_id: int = None, universe_name: str = None):
+    def get_universe_details(self, universe_id: int = None, universe_name: str = None,
+                             universes: Optional[List[Dict]] = None):
         """Get detailed information about a specific universe"""
         
-        universes = self.list_universes()
+        universe = self._resolve(universes, universe_id, universe_name)
+        if universe is None:
+            return None
+        
+        # Re-render only when metadata.json has been rewritten since the last view
+        metadata_file = os.path.join(universe['directory'], 'metadata.json')
+        try:
+            mtime = os.stat(metadata_file).st_mtime_ns
+        except FileNotFoundError:
+            print(f"Universe not found: {universe['name']}")
+            return None
+        cached = self._details_cache.get(universe['name'])
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, self._render_details(universe, metadata_file))
+            self._details_cache[universe['name']] = cached
+        sys.stdout.write(cached[1] + '\n')
+        
+        return universe
+    
+    def _resolve(self, universes: Optional[List[Dict]] = None, universe_id: int = None,
+                 universe_name: str = None) -> Optional[Dict]:
+        """
+        Look up a universe by 1-based ID or by name, printing why if it can't be found
+        
+        Pass the list the caller already has (e.g. the one just shown) to skip
+        another list_universes() call.
+        """
+        if universes is None:
+            universes = self.list_universes()
         
         if not universes:
             print("No universes found.")
@@ -84,64 +460,41 @@ class UniverseManager:
         
         # Get universe by ID or name
         if universe_id:
-            if universe_id > len(universes) or universe_id < 1:
+            if not 1 <= universe_id <= len(universes):
                 print(f"Invalid universe ID: {universe_id}")
                 return None
-            universe = universes[universe_id - 1]
+            return universes[universe_id - 1]
         elif universe_name:
-            universe = next((u for u in universes if u['name'] == universe_name), None)
+            by_name = self._by_name if universes is self._cache else {u['name']: u for u in universes}
+            universe = by_name.get(universe_name)
             if not universe:
                 print(f"Universe not found: {universe_name}")
-                return None
+            return universe
         else:
             print("Please provide universe_id or universe_name")
             return None
-        
-        print(f"\n{'='*80}")
-        print(f"UNIVERSE DETAILS: {universe['name']}")
-        print(f"{'='*80}\n")
-        
-        print(f"Created: {universe['created']}")
-        print(f"Total Stocks: {universe['total_stocks']}")
-        print(f"Average Volatility: {universe['avg_volatility']:.2f}%")
-        print(f"Volatility Range: {universe['min_volatility']:.2f}% - {universe['max_volatility']:.2f}%")
-        print(f"Average Volume: {universe['avg_volume']:,}")
-        print(f"Average Market Cap: ${universe['avg_market_cap']/1e6:.1f}M")
-        print(f"Price Range: ${universe['price_range']['min']:.2f} - ${universe['price_range']['max']:.2f}")
-        
-        print(f"\nTop 10 Stocks:")
-        for i, ticker in enumerate(universe['top_10_tickers'], 1):
-            print(f"  {i}. {ticker}")
-        
-        print(f"\nDirectory: {universe['directory']}")
-        
-        return universe
     
-    def activate_universe(self, universe_id: int = None, universe_name: str = None):
+    def _render_details(self, universe: Dict, metadata_file: str) -> str:
+        """Details page for a universe, from the current contents of its metadata.json"""
+        universe = {**universe, **self._load_metadata(metadata_file)}
+        
+        top_10 = '\n'.join(f"  {i}. {ticker}" for i, ticker in enumerate(universe['top_10_tickers'], 1))
+        return _DETAIL_TEMPLATE.format_map({
+            **universe,
+            'rule': '=' * 80,
+            'avg_market_cap_m': universe['avg_market_cap'] / 1e6,
+            'top_10': top_10
+        })
+    
+    def activate_universe(self, universe_id: int = None, universe_name: str = None,
+                          universes: Optional[List[Dict]] = None):
         """
         Activate a universe by copying its universe.py to custom_universe.py
         This makes scanners use this universe
         """
         
-        universes = self.list_universes()
-        
-        if not universes:
-            print("No universes found.")
-            return False
-        
-        # Get universe
-        if universe_id:
-            if universe_id > len(universes) or universe_id < 1:
-                print(f"Invalid universe ID: {universe_id}")
-                return False
-            universe = universes[universe_id - 1]
-        elif universe_name:
-            universe = next((u for u in universes if u['name'] == universe_name), None)
-            if not universe:
-                print(f"Universe not found: {universe_name}")
-                return False
-        else:
-            print("Please provide universe_id or universe_name")
+        universe = self._resolve(universes, universe_id, universe_name)
+        if universe is None:
             return False
         
         # Copy universe.py to custom_universe.py
@@ -152,14 +505,32 @@ class UniverseManager:
             print(f"Error: universe.py not found in {universe['directory']}")
             return False
         
-        # Backup current custom_universe.py if it exists
+        # Newer universes keep their tickers in a universe.json sidecar next to universe.py
+        source_data = os.path.splitext(source)[0] + '.json'
+        destination_data = os.path.splitext(destination)[0] + '.json'
+        
+        # Nothing to do if the active files already hold this universe
+        if all(_file_digest(src) == _file_digest(dst)
+               for src, dst in ((source, destination), (source_data, destination_data))):
+            print(f"✓ Already active: {universe['name']}")
+            return True
+        
+        # Backup current custom_universe.py (and its sidecar) if it exists
         if os.path.exists(destination):
             backup = f'custom_universe_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.py'
-            shutil.copy2(destination, backup)
+            _fast_copy(destination, backup)
+            if os.path.exists(destination_data):
+                _fast_copy(destination_data, os.path.splitext(backup)[0] + '.json')
             print(f"✓ Backed up current universe to: {backup}")
         
-        # Copy new universe
-        shutil.copy2(source, destination)
+        # Copy new universe. Replace rather than overwrite in place: save_universe
+        # hard-links custom_universe.py to its universe.py, which must stay intact
+        for src, dst in ((source, destination), (source_data, destination_data)):
+            if os.path.exists(src):
+                _fast_copy(src, f'{dst}.tmp')
+                os.replace(f'{dst}.tmp', dst)
+        self.invalidate()
+        self.rebuild_index()
         
         print(f"\n{'='*80}")
         print(f"✓ ACTIVATED UNIVERSE: {universe['name']}")
@@ -172,68 +543,52 @@ class UniverseManager:
         
         return True
     
-    def compare_universes(self, id1: int, id2: int):
+    def compare_universes(self, id1: int, id2: int, universes: Optional[List[Dict]] = None):
         """Compare two universes side by side"""
+        if universes is None:
+            universes = self.list_universes()
         
-        universes = self.list_universes()
-        
-        if id1 > len(universes) or id2 > len(universes) or id1 < 1 or id2 < 1:
-            print("Invalid universe IDs")
+        u1 = self._resolve(universes, id1)
+        u2 = self._resolve(universes, id2) if u1 else None
+        if u2 is None:
             return
         
-        u1 = universes[id1 - 1]
-        u2 = universes[id2 - 1]
-        
-        print(f"\n{'='*80}")
-        print("UNIVERSE COMPARISON")
-        print(f"{'='*80}\n")
-        
-        print(f"{'Metric':<25} {'Universe 1':<25} {'Universe 2':<25}")
-        print("-" * 80)
-        print(f"{'Name':<25} {u1['name']:<25} {u2['name']:<25}")
-        print(f"{'Created':<25} {u1['created']:<25} {u2['created']:<25}")
-        print(f"{'Total Stocks':<25} {u1['total_stocks']:<25} {u2['total_stocks']:<25}")
-        print(f"{'Avg Volatility':<25} {u1['avg_volatility']:.2f}%{'':<22} {u2['avg_volatility']:.2f}%")
-        print(f"{'Max Volatility':<25} {u1['max_volatility']:.2f}%{'':<22} {u2['max_volatility']:.2f}%")
-        print(f"{'Avg Volume':<25} {u1['avg_volume']:,}{'':<15} {u2['avg_volume']:,}")
-        
-        # Find common stocks
-        df1 = pd.read_csv(os.path.join(u1['directory'], 'universe_data.csv'))
-        df2 = pd.read_csv(os.path.join(u2['directory'], 'universe_data.csv'))
-        
-        common = set(df1['ticker']).intersection(set(df2['ticker']))
-        unique_u1 = set(df1['ticker']) - set(df2['ticker'])
-        unique_u2 = set(df2['ticker']) - set(df1['ticker'])
-        
-        print(f"\n{'Common Stocks':<25} {len(common)}")
-        print(f"{'Unique to Universe 1':<25} {len(unique_u1)}")
-        print(f"{'Unique to Universe 2':<25} {len(unique_u2)}")
-        
-        if len(common) > 0:
-            print(f"\nSample Common Stocks: {', '.join(list(common)[:10])}")
+        table = _format_table([
+            ('Name', u1['name'], u2['name']),
+            ('Created', u1['created'], u2['created']),
+            ('Total Stocks', u1['total_stocks'], u2['total_stocks']),
+            ('Avg Volatility', f"{u1['avg_volatility']:.2f}%", f"{u2['avg_volatility']:.2f}%"),
+            ('Max Volatility', f"{u1['max_volatility']:.2f}%", f"{u2['max_volatility']:.2f}%"),
+            ('Avg Volume', f"{u1['avg_volume']:,}", f"{u2['avg_volume']:,}")
+        ], ['Metric', 'Universe 1', 'Universe 2'])
+        
+        # Find common stocks (Index set operations hash the ticker arrays in C)
+        idx1 = self._ticker_index(u1)
+        idx2 = self._ticker_index(u2)
+        common = idx1.intersection(idx2)
+        unique_u1 = idx1.difference(idx2)
+        unique_u2 = idx2.difference(idx1)
+        
+        # Build the whole report and write it once
+        lines = [
+            f"\n{'='*80}",
+            "UNIVERSE COMPARISON",
+            f"{'='*80}\n",
+            table,
+            f"\n{'Common Stocks':<25} {common.size}",
+            f"{'Unique to Universe 1':<25} {unique_u1.size}",
+            f"{'Unique to Universe 2':<25} {unique_u2.size}"
+        ]
+        if common.size > 0:
+            lines.append(f"\nSample Common Stocks: {', '.join(common[:10].tolist())}")
+        sys.stdout.write('\n'.join(lines) + '\n')
     
-    def delete_universe(self, universe_id: int = None, universe_name: str = None):
+    def delete_universe(self, universe_id: int = None, universe_name: str = None,
+                        universes: Optional[List[Dict]] = None):
         """Delete a universe (with confirmation)"""
         
-        universes = self.list_universes()
-        
-        if not universes:
-            print("No universes found.")
-            return False
-        
-        # Get universe
-        if universe_id:
-            if universe_id > len(universes) or universe_id < 1:
-                print(f"Invalid universe ID: {universe_id}")
-                return False
-            universe = universes[universe_id - 1]
-        elif universe_name:
-            universe = next((u for u in universes if u['name'] == universe_name), None)
-            if not universe:
-                print(f"Universe not found: {universe_name}")
-                return False
-        else:
-            print("Please provide universe_id or universe_name")
+        universe = self._resolve(universes, universe_id, universe_name)
+        if universe is None:
             return False
         
         # Confirmation
@@ -250,32 +605,44 @@ class UniverseManager:
             return False
         
         # Delete directory
-        import shutil
         shutil.rmtree(universe['directory'])
+        self.invalidate()
+        self.rebuild_index()
         
         print(f"✓ Deleted universe: {universe['name']}")
         return True
     
-    def export_universe(self, universe_id: int, output_format: str = 'csv'):
+    def export_universe(self, universe_id: int, output_format: str = 'csv',
+                        universes: Optional[List[Dict]] = None):
         """Export universe to different format"""
+        import pandas as pd
         
-        universes = self.list_universes()
-        
-        if universe_id > len(universes) or universe_id < 1:
-            print("Invalid universe ID")
+        universe = self._resolve(universes, universe_id)
+        if universe is None:
             return
         
-        universe = universes[universe_id - 1]
-        df = pd.read_csv(os.path.join(universe['directory'], 'universe_data.csv'))
-        
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         if output_format == 'csv':
+            # Stream CSV -> CSV in bounded chunks instead of holding the whole frame
             filename = f'universe_export_{timestamp}.csv'
-            df.to_csv(filename, index=False)
-        elif output_format == 'json':
+            source = os.path.join(universe['directory'], 'universe_data.csv')
+            with open(filename, 'w', newline='') as out:
+                for i, chunk in enumerate(pd.read_csv(source, chunksize=EXPORT_CHUNK_ROWS)):
+                    chunk.to_csv(out, index=False, header=(i == 0))
+            print(f"✓ Exported to: {filename}")
+            return
+        
+        df = self._read_universe_df(universe)
+        
+        if output_format == 'json':
             filename = f'universe_export_{timestamp}.json'
-            df.to_json(filename, orient='records', indent=2)
+            if orjson:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(df.to_dict(orient='records'),
+                                         option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                df.to_json(filename, orient='records', indent=2)
         elif output_format == 'excel':
             filename = f'universe_export_{timestamp}.xlsx'
             df.to_excel(filename, index=False, engine='openpyxl')
@@ -304,29 +671,32 @@ def main():
         
         choice = input("\nEnter choice (1-6): ").strip()
         
+        # One listing per menu action, shared by the table and the action it numbers
+        universes = manager.list_universes() if choice in ('1', '2', '3', '4', '5') else None
+        
         if choice == '1':
-            manager.show_universes()
+            manager.show_universes(universes)
         
         elif choice == '2':
-            manager.show_universes()
+            manager.show_universes(universes)
             universe_id = int(input("\nEnter universe # to view details: "))
-            manager.get_universe_details(universe_id=universe_id)
+            manager.get_universe_details(universe_id=universe_id, universes=universes)
         
         elif choice == '3':
-            manager.show_universes()
+            manager.show_universes(universes)
             universe_id = int(input("\nEnter universe # to activate: "))
-            manager.activate_universe(universe_id=universe_id)
+            manager.activate_universe(universe_id=universe_id, universes=universes)
         
         elif choice == '4':
-            manager.show_universes()
+            manager.show_universes(universes)
             id1 = int(input("\nEnter first universe #: "))
             id2 = int(input("Enter second universe #: "))
-            manager.compare_universes(id1, id2)
+            manager.compare_universes(id1, id2, universes=universes)
         
         elif choice == '5':
-            manager.show_universes()
+            manager.show_universes(universes)
             universe_id = int(input("\nEnter universe # to DELETE: "))
-            manager.delete_universe(universe_id=universe_id)
+            manager.delete_universe(universe_id=universe_id, universes=universes)
         
         elif choice == '6':
             print("Goodbye!")
@@ -8,24 +8,241 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Optional
-import time
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+try:
+    from scripts._disk_cache import cache_path, cache_load, cache_store
+    from scripts._njit_kernels import NUMBA_AVAILABLE, compute_metrics_nb
+    from scripts._scan_data import (
+        INFO_WORKERS, SCAN_CACHE_TTL, alpaca_data_feed, download_history, get_info, fetch_infos,
+        save_results
+    )
+except ImportError:  # Run directly from the scripts directory
+    from _disk_cache import cache_path, cache_load, cache_store
+    from _njit_kernels import NUMBA_AVAILABLE, compute_metrics_nb
+    from _scan_data import (
+        INFO_WORKERS, SCAN_CACHE_TTL, alpaca_data_feed, download_history, get_info, fetch_infos,
+        save_results
+    )
+
 # Load environment variables
 load_dotenv()
 
+# Strategy filters as single DataFrame.query expressions, so pandas can evaluate
+# each one in a fused pass (numexpr when installed) instead of one boolean
+# Series per comparison. Backticks quote the column names with % and $
+BREAKOUT_QUERY = 'abs(`day_change_%`) > 5 and vol_ratio > 1.5 and `atr_%` > 3'
+MOMENTUM_QUERY = "`week_change_%` > 10 and vol_regime == 'Accelerating' and vol_ratio > 1.2"
+HIGH_RISK_QUERY = ('1 <= price <= 10 and `annual_vol_%` > 70 and `atr_%` > 4 and '
+                   'avg_volume > 1000000 and `market_cap_$M` < 2000')
+
+# scan_market builds its DataFrame column-wise: text fields are object arrays,
+# share counts int64 and every other field float64 (None becomes NaN)
+SCAN_TEXT_FIELDS = ('ticker', 'vol_regime', 'vol_trend', 'exchange', 'sector')
+SCAN_INT_FIELDS = ('volume', 'avg_volume')
+
+# Alpaca market data: the multi-symbol bars endpoint takes up to 200 symbols
+# per request. SIP (consolidated) bars are queried 16 minutes back, the
+# delay free plans allow; IEX-only volume is a small slice of the real volume
+ALPACA_DATA_URL = 'https://data.alpaca.markets'
+ALPACA_BARS_CHUNK = 200
+ALPACA_SIP_DELAY = timedelta(minutes=16)
+
+# Default scan_market pre-filter, applied before any .info lookup. Names
+# outside it keep their bar metrics but get no quote fields (market cap etc.)
+PREFILTER_MIN_PRICE = 0.5
+PREFILTER_MAX_PRICE = 200
+PREFILTER_MIN_AVG_VOLUME = 100_000
+
+# Sector lists behind the expanded universe. Some tickers sit in more than one
+# list (COIN, WKHS, SNDL, ARM, RBLX); they are tagged with the first sector listed
+SECTOR_TICKERS = {
+    'Biotech': (
+        'SAVA', 'TBPH', 'APLD', 'DRUG', 'ABOS', 'BDTX', 'CGEM',
+        'DMAC', 'FBRX', 'IMMP', 'IRWD', 'MDGL', 'PRAX', 'VTRS',
+        'SRPT', 'BMRN', 'FOLD', 'RGNX', 'IONS', 'ALNY', 'VRTX',
+        'CRSP', 'EDIT', 'NTLA', 'BEAM', 'TGTX', 'KPTI'
+    ),
+    'Small Tech': (
+        'IONQ', 'QUBT', 'RGTI', 'SOFI', 'UPST', 'HOOD', 'OPEN', 'RKLB',
+        'ACHR', 'JOBY', 'LILM', 'EVTL', 'BIRD', 'PATH',
+        'SOUN', 'BBAI', 'BKSY', 'SPIR', 'ASTS', 'LUNR', 'SPCE',
+        'ASTR', 'MNTS', 'PLTR', 'SNOW', 'RBLX', 'U', 'DDOG'
+    ),
+    'Crypto': (
+        'MARA', 'RIOT', 'CLSK', 'CIFR', 'BITF', 'HUT', 'BTBT', 'COIN',
+        'MSTR', 'SOS', 'CAN', 'BTCS', 'GREE', 'WULF', 'IREN', 'CORZ',
+        'ANY', 'ARBK'
+    ),
+    'EV/Battery': (
+        'LCID', 'RIVN', 'WKHS', 'NKLA',
+        'CHPT', 'BLNK', 'EVGO', 'PLUG',
+        'FCEL', 'BLDP', 'BE', 'QS', 'SES', 'SLDP', 'MVST'
+    ),
+    'Cannabis': (
+        'TLRY', 'CGC', 'SNDL', 'ACB', 'CRON', 'OGI',
+        'CURLF', 'GTBIF', 'TCNNF', 'CRLBF', 'GRWG', 'SMG'
+    ),
+    'Meme/High Beta': (
+        'GME', 'AMC', 'BBBY', 'KOSS', 'CLOV',
+        'SKLZ', 'UWMC', 'RKT', 'CLNE', 'WKHS', 'BB', 'NOK', 'SNDL'
+    ),
+    'Penny Tech': (
+        'MVIS', 'LAZR', 'OUST', 'INVZ', 'AEYE', 'LIDR', 'KOPN',
+        'WIMI', 'GOTU', 'BTCT', 'NCTY', 'TIGR', 'FUBO', 'TALK'
+    ),
+    'Semiconductors': (
+        'AMD', 'NVDA', 'SMCI', 'AVGO', 'ARM', 'MRVL', 'ON', 'MU',
+        'AMAT', 'LRCX', 'KLAC', 'MPWR', 'WOLF', 'CRUS', 'SYNA', 'ALGM'
+    ),
+    'Recent IPOs': (
+        'ARM', 'RDDT', 'KVUE', 'FBIN', 'CART', 'MNDY', 'IOT', 'CWAN',
+        'DOCN', 'BILL', 'S', 'DASH', 'ABNB', 'COIN', 'RBLX'
+    )
+}
+
+# Deduplicated once at import, in a stable (sorted) order
+_UNIVERSE = tuple(sorted({t for tickers in SECTOR_TICKERS.values() for t in tickers}))
+
+# Ticker -> sector; built from the last list back so the first listing wins
+_SECTOR_MAP = {t: sector for sector, tickers in reversed(SECTOR_TICKERS.items()) for t in tickers}
+
+
+def _multi_vol(r: np.ndarray) -> Dict[str, float]:
+    """
+    Annualized volatility (%) of a daily log-return array over several trailing windows
+    
+    Slices the same contiguous array for every window instead of running a
+    separate pandas tail().std() per timeframe. weekly/monthly/quarterly are
+    NaN when the history is shorter than the window; recent (10d) and 30d
+    use whatever is available, and annual covers the full history.
+    """
+    scale = np.sqrt(252) * 100
+    vols = {'annual': r.std(ddof=1) * scale}
+    for name, window in (('weekly', 5), ('monthly', 20), ('quarterly', 60)):
+        vols[name] = r[-window:].std(ddof=1) * scale if r.size >= window else np.nan
+    vols['recent'] = r[-10:].std(ddof=1) * scale
+    vols['30d'] = r[-30:].std(ddof=1) * scale
+    return vols
+
+
+def _array_metrics(open_, high, low, close, volume) -> tuple:
+    """
+    NumPy twin of compute_metrics_nb, used when numba is not installed
+    
+    Takes the same float32-price / float64-volume arrays and returns the
+    same tuple; without the JIT, whole-array NumPy operations beat the
+    kernel's interpreted loops.
+    """
+    # One log-return array shared by every volatility window, in float64
+    # like the kernel's
+    r = np.diff(np.log(close, dtype=np.float64))
+    r = r[np.isfinite(r)]
+    vols = _multi_vol(r)
+    
+    # True range: the first bar has no previous close, so the 14-bar
+    # mean over the tail never needs it
+    prev_c = close[:-1]
+    true_range = np.maximum.reduce([high[1:] - low[1:], np.abs(high[1:] - prev_c), np.abs(low[1:] - prev_c)])
+    
+    return (
+        abs(np.expm1(r[-1])) * 100 if r.size >= 1 else 0.0,
+        vols['weekly'], vols['monthly'], vols['quarterly'], vols['annual'],
+        vols['recent'], vols['30d'],
+        true_range[-14:].mean(),
+        (close[-1] - open_[-1]) / open_[-1] * 100,
+        (high[-1] - low[-1]) / open_[-1] * 100,
+        close[-20:].mean(),
+        close[-50:].mean() if close.size >= 50 else np.nan,
+        volume[-20:].mean()
+    )
+
+
+def _columns(frame: pd.DataFrame, *names: str) -> List[np.ndarray]:
+    """Columns of frame as float64 arrays, for the strategy scores"""
+    return [frame[name].to_numpy(dtype=np.float64) for name in names]
+
+
+# Strategy scores, as whole-column NumPy arithmetic. Weekly/monthly volatility
+# are NaN where the history is too short for the window and fall back to annual
+def _breakout_score(frame: pd.DataFrame) -> np.ndarray:
+    """Breakout score: the day's move, volume surge and ATR"""
+    dc, vr, atr = _columns(frame, 'day_change_%', 'vol_ratio', 'atr_%')
+    return np.abs(dc) * 0.3 + vr * 6 + atr * 4
+
+
+def _momentum_score(frame: pd.DataFrame) -> np.ndarray:
+    """Momentum score: the week's move, weekly volatility and volume surge"""
+    wc, wv, av, vr = _columns(frame, 'week_change_%', 'weekly_vol_%', 'annual_vol_%', 'vol_ratio')
+    return wc * 0.4 + np.where(np.isnan(wv), av, wv) * 0.3 + vr * 9
+
+
+def _aggression_score(frame: pd.DataFrame) -> np.ndarray:
+    """Aggression score: annual and monthly volatility and ATR"""
+    av, mv, atr = _columns(frame, 'annual_vol_%', 'monthly_vol_%', 'atr_%')
+    return av * 0.35 + np.where(np.isnan(mv), av, mv) * 0.35 + atr * 1.5
+
+
+def _rows_to_frame(rows: List[Dict]) -> pd.DataFrame:
+    """
+    Scan rows (all with the same keys) as a DataFrame built from typed columns
+    
+    Each field gets one preallocated array filled by row index, so pandas
+    skips per-column dtype inference over dicts and columns that are None
+    throughout come out as float NaN rather than object.
+    """
+    n = len(rows)
+    cols = {}
+    for name in rows[0]:
+        if name in SCAN_TEXT_FIELDS:
+            cols[name] = np.empty(n, dtype=object)
+        elif name in SCAN_INT_FIELDS:
+            cols[name] = np.zeros(n, dtype=np.int64)
+        else:
+            cols[name] = np.full(n, np.nan)
+    
+    for i, row in enumerate(rows):
+        for name, value in row.items():
+            if value is not None:
+                cols[name][i] = value
+    
+    return pd.DataFrame(cols, copy=False)
+
+
+def _intraday_vol(intraday: pd.DataFrame) -> Optional[float]:
+    """Standard deviation (%) of 1-minute close returns; None for 10 bars or fewer"""
+    if intraday.empty or len(intraday) <= 10:
+        return None
+    return intraday['Close'].pct_change().dropna().std() * 100
+
+
 class AdvancedVolatilityScanner:
     """Advanced scanner with multiple strategies and data sources"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, use_cache: bool = True):
         # Load from environment or use provided key
         self.api_key = api_key or os.getenv('ALPACA_API_KEY')
         self.api_secret = os.getenv('ALPACA_SECRET_KEY')
         self.base_url = os.getenv('ALPACA_BASE_URL', 'https://paper-api.alpaca.markets')
+        self.data_url = os.getenv('ALPACA_DATA_URL', ALPACA_DATA_URL)
+        self.data_feed = alpaca_data_feed()
         self.finviz_base = "https://finviz.com/screener.ashx"
+        self.use_cache = use_cache
+        
+        # get_real_time_metrics rows: (ticker, compute_intraday) -> (monotonic time, row items)
+        self._metrics_cache = {}
+        
+        # Keep-alive session for the Alpaca bars requests; 429/5xx are retried with backoff
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=8, max_retries=retry))
         
     def get_finviz_screener(
         self,
@@ -45,120 +262,127 @@ class AdvancedVolatilityScanner:
     def get_expanded_universe(self) -> List[str]:
         """Expanded universe of volatile stocks across sectors"""
         
-        biotech = [
-            'SAVA', 'TBPH', 'APLD', 'DRUG', 'ABOS', 'BDTX', 'CGEM',
-            'DMAC', 'FBRX', 'IMMP', 'IRWD', 'MDGL', 'PRAX', 'VTRS',
-            'SRPT', 'BMRN', 'FOLD', 'RGNX', 'IONS', 'ALNY', 'VRTX',
-            'CRSP', 'EDIT', 'NTLA', 'BEAM', 'TGTX', 'KPTI'
-        ]
-        
-        small_tech = [
-            'IONQ', 'QUBT', 'RGTI', 'SOFI', 'UPST', 'HOOD', 'OPEN', 'RKLB',
-            'ACHR', 'JOBY', 'LILM', 'EVTL', 'BIRD', 'PATH',
-            'SOUN', 'BBAI', 'BKSY', 'SPIR', 'ASTS', 'LUNR', 'SPCE',
-            'ASTR', 'MNTS', 'PLTR', 'SNOW', 'RBLX', 'U', 'DDOG'
-        ]
-        
-        crypto_related = [
-            'MARA', 'RIOT', 'CLSK', 'CIFR', 'BITF', 'HUT', 'BTBT', 'COIN',
-            'MSTR', 'SOS', 'CAN', 'BTCS', 'GREE', 'WULF', 'IREN', 'CORZ',
-            'ANY', 'ARBK'
-        ]
-        
-        ev_battery = [
-            'LCID', 'RIVN', 'WKHS', 'NKLA',
-            'CHPT', 'BLNK', 'EVGO', 'PLUG',
-            'FCEL', 'BLDP', 'BE', 'QS', 'SES', 'SLDP', 'MVST'
-        ]
-        
-        cannabis = [
-            'TLRY', 'CGC', 'SNDL', 'ACB', 'CRON', 'OGI',
-            'CURLF', 'GTBIF', 'TCNNF', 'CRLBF', 'GRWG', 'SMG'
-        ]
-        
-        meme_high_beta = [
-            'GME', 'AMC', 'BBBY', 'KOSS', 'CLOV',
-            'SKLZ', 'UWMC', 'RKT', 'CLNE', 'WKHS', 'BB', 'NOK', 'SNDL'
-        ]
-        
-        penny_tech = [
-            'MVIS', 'LAZR', 'OUST', 'INVZ', 'AEYE', 'LIDR', 'KOPN',
-            'WIMI', 'GOTU', 'BTCT', 'NCTY', 'TIGR', 'FUBO', 'TALK'
-        ]
-        
-        semiconductors = [
-            'AMD', 'NVDA', 'SMCI', 'AVGO', 'ARM', 'MRVL', 'ON', 'MU',
-            'AMAT', 'LRCX', 'KLAC', 'MPWR', 'WOLF', 'CRUS', 'SYNA', 'ALGM'
-        ]
-        
-        recent_ipos = [
-            'ARM', 'RDDT', 'KVUE', 'FBIN', 'CART', 'MNDY', 'IOT', 'CWAN',
-            'DOCN', 'BILL', 'S', 'DASH', 'ABNB', 'COIN', 'RBLX'
-        ]
-        
-        # Combine all
-        all_tickers = list(set(
-            biotech + small_tech + crypto_related + ev_battery + 
-            cannabis + meme_high_beta + penny_tech + semiconductors + recent_ipos
-        ))
+        # Deduplicated at import time (see SECTOR_TICKERS)
+        all_tickers = list(_UNIVERSE)
         
         return all_tickers
     
-    def get_real_time_metrics(self, ticker: str) -> Dict:
-        """Get comprehensive real-time metrics for a stock"""
-        try:
-            stock = yf.Ticker(ticker)
-            
-            # Get real-time quote
-            info = stock.info
-            
-            # Historical data for calculations
-            hist = stock.history(period='3mo', interval='1d')
-            
-            if hist.empty or len(hist) < 20:
+    def get_real_time_metrics(self, ticker: str, compute_intraday: bool = False) -> Dict:
+        """
+        Get comprehensive real-time metrics for a stock
+        
+        The 1-minute bars behind intraday_vol_% cost a separate request and
+        none of the strategies use them, so they are only downloaded when
+        compute_intraday is set (otherwise the column is None). Rows are
+        reused for SCAN_CACHE_TTL seconds, the same window as the scan cache;
+        failed lookups are not kept.
+        """
+        key = (ticker, compute_intraday)
+        now = time.monotonic()
+        cached = self._metrics_cache.get(key)
+        if cached is None or now - cached[0] > SCAN_CACHE_TTL:
+            try:
+                cached = (now, self._fetch_metrics(ticker, compute_intraday))
+            except Exception as e:
+                print(f"Error with {ticker}: {str(e)}")
                 return None
-            
-            # Recent minute data for intraday volatility
+            self._metrics_cache[key] = cached
+        items = cached[1]
+        return dict(items) if items is not None else None
+    
+    def _fetch_metrics(self, ticker: str, compute_intraday: bool) -> Optional[tuple]:
+        """Metric row for ticker as an immutable tuple of (column, value) pairs"""
+        stock = yf.Ticker(ticker)
+        
+        # Get real-time quote
+        info = stock.info
+        
+        # Historical data for calculations
+        hist = stock.history(period='3mo', interval='1d')
+        
+        # Recent minute data for intraday volatility
+        intraday = None
+        if compute_intraday:
             try:
                 intraday = stock.history(period='1d', interval='1m')
             except:
                 intraday = pd.DataFrame()
+        
+        metrics = self._compute_metrics_from_hist(ticker, hist, info, intraday)
+        return tuple(metrics.items()) if metrics is not None else None
+    
+    def get_intraday_vol(self, ticker: str) -> Optional[float]:
+        """Standard deviation (%) of today's 1-minute returns, or None without enough bars"""
+        try:
+            intraday = yf.Ticker(ticker).history(period='1d', interval='1m')
+        except Exception as e:
+            print(f"Error fetching intraday bars for {ticker}: {str(e)}")
+            return None
+        return _intraday_vol(intraday)
+    
+    def _compute_metrics_from_hist(
+        self,
+        ticker: str,
+        hist: pd.DataFrame,
+        info: Dict,
+        intraday: Optional[pd.DataFrame] = None
+    ) -> Optional[Dict]:
+        """
+        Compute the full metric row for one ticker from already-downloaded bars
+        
+        hist holds 3 months of daily OHLCV and intraday (optional) the
+        current session's 1-minute bars; info supplies the quote fields
+        (beta, market cap, 52-week range, exchange) and may be empty.
+        """
+        metrics = self._fast_metrics(ticker, hist, intraday)
+        if metrics is None:
+            return None
+        return self._enrich_with_info(metrics, info, hist['Close'].iloc[-1])
+    
+    def _fast_metrics(
+        self,
+        ticker: str,
+        hist: pd.DataFrame,
+        intraday: Optional[pd.DataFrame] = None
+    ) -> Optional[Dict]:
+        """
+        Price, volume and volatility metrics computed from bars alone
+        
+        Needs no quote info, so scan_market can run it for every ticker and
+        pre-filter before paying for any .info lookups.
+        """
+        try:
+            # Every window below is gated on the bar count, read once
+            n = hist.shape[0]
+            if n < 20:
+                return None
             
-            current_price = hist['Close'].iloc[-1]
-            
-            # Calculate returns
-            returns = hist['Close'].pct_change().dropna()
-            
-            # Multi-timeframe volatility calculations
-            # Daily volatility (last 1 day - really just the last close change)
-            if len(returns) >= 1:
-                daily_vol = abs(returns.iloc[-1]) * 100
-            else:
-                daily_vol = 0
-            
-            # Weekly volatility (last 5 days annualized)
-            if len(returns) >= 5:
-                weekly_returns = returns.tail(5)
-                weekly_vol = weekly_returns.std() * np.sqrt(252) * 100
-            else:
-                weekly_vol = None
-            
-            # Monthly volatility (last 20 days annualized)
-            if len(returns) >= 20:
-                monthly_returns = returns.tail(20)
-                monthly_vol = monthly_returns.std() * np.sqrt(252) * 100
-            else:
-                monthly_vol = None
+            # Pull the columns out once as contiguous arrays. Prices go in as
+            # float32 - plenty for metrics reported to 2 decimals, and half the
+            # memory traffic through the kernel - while volume stays float64 so
+            # share counts come back exact
+            O, H, L, C = (hist[col].to_numpy(dtype=np.float32)
+                          for col in ('Open', 'High', 'Low', 'Close'))
+            V = hist['Volume'].to_numpy(dtype=np.float64)
+            current_price = float(hist['Close'].iloc[-1])
             
-            # Quarterly volatility (last 60 days annualized)
-            if len(returns) >= 60:
-                quarterly_returns = returns.tail(60)
-                quarterly_vol = quarterly_returns.std() * np.sqrt(252) * 100
-            else:
-                quarterly_vol = None
+            # One fused pass over the arrays: multi-timeframe volatility (weekly 5d,
+            # monthly 20d, quarterly 60d, annual, recent 10d, 30d), ATR, day
+            # move, moving averages and average volume. Results are widened back
+            # to Python floats before any rounding
+            kernel = compute_metrics_nb if NUMBA_AVAILABLE else _array_metrics
+            (daily_vol, weekly_vol, monthly_vol, quarterly_vol, hist_vol, recent_vol, vol_30d,
+             atr_14, day_change, day_range, ma_20, ma_50, avg_vol_20) = (
+                float(v) for v in kernel(O, H, L, C, V)
+            )
             
-            # Annual volatility (full history - standard metric)
-            hist_vol = returns.std() * np.sqrt(252) * 100
+            # Windows longer than the history come back as NaN
+            weekly_vol, monthly_vol, quarterly_vol = (
+                None if np.isnan(v) else v for v in (weekly_vol, monthly_vol, quarterly_vol)
+            )
+            if n < 50:
+                ma_50 = None
+            atr_pct = (atr_14 / current_price) * 100
             
             # Volatility trend analysis
             if weekly_vol and monthly_vol and quarterly_vol:
@@ -171,70 +395,24 @@ class AdvancedVolatilityScanner:
             else:
                 vol_regime = "Unknown"
             
-            # Recent volatility (last 10 days for comparison)
-            recent_vol = returns.tail(10).std() * np.sqrt(252) * 100
-            
-            # ATR
-            high_low = hist['High'] - hist['Low']
-            high_close = np.abs(hist['High'] - hist['Close'].shift())
-            low_close = np.abs(hist['Low'] - hist['Close'].shift())
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = ranges.max(axis=1)
-            atr_14 = true_range.rolling(14).mean().iloc[-1]
-            atr_pct = (atr_14 / current_price) * 100
-            
             # Intraday volatility
-            if not intraday.empty and len(intraday) > 10:
-                intraday_returns = intraday['Close'].pct_change().dropna()
-                intraday_vol = intraday_returns.std() * 100
-            else:
-                intraday_vol = None
-            
-            # Price action
-            day_change = ((current_price - hist['Open'].iloc[-1]) / hist['Open'].iloc[-1]) * 100
-            day_high = hist['High'].iloc[-1]
-            day_low = hist['Low'].iloc[-1]
-            day_range = ((day_high - day_low) / hist['Open'].iloc[-1]) * 100
-            
-            # Moving averages
-            ma_20 = hist['Close'].rolling(20).mean().iloc[-1]
-            ma_50 = hist['Close'].rolling(50).mean().iloc[-1] if len(hist) >= 50 else None
+            intraday_vol = _intraday_vol(intraday) if intraday is not None else None
             
             # Distance from MAs
             dist_from_ma20 = ((current_price - ma_20) / ma_20) * 100
             dist_from_ma50 = ((current_price - ma_50) / ma_50) * 100 if ma_50 else None
             
             # Volume analysis
-            avg_vol_20 = hist['Volume'].tail(20).mean()
-            current_vol = hist['Volume'].iloc[-1]
+            current_vol = V[-1]
             vol_ratio = current_vol / avg_vol_20 if avg_vol_20 > 0 else 0
             
             # Recent performance
-            week_change = ((current_price - hist['Close'].iloc[-5]) / hist['Close'].iloc[-5]) * 100 if len(hist) >= 5 else None
-            month_change = ((current_price - hist['Close'].iloc[-20]) / hist['Close'].iloc[-20]) * 100 if len(hist) >= 20 else None
+            # n >= 20 covers both lookbacks
+            week_change = ((current_price - float(C[-5])) / float(C[-5])) * 100
+            month_change = ((current_price - float(C[-20])) / float(C[-20])) * 100
             
             # Volatility trend (increasing or decreasing)
-            vol_10d = returns.tail(10).std() * np.sqrt(252) * 100
-            vol_30d = returns.tail(30).std() * np.sqrt(252) * 100
-            vol_trend = "Increasing" if vol_10d > vol_30d else "Decreasing"
-            
-            # Additional info
-            beta = info.get('beta', None)
-            market_cap = info.get('marketCap', 0)
-            short_ratio = info.get('shortRatio', None)
-            fifty_two_week_high = info.get('fiftyTwoWeekHigh', None)
-            fifty_two_week_low = info.get('fiftyTwoWeekLow', None)
-            
-            # Distance from 52-week high/low
-            if fifty_two_week_high:
-                dist_from_52w_high = ((current_price - fifty_two_week_high) / fifty_two_week_high) * 100
-            else:
-                dist_from_52w_high = None
-                
-            if fifty_two_week_low:
-                dist_from_52w_low = ((current_price - fifty_two_week_low) / fifty_two_week_low) * 100
-            else:
-                dist_from_52w_low = None
+            vol_trend = "Increasing" if recent_vol > vol_30d else "Decreasing"
             
             return {
                 'ticker': ticker,
@@ -261,22 +439,149 @@ class AdvancedVolatilityScanner:
                 'volume': int(current_vol),
                 'avg_volume': int(avg_vol_20),
                 'vol_ratio': round(vol_ratio, 2),
-                'beta': round(beta, 2) if beta else None,
-                'market_cap_$M': round(market_cap / 1_000_000, 1) if market_cap else None,
-                'short_ratio': round(short_ratio, 2) if short_ratio else None,
                 'dist_from_ma20_%': round(dist_from_ma20, 2),
-                'dist_from_ma50_%': round(dist_from_ma50, 2) if dist_from_ma50 else None,
-                'dist_from_52w_high_%': round(dist_from_52w_high, 2) if dist_from_52w_high else None,
-                'dist_from_52w_low_%': round(dist_from_52w_low, 2) if dist_from_52w_low else None,
-                'exchange': info.get('exchange', 'Unknown')
+                'dist_from_ma50_%': round(dist_from_ma50, 2) if dist_from_ma50 else None
             }
             
         except Exception as e:
             print(f"Error with {ticker}: {str(e)}")
             return None
     
-    def scan_market(self, custom_tickers: List[str] = None) -> pd.DataFrame:
-        """Scan the market for volatile opportunities"""
+    def _enrich_with_info(self, metrics: Dict, info: Dict, current_price: float) -> Dict:
+        """Add the quote-info fields (beta, market cap, 52-week distances, exchange) to a metric row"""
+        beta = info.get('beta', None)
+        market_cap = info.get('marketCap', 0)
+        short_ratio = info.get('shortRatio', None)
+        fifty_two_week_high = info.get('fiftyTwoWeekHigh', None)
+        fifty_two_week_low = info.get('fiftyTwoWeekLow', None)
+        
+        # Distance from 52-week high/low
+        if fifty_two_week_high:
+            dist_from_52w_high = ((current_price - fifty_two_week_high) / fifty_two_week_high) * 100
+        else:
+            dist_from_52w_high = None
+            
+        if fifty_two_week_low:
+            dist_from_52w_low = ((current_price - fifty_two_week_low) / fifty_two_week_low) * 100
+        else:
+            dist_from_52w_low = None
+        
+        metrics.update({
+            'beta': round(beta, 2) if beta else None,
+            'market_cap_$M': round(market_cap / 1_000_000, 1) if market_cap else None,
+            'short_ratio': round(short_ratio, 2) if short_ratio else None,
+            'dist_from_52w_high_%': round(dist_from_52w_high, 2) if dist_from_52w_high else None,
+            'dist_from_52w_low_%': round(dist_from_52w_low, 2) if dist_from_52w_low else None,
+            'exchange': info.get('exchange', 'Unknown')
+        })
+        return metrics
+    
+    def download_history(self, tickers: List[str], period: str = '3mo', interval: str = '1d') -> Dict[str, pd.DataFrame]:
+        """Bars per ticker from one batched download (see _scan_data.download_history)"""
+        return download_history(tickers, period, interval, use_cache=self.use_cache)
+    
+    def fetch_alpaca_bars(self, tickers: List[str], days: int = 92, timeframe: str = '1Day') -> Dict[str, pd.DataFrame]:
+        """
+        Download bars from Alpaca's multi-symbol /v2/stocks/bars endpoint
+        
+        One request covers up to 200 symbols (plus next_page_token pages
+        when the 10,000-bar page limit is hit); chunks run concurrently.
+        Returns the same per-ticker OHLCV frames as download_history,
+        served from the scan cache when fresh. Tickers Alpaca has no bars
+        for are left out.
+        """
+        name = f'alpaca_{timeframe}'
+        frames = {}
+        if self.use_cache:
+            for ticker in tickers:
+                hist = cache_load(cache_path('scan', ticker, name), SCAN_CACHE_TTL)
+                if hist is not None:
+                    frames[ticker] = hist
+        
+        pending = [t for t in tickers if t not in frames]
+        chunks = [pending[i:i + ALPACA_BARS_CHUNK] for i in range(0, len(pending), ALPACA_BARS_CHUNK)]
+        if chunks:
+            end = datetime.now().astimezone() - (ALPACA_SIP_DELAY if self.data_feed == 'sip' else timedelta(0))
+            start = end - timedelta(days=days)
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                for part in pool.map(lambda chunk: self._fetch_alpaca_chunk(chunk, timeframe, start, end), chunks):
+                    for ticker, hist in part.items():
+                        frames[ticker] = hist
+                        if self.use_cache:
+                            cache_store(cache_path('scan', ticker, name), hist)
+        
+        return {t: frames[t] for t in tickers if t in frames}
+    
+    def _fetch_alpaca_chunk(self, chunk: List[str], timeframe: str, start: datetime, end: datetime) -> Dict[str, pd.DataFrame]:
+        """Page through the bars endpoint for one chunk of up to 200 symbols"""
+        headers = {'APCA-API-KEY-ID': self.api_key, 'APCA-API-SECRET-KEY': self.api_secret}
+        params = {
+            'symbols': ','.join(chunk),
+            'timeframe': timeframe,
+            'start': start.isoformat(timespec='seconds'),
+            'end': end.isoformat(timespec='seconds'),
+            'adjustment': 'split',
+            'feed': self.data_feed,
+            'limit': 10_000
+        }
+        
+        # A failure on any page drops the whole chunk: partial histories would
+        # be cached as complete, so yfinance backfills these symbols instead
+        bars = {}
+        try:
+            while True:
+                response = self.session.get(f'{self.data_url}/v2/stocks/bars', params=params,
+                                            headers=headers, timeout=30)
+                response.raise_for_status()
+                payload = response.json()
+                for symbol, rows in (payload.get('bars') or {}).items():
+                    bars.setdefault(symbol, []).extend(rows)
+                if not payload.get('next_page_token'):
+                    break
+                params['page_token'] = payload['next_page_token']
+        except Exception as e:
+            print(f"Error fetching Alpaca bars for {chunk[0]}..{chunk[-1]}: {str(e)}")
+            return {}
+        
+        frames = {}
+        for symbol, rows in bars.items():
+            frames[symbol] = pd.DataFrame({
+                'Open': [row['o'] for row in rows],
+                'High': [row['h'] for row in rows],
+                'Low': [row['l'] for row in rows],
+                'Close': [row['c'] for row in rows],
+                'Volume': [row['v'] for row in rows]
+            }, index=pd.to_datetime([row['t'] for row in rows]))
+        return frames
+    
+    def get_info(self, ticker: str) -> Dict:
+        """Quote info for one ticker (cached on disk), or an empty dict if the lookup fails"""
+        return get_info(ticker, use_cache=self.use_cache)
+    
+    def fetch_infos(self, tickers: List[str], max_workers: int = INFO_WORKERS) -> List[Dict]:
+        """Quote info for many tickers, fetched concurrently, in the order of tickers"""
+        return fetch_infos(tickers, max_workers, use_cache=self.use_cache)
+    
+    def scan_market(
+        self,
+        custom_tickers: List[str] = None,
+        max_workers: int = INFO_WORKERS,
+        compute_intraday: bool = False,
+        min_price: float = PREFILTER_MIN_PRICE,
+        max_price: float = PREFILTER_MAX_PRICE,
+        min_avg_volume: int = PREFILTER_MIN_AVG_VOLUME
+    ) -> pd.DataFrame:
+        """
+        Scan the market for volatile opportunities
+        
+        Metrics that need only the daily bars are computed for every ticker;
+        quote info is only fetched for tickers priced within
+        min_price..max_price and averaging more than min_avg_volume shares a
+        day. The others stay in the results without the quote fields.
+        1-minute bars for intraday_vol_% are only downloaded with
+        compute_intraday. With Alpaca credentials and the sip feed the daily
+        bars come from the Alpaca data API in 200-symbol requests.
+        """
         
         if custom_tickers:
             tickers = custom_tickers
@@ -284,81 +589,77 @@ class AdvancedVolatilityScanner:
             tickers = self.get_expanded_universe()
         
         print(f"Scanning {len(tickers)} stocks...")
-        print("This will take 3-5 minutes for comprehensive analysis\n")
+        
+        # Batched downloads replace the per-ticker history calls: Alpaca's bars
+        # endpoint when credentials are set, yfinance for anything it misses.
+        # IEX bars only carry IEX's share of the volume, which would skew
+        # avg_volume, vol_ratio and the pre-filter, so Alpaca is only used on
+        # the consolidated sip feed. The 1-minute bars only feed
+        # intraday_vol_%, so they are opt-in
+        use_alpaca = self.api_key and self.api_secret and self.data_feed == 'sip'
+        daily = self.fetch_alpaca_bars(tickers) if use_alpaca else {}
+        missing = [t for t in tickers if t not in daily]
+        if missing:
+            daily.update(self.download_history(missing, period='3mo', interval='1d'))
+        intraday = self.download_history(tickers, period='1d', interval='1m') if compute_intraday else {}
+        
+        # Bar-only metrics for everything, then a coarse price/liquidity cut so
+        # quote metadata is only requested for the shortlist
+        scanned = []
+        shortlist = []
+        for ticker in tickers:
+            if ticker not in daily:
+                continue
+            metrics = self._fast_metrics(ticker, daily[ticker], intraday.get(ticker))
+            if metrics is None:
+                continue
+            scanned.append((ticker, metrics))
+            if min_price <= metrics['price'] <= max_price and metrics['avg_volume'] > min_avg_volume:
+                shortlist.append(ticker)
+        print(f"{len(shortlist)}/{len(tickers)} stocks pass the price/volume pre-filter, fetching quotes...")
+        
+        infos = dict(zip(shortlist, self.fetch_infos(shortlist, max_workers)))
         
         results = []
-        for i, ticker in enumerate(tickers, 1):
-            print(f"[{i}/{len(tickers)}] Processing {ticker}...", end='\r')
-            
-            metrics = self.get_real_time_metrics(ticker)
-            if metrics:
-                results.append(metrics)
-            
-            # Rate limiting
-            if i % 10 == 0:
-                time.sleep(2)
+        for ticker, metrics in scanned:
+            row = self._enrich_with_info(metrics, infos.get(ticker, {}), daily[ticker]['Close'].iloc[-1])
+            row['sector'] = _SECTOR_MAP.get(ticker, 'Other')
+            results.append(row)
         
         print("\n\nScan complete!")
         
         if not results:
             return pd.DataFrame()
         
-        return pd.DataFrame(results)
+        return _rows_to_frame(results)
     
     def find_breakout_candidates(self, df: pd.DataFrame) -> pd.DataFrame:
         """Find stocks breaking out of consolidation with volume"""
-        breakouts = df[
-            (df['day_change_%'].abs() > 5) &
-            (df['vol_ratio'] > 1.5) &
-            (df['atr_%'] > 3)
-        ].copy()
-        
-        breakouts['breakout_score'] = (
-            breakouts['day_change_%'].abs() * 0.3 +
-            breakouts['vol_ratio'] * 20 * 0.3 +
-            breakouts['atr_%'] * 10 * 0.4
-        )
+        breakouts = df.query(BREAKOUT_QUERY).copy()
+        
+        breakouts['breakout_score'] = _breakout_score(breakouts)
         
         return breakouts.sort_values('breakout_score', ascending=False)
     
     def find_momentum_plays(self, df: pd.DataFrame) -> pd.DataFrame:
         """Find stocks with strong momentum and increasing volatility"""
-        momentum = df[
-            (df['week_change_%'] > 10) &
-            (df['vol_regime'] == 'Accelerating') &
-            (df['vol_ratio'] > 1.2)
-        ].copy()
-        
-        momentum['momentum_score'] = (
-            momentum['week_change_%'] * 0.4 +
-            momentum['weekly_vol_%'].fillna(momentum['annual_vol_%']) * 0.3 +
-            momentum['vol_ratio'] * 30 * 0.3
-        )
+        momentum = df.query(MOMENTUM_QUERY).copy()
+        
+        momentum['momentum_score'] = _momentum_score(momentum)
         
         return momentum.sort_values('momentum_score', ascending=False)
     
     def find_high_risk_high_reward(self, df: pd.DataFrame) -> pd.DataFrame:
         """Find the most volatile, aggressive opportunities"""
-        high_risk = df[
-            (df['price'] >= 1) &
-            (df['price'] <= 10) &
-            (df['annual_vol_%'] > 70) &
-            (df['atr_%'] > 4) &
-            (df['avg_volume'] > 1_000_000) &
-            (df['market_cap_$M'] < 2000)
-        ].copy()
-        
-        high_risk['aggression_score'] = (
-            high_risk['annual_vol_%'] * 0.35 +
-            high_risk['monthly_vol_%'].fillna(high_risk['annual_vol_%']) * 0.35 +
-            high_risk['atr_%'] * 5 * 0.3
-        )
+        high_risk = df.query(HIGH_RISK_QUERY).copy()
+        
+        high_risk['aggression_score'] = _aggression_score(high_risk)
         
         return high_risk.sort_values('aggression_score', ascending=False)
 
 
-def run_comprehensive_scan():
-    """Run comprehensive scan with all strategies"""
+def run_comprehensive_scan(export_csv: bool = False):
+    """Run comprehensive scan with all strategies (export_csv adds CSV copies of the saved results)"""
     
     scanner = AdvancedVolatilityScanner()
     
@@ -430,12 +731,12 @@ def run_comprehensive_scan():
     # Save results
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
-    df.to_csv(f'/home/claude/volatile_scan_{timestamp}.csv', index=False)
-    print(f"\n\nFull results saved to: volatile_scan_{timestamp}.csv")
+    saved = save_results(df, f'/home/claude/volatile_scan_{timestamp}', export_csv)
+    print(f"\n\nFull results saved to: {saved}")
     
     if not high_risk.empty:
-        high_risk.to_csv(f'/home/claude/high_risk_plays_{timestamp}.csv', index=False)
-        print(f"High risk plays saved to: high_risk_plays_{timestamp}.csv")
+        saved = save_results(high_risk, f'/home/claude/high_risk_plays_{timestamp}', export_csv)
+        print(f"High risk plays saved to: {saved}")
     
     # Summary stats
     print(f"\n{'='*80}")
@@ -9,18 +9,23 @@ import numpy as np
 from datetime import datetime, timedelta
 import requests
 from typing import List, Dict
-import time
 import os
 from dotenv import load_dotenv
 
+try:
+    from scripts._scan_data import INFO_WORKERS, download_history, get_info, fetch_infos, save_results
+except ImportError:  # Run directly from the scripts directory
+    from _scan_data import INFO_WORKERS, download_history, get_info, fetch_infos, save_results
+
 # Load environment variables
 load_dotenv()
 
 class VolatileStockScanner:
     """Scanner for high-volatility stocks on major exchanges"""
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.results = []
+        self.use_cache = use_cache
         # Load API keys from environment (if needed for future integrations)
         self.api_key = os.getenv('ALPACA_API_KEY')
         self.api_secret = os.getenv('ALPACA_SECRET_KEY')
@@ -72,44 +77,64 @@ class VolatileStockScanner:
             # Get historical data (90 days for better metrics)
             hist = stock.history(period='3mo')
             
-            if hist.empty or len(hist) < 20:
+            if hist.shape[0] < 20:
                 return None
             
             # Get current info
             info = stock.info
             
-            # Calculate metrics
-            current_price = hist['Close'].iloc[-1]
+            return self._compute_metrics_from_hist(ticker, hist, info)
+            
+        except Exception as e:
+            print(f"Error processing {ticker}: {str(e)}")
+            return None
+    
+    def _compute_metrics_from_hist(self, ticker: str, hist: pd.DataFrame, info: Dict) -> Dict:
+        """
+        Calculate the metric row for one ticker from already-downloaded bars
+        
+        hist holds 3 months of daily OHLCV; info supplies beta, market cap
+        and exchange and may be empty.
+        """
+        try:
+            if hist.shape[0] < 20:
+                return None
+            
+            # Pull the columns out once as contiguous float64 arrays
+            O, H, L, C, V = (hist[col].to_numpy(dtype=np.float64)
+                             for col in ('Open', 'High', 'Low', 'Close', 'Volume'))
+            current_price = C[-1]
             
-            # Historical volatility (annualized)
-            returns = hist['Close'].pct_change().dropna()
-            hist_volatility = returns.std() * np.sqrt(252) * 100
+            # Historical volatility (annualized) from log returns, skipping gaps
+            # around missing closes; the 20-day window below slices the same array
+            returns = np.diff(np.log(C))
+            returns = returns[np.isfinite(returns)]
+            hist_volatility = returns.std(ddof=1) * np.sqrt(252) * 100
             
             # Average True Range (ATR)
-            high_low = hist['High'] - hist['Low']
-            high_close = np.abs(hist['High'] - hist['Close'].shift())
-            low_close = np.abs(hist['Low'] - hist['Close'].shift())
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = ranges.max(axis=1)
-            atr = true_range.rolling(14).mean().iloc[-1]
+            # True range: the first bar has no previous close, so the 14-bar
+            # mean over the tail never needs it
+            prev_c = C[:-1]
+            true_range = np.maximum.reduce([H[1:] - L[1:], np.abs(H[1:] - prev_c), np.abs(L[1:] - prev_c)])
+            atr = true_range[-14:].mean()
             atr_percent = (atr / current_price) * 100
             
             # Recent volatility (last 20 days)
-            recent_returns = returns.tail(20)
-            recent_volatility = recent_returns.std() * np.sqrt(252) * 100
+            recent_volatility = returns[-20:].std(ddof=1) * np.sqrt(252) * 100
             
             # Price movement metrics
-            day_range = ((hist['High'].iloc[-1] - hist['Low'].iloc[-1]) / hist['Open'].iloc[-1]) * 100
+            day_range = ((H[-1] - L[-1]) / O[-1]) * 100
             
             # Volume metrics
-            avg_volume = hist['Volume'].tail(20).mean()
-            current_volume = hist['Volume'].iloc[-1]
+            avg_volume = V[-20:].mean()
+            current_volume = V[-1]
             volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
             
             # Price changes
-            day_change = ((current_price - hist['Open'].iloc[-1]) / hist['Open'].iloc[-1]) * 100
-            week_change = ((current_price - hist['Close'].iloc[-5]) / hist['Close'].iloc[-5]) * 100 if len(hist) >= 5 else 0
-            month_change = ((current_price - hist['Close'].iloc[-20]) / hist['Close'].iloc[-20]) * 100 if len(hist) >= 20 else 0
+            day_change = ((current_price - O[-1]) / O[-1]) * 100
+            # The 20-bar guard above covers both lookbacks
+            week_change = ((current_price - C[-5]) / C[-5]) * 100
+            month_change = ((current_price - C[-20]) / C[-20]) * 100
             
             # Beta (if available)
             beta = info.get('beta', None)
@@ -144,27 +169,41 @@ class VolatileStockScanner:
             print(f"Error processing {ticker}: {str(e)}")
             return None
     
-    def scan_stocks(self, tickers: List[str] = None, max_workers: int = 5) -> pd.DataFrame:
+    def download_history(self, tickers: List[str], period: str = '3mo') -> Dict[str, pd.DataFrame]:
+        """Daily bars per ticker from one batched download (see _scan_data.download_history)"""
+        return download_history(tickers, period, use_cache=self.use_cache)
+    
+    def get_info(self, ticker: str) -> Dict:
+        """Quote info for one ticker (cached on disk), or an empty dict if the lookup fails"""
+        return get_info(ticker, use_cache=self.use_cache)
+    
+    def fetch_infos(self, tickers: List[str], max_workers: int = INFO_WORKERS) -> List[Dict]:
+        """Quote info for many tickers, fetched concurrently, in the order of tickers"""
+        return fetch_infos(tickers, max_workers, use_cache=self.use_cache)
+    
+    def scan_stocks(self, tickers: List[str] = None, max_workers: int = INFO_WORKERS) -> pd.DataFrame:
         """
         Scan stocks for volatility metrics
+        
+        History for the whole list comes from one batched download; quote
+        info is only requested for tickers with at least 20 daily bars.
         """
         if tickers is None:
             tickers = self.get_stock_universe()
         
         print(f"Scanning {len(tickers)} stocks for volatility metrics...")
-        print("This may take a few minutes...\n")
+        
+        history = self.download_history(tickers)
+        survivors = [t for t in tickers if t in history and len(history[t]) >= 20]
+        print(f"{len(survivors)}/{len(tickers)} stocks have enough history, fetching quotes...\n")
+        
+        infos = self.fetch_infos(survivors, max_workers)
         
         results = []
-        for i, ticker in enumerate(tickers, 1):
-            print(f"Processing {i}/{len(tickers)}: {ticker}", end='\r')
-            
-            metrics = self.calculate_metrics(ticker)
+        for ticker, info in zip(survivors, infos):
+            metrics = self._compute_metrics_from_hist(ticker, history[ticker], info)
             if metrics:
                 results.append(metrics)
-            
-            # Rate limiting
-            if i % 5 == 0:
-                time.sleep(1)
         
         print("\n\nScan complete!")
         
@@ -225,8 +264,8 @@ class VolatileStockScanner:
         ]
 
 
-def main():
-    """Run the scanner with default settings"""
+def main(export_csv: bool = False):
+    """Run the scanner with default settings (export_csv adds CSV copies of the saved results)"""
     scanner = VolatileStockScanner()
     
     # Scan stocks
@@ -285,13 +324,13 @@ def main():
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
     # Save full results
-    df.to_csv(f'/home/claude/volatile_stocks_full_{timestamp}.csv', index=False)
-    print(f"\n\nFull results saved to: volatile_stocks_full_{timestamp}.csv")
+    saved = save_results(df, f'/home/claude/volatile_stocks_full_{timestamp}', export_csv)
+    print(f"\n\nFull results saved to: {saved}")
     
     # Save filtered results
     if not filtered.empty:
-        filtered.to_csv(f'/home/claude/volatile_stocks_filtered_{timestamp}.csv', index=False)
-        print(f"Filtered results saved to: volatile_stocks_filtered_{timestamp}.csv")
+        saved = save_results(filtered, f'/home/claude/volatile_stocks_filtered_{timestamp}', export_csv)
+        print(f"Filtered results saved to: {saved}")
     
     print(f"\n{'='*80}")
     print("SUMMARY STATISTICS")
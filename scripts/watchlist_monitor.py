@@ -9,77 +9,312 @@ import numpy as np
 from datetime import datetime
 import time
 import os
-from typing import List, Dict
+import threading
+from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+# alpaca-py pushes minute bars over a websocket; without it the monitor polls yfinance
+try:
+    from alpaca.data.live import StockDataStream
+    from alpaca.data.enums import DataFeed
+    ALPACA_PY_AVAILABLE = True
+except ImportError:
+    ALPACA_PY_AVAILABLE = False
+
+try:
+    from scripts._disk_cache import cache_path, cache_load, cache_store
+    from scripts._scan_data import alpaca_data_feed
+except ImportError:  # Run directly from the scripts directory
+    from _disk_cache import cache_path, cache_load, cache_store
+    from _scan_data import alpaca_data_feed
+
 # Load environment variables
 load_dotenv()
 
+# Single-ticker fallback lookups in flight at once - each is a blocking HTTPS call
+SNAPSHOT_WORKERS = 8
+
+# Minute bars saved under .cache/bars/<TICKER> at the end of a run seed the next
+# run's incremental downloads for this long
+BARS_CACHE_TTL = 12 * 60 * 60
+
+# Seconds start_stream waits for the websocket to authenticate and subscribe
+# before giving up and polling instead
+STREAM_CONNECT_TIMEOUT = 10
+
+# A ticker with no streamed bar for this long is refreshed from yfinance again
+# (Alpaca only pushes a bar for minutes with trades on the feed)
+STREAM_STALE_SECONDS = 150
+
+# Live table columns: (field, header format spec, value format spec). The
+# header and row templates are built once; each refresh is one format_map per row
+DISPLAY_COLUMNS = (
+    ('ticker', '<6', '<6'),
+    ('price', '>9', '>9.2f'),
+    ('day_change_%', '>12', '>+12.2f'),
+    ('last_5min_%', '>11', '>+11.2f'),
+    ('day_range_%', '>11', '>11.2f'),
+    ('volume', '>12', '>12,'),
+    ('volatility', '>10', '>10.2f')
+)
+_TABLE_HEADER = ' '.join(format(name, head) for name, head, _ in DISPLAY_COLUMNS)
+_ROW_TEMPLATE = ' '.join(f'{{{name}:{spec}}}' for name, _, spec in DISPLAY_COLUMNS)
+
+
+def _format_rows(rows: List[Dict]) -> str:
+    """Render snapshot rows as the live table, header first"""
+    return '\n'.join([_TABLE_HEADER] + [_ROW_TEMPLATE.format_map(r) for r in rows])
+
+
 class WatchlistMonitor:
     """Monitor specific tickers in real-time"""
     
-    def __init__(self, watchlist: List[str], alert_threshold: float = 5.0):
+    def __init__(self, watchlist: List[str], alert_threshold: float = 5.0, use_cache: bool = True):
         self.watchlist = [t.upper() for t in watchlist]
+        self.use_cache = use_cache
         self.alert_threshold = alert_threshold
         self.previous_prices = {}
-        # Load API keys from environment (for future integrations)
+        # Latest snapshot per ticker with the wall-clock minute it was taken in;
+        # 1-minute bars cannot change within that minute
+        self._snap_cache: Dict[str, tuple] = {}
+        # One yf.Ticker per symbol for the monitor's lifetime
+        self._tickers: Dict[str, yf.Ticker] = {}
+        # The current session's 1-minute bars per ticker, extended each refresh
+        # (or by the stream thread, which swaps in whole new frames)
+        self._bars: Dict[str, pd.DataFrame] = {}
+        self._stream = None
+        self._stream_thread = None
+        # Monotonic time of the last streamed bar per ticker, and its close
+        self._last_bar_at: Dict[str, float] = {}
+        self._live_price: Dict[str, float] = {}
+        # Shared with the scanners: 'iex' (default, free tier) or 'sip'
+        self._stream_feed = alpaca_data_feed()
+        # Alpaca keys enable the minute-bar stream (see start_stream)
         self.api_key = os.getenv('ALPACA_API_KEY')
         self.api_secret = os.getenv('ALPACA_SECRET_KEY')
         self.base_url = os.getenv('ALPACA_BASE_URL', 'https://paper-api.alpaca.markets')
         
     def get_snapshot(self, ticker: str) -> Dict:
-        """Get current snapshot of ticker"""
+        """
+        Get current snapshot of ticker
+        
+        Reused until the next minute boundary, so refreshing faster than the
+        bars update costs no extra requests.
+        """
+        bucket = int(time.time() // 60)
+        snapshot = self._cached_snapshot(ticker, bucket)
+        if snapshot is not None:
+            return snapshot
+        
         try:
-            stock = yf.Ticker(ticker)
+            stock = self._ticker(ticker)
             
             # Get today's data
             today = stock.history(period='1d', interval='1m')
             
+            return self._store_snapshot(ticker, bucket, self._snapshot_from_frame(ticker, today))
+            
+        except Exception as e:
+            return None
+    
+    def _ticker(self, ticker: str) -> yf.Ticker:
+        """Memoized yf.Ticker so every refresh reuses the same object and its state"""
+        # yfinance shares one curl_cffi session across Ticker objects; a requests.Session is rejected
+        stock = self._tickers.get(ticker)
+        if stock is None:
+            stock = self._tickers[ticker] = yf.Ticker(ticker)
+        return stock
+    
+    def _cached_snapshot(self, ticker: str, bucket: int) -> Optional[Dict]:
+        """Copy of the snapshot taken for ticker in minute bucket, if any"""
+        entry = self._snap_cache.get(ticker)
+        if entry is not None and entry[0] == bucket:
+            return dict(entry[1])
+        return None
+    
+    def _store_snapshot(self, ticker: str, bucket: int, snapshot: Optional[Dict]) -> Optional[Dict]:
+        """Remember a snapshot for the rest of its minute (failures are not kept)"""
+        if snapshot is not None:
+            self._snap_cache[ticker] = (bucket, dict(snapshot))
+        return snapshot
+    
+    def download_today(self, tickers: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Today's 1-minute bars for tickers (default: the watchlist)
+        
+        Minute bars only ever append, so tickers with bars already held (in
+        memory, or on disk from an earlier run) just download from their last
+        bar onwards - that bar is fetched again since it may still have been
+        forming. Tickers without bars get the full day. Each group is one
+        batched yf.download call. Tickers that returned no bars are left out.
+        """
+        tickers = self.watchlist if tickers is None else tickers
+        held = [t for t in tickers if self._load_bars(t) is not None]
+        full = [t for t in tickers if t not in held]
+        
+        new_bars = {}
+        if full:
+            new_bars.update(self._download_minutes(full, period='1d'))
+        if held:
+            start = min(self._bars[t].index[-1] for t in held)
+            new_bars.update(self._download_minutes(held, start=start))
+        
+        return {t: self._merge_bars(t, new_bars[t]) for t in tickers if t in new_bars}
+    
+    def _download_minutes(self, tickers: List[str], **window) -> Dict[str, pd.DataFrame]:
+        """
+        1-minute bars over window (period= or start=) in one yf.download call
+        
+        yf.download batches the symbols on its own thread pool and returns a
+        (ticker x field) column panel, split here into one OHLCV frame per
+        ticker.
+        """
+        try:
+            data = yf.download(
+                tickers, interval='1m', group_by='ticker',
+                auto_adjust=False, threads=True, progress=False, **window
+            )
+        except Exception as e:
+            print(f"Error downloading watchlist bars: {str(e)}")
+            return {}
+        
+        if data is None or data.empty:
+            return {}
+        
+        available = set(data.columns.get_level_values(0))
+        frames = {}
+        for ticker in tickers:
+            if ticker in available:
+                bars = data[ticker].dropna(how='all')
+                if not bars.empty:
+                    frames[ticker] = bars
+        return frames
+    
+    def _load_bars(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Bars held for ticker, loading the copy saved by an earlier run if needed"""
+        if ticker not in self._bars and self.use_cache:
+            bars = cache_load(cache_path('bars', ticker), BARS_CACHE_TTL)
+            if bars is not None and not bars.empty:
+                self._bars[ticker] = bars
+        return self._bars.get(ticker)
+    
+    def _merge_bars(self, ticker: str, new: pd.DataFrame) -> pd.DataFrame:
+        """Append new bars to the held ones, keeping the latest copy of each minute and only the latest session"""
+        held = self._bars.get(ticker)
+        bars = new if held is None else pd.concat([held, new])
+        bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+        bars = bars[bars.index.normalize() == bars.index[-1].normalize()]
+        self._bars[ticker] = bars
+        return bars
+    
+    def save_bars(self):
+        """Write the held minute bars to .cache/bars/ for the next run"""
+        if not self.use_cache:
+            return
+        for ticker, bars in list(self._bars.items()):
+            cache_store(cache_path('bars', ticker), bars)
+    
+    def _snapshot_from_frame(self, ticker: str, today: pd.DataFrame, last_price: Optional[float] = None) -> Dict:
+        """
+        Snapshot metrics from a ticker's 1-minute bars for today
+        
+        last_price (a streamed close) replaces the last bar's close as the
+        current price; volume and volatility still come from the bars.
+        """
+        try:
             if today.empty:
                 return None
             
-            current_price = today['Close'].iloc[-1]
-            open_price = today['Open'].iloc[0]
-            high = today['High'].max()
-            low = today['Low'].min()
-            volume = today['Volume'].sum()
+            # Pull the columns out once; everything below is plain NumPy
+            closes = today['Close'].to_numpy(dtype=np.float64)
+            current_price = closes[-1] if last_price is None else last_price
+            open_price = today['Open'].to_numpy(dtype=np.float64)[0]
+            high = np.nanmax(today['High'].to_numpy(dtype=np.float64))
+            low = np.nanmin(today['Low'].to_numpy(dtype=np.float64))
+            if last_price is not None:
+                high, low = max(high, last_price), min(low, last_price)
+            volume = np.nansum(today['Volume'].to_numpy(dtype=np.float64))
             
             # Calculate metrics
             day_change = ((current_price - open_price) / open_price) * 100
             day_range = ((high - low) / open_price) * 100
             
-            # Recent minute volatility
-            minute_returns = today['Close'].pct_change().dropna()
-            minute_vol = minute_returns.std() * 100 if len(minute_returns) > 0 else 0
+            # Recent minute volatility from log returns, as in the scanners;
+            # gaps around missing closes are skipped
+            minute_returns = np.diff(np.log(closes))
+            minute_returns = minute_returns[np.isfinite(minute_returns)]
+            minute_vol = minute_returns.std(ddof=1) * 100 if minute_returns.size > 1 else 0
             
-            # Last 5 minute trend
-            if len(today) >= 5:
-                recent_change = ((current_price - today['Close'].iloc[-6]) / today['Close'].iloc[-6]) * 100
-            else:
-                recent_change = 0
+            # Last 5 minute trend (from the first bar's close with fewer bars)
+            ref_price = closes[-6] if closes.size >= 6 else closes[0]
+            recent_change = ((current_price - ref_price) / ref_price) * 100
+            
+            # Round every float field in one vectorized call
+            price, day_change, recent_change, day_range, high, low, minute_vol = np.round(
+                [current_price, day_change, recent_change, day_range, high, low, minute_vol], 2
+            ).tolist()
             
             return {
                 'ticker': ticker,
-                'price': round(current_price, 2),
-                'day_change_%': round(day_change, 2),
-                'last_5min_%': round(recent_change, 2),
-                'day_range_%': round(day_range, 2),
+                'price': price,
+                'day_change_%': day_change,
+                'last_5min_%': recent_change,
+                'day_range_%': day_range,
                 'volume': int(volume),
-                'high': round(high, 2),
-                'low': round(low, 2),
-                'volatility': round(minute_vol, 2),
+                'high': high,
+                'low': low,
+                'volatility': minute_vol,
                 'timestamp': datetime.now().strftime('%H:%M:%S')
             }
             
         except Exception as e:
             return None
     
-    def monitor_once(self) -> pd.DataFrame:
-        """Get one snapshot of all watchlist tickers"""
+    def monitor_once(self) -> List[Dict]:
+        """Get one snapshot of all watchlist tickers, in watchlist order"""
         results = []
         
+        # Snapshots from this minute are reused; one batched download replaces
+        # a history() call (and a rate-limit sleep) per remaining ticker
+        bucket = int(time.time() // 60)
+        live = self._live_tickers()
+        consolidated = self._stream is not None and self._stream_feed == 'sip'
+        snapshots = {}
+        for ticker in self.watchlist:
+            if consolidated and ticker in live and ticker in self._bars:
+                # SIP bars extend the held session directly, so there is nothing to download
+                snapshots[ticker] = self._snapshot_from_frame(ticker, self._bars[ticker])
+            else:
+                snapshots[ticker] = self._cached_snapshot(ticker, bucket)
+        stale = [ticker for ticker, snapshot in snapshots.items() if snapshot is None]
+        if stale:
+            frames = self.download_today(stale)
+            for ticker in stale:
+                if ticker in frames:
+                    snapshots[ticker] = self._store_snapshot(
+                        ticker, bucket, self._snapshot_from_frame(ticker, frames[ticker])
+                    )
+            
+            # Tickers the batch missed (or all of them, if it failed) are retried
+            # one by one so a bad symbol cannot sink the rest; the lookups are
+            # I/O bound, so they overlap on a small thread pool
+            missing = [ticker for ticker in stale if ticker not in frames]
+            if missing:
+                with ThreadPoolExecutor(max_workers=min(SNAPSHOT_WORKERS, len(missing))) as executor:
+                    snapshots.update(zip(missing, executor.map(self.get_snapshot, missing)))
+        
+        if self._stream is not None and not consolidated:
+            # IEX bars only carry IEX's share of the volume: they move the price,
+            # the consolidated yfinance bars keep volume, range and volatility
+            for ticker in live:
+                if snapshots.get(ticker) and ticker in self._live_price and ticker in self._bars:
+                    snapshots[ticker] = self._snapshot_from_frame(
+                        ticker, self._bars[ticker], last_price=self._live_price[ticker]
+                    )
+        
         for ticker in self.watchlist:
-            snapshot = self.get_snapshot(ticker)
+            snapshot = snapshots[ticker]
             if snapshot:
                 results.append(snapshot)
                 
@@ -101,30 +336,140 @@ class WatchlistMonitor:
                         print(f"⚡ {ticker}: {quick_change:+.2f}% in last minute (${prev_price:.2f} → ${price:.2f})")
                 
                 self.previous_prices[ticker] = price
-            
-            time.sleep(0.5)  # Rate limiting
         
-        if results:
-            return pd.DataFrame(results)
-        return pd.DataFrame()
+        return results
+    
+    def start_stream(self) -> bool:
+        """
+        Switch to Alpaca's minute-bar websocket for the watchlist
+        
+        Needs alpaca-py and Alpaca credentials; returns False (and the monitor
+        keeps polling yfinance) otherwise, or when the websocket has not
+        authenticated and subscribed within STREAM_CONNECT_TIMEOUT (bad keys,
+        no data subscription, or another connection already open on the free
+        tier). The session so far is downloaded once, then each pushed bar is
+        applied from the stream's own thread. ALPACA_DATA_FEED picks the feed,
+        as for the scanners (default iex).
+        """
+        if not (ALPACA_PY_AVAILABLE and self.api_key and self.api_secret):
+            return False
+        
+        try:
+            self.download_today()
+            stream = StockDataStream(self.api_key, self.api_secret, feed=DataFeed(self._stream_feed))
+            stream.subscribe_bars(self._on_bar, *self.watchlist)
+            thread = threading.Thread(target=stream.run, daemon=True)
+            thread.start()
+        except Exception as e:
+            print(f"Could not start the Alpaca stream, polling instead: {str(e)}")
+            return False
+        
+        if not self._wait_connected(stream, thread):
+            print(f"Alpaca stream did not connect within {STREAM_CONNECT_TIMEOUT}s, polling instead")
+            self._close(stream)
+            return False
+        
+        self._stream, self._stream_thread = stream, thread
+        # Count the seeded session as fresh until the first bars arrive
+        now = time.monotonic()
+        self._last_bar_at = dict.fromkeys(self.watchlist, now)
+        self._live_price = {}
+        return True
+    
+    @staticmethod
+    def _wait_connected(stream, thread: threading.Thread) -> bool:
+        """Wait until the stream is authenticated and subscribed; False if its thread dies or time runs out"""
+        deadline = time.monotonic() + STREAM_CONNECT_TIMEOUT
+        while time.monotonic() < deadline:
+            # alpaca-py sets _running once the websocket has authenticated and
+            # sent the subscriptions; failures are logged and retried inside run()
+            if getattr(stream, '_running', False):
+                return True
+            if not thread.is_alive():
+                return False
+            time.sleep(0.1)
+        return False
+    
+    @staticmethod
+    def _close(stream):
+        """Stop an Alpaca stream, reporting (not raising) errors"""
+        try:
+            stream.stop()
+        except Exception as e:
+            print(f"Error stopping the Alpaca stream: {str(e)}")
+    
+    def stop_stream(self):
+        """Close the Alpaca websocket, if one is open"""
+        if self._stream is not None:
+            self._close(self._stream)
+            self._stream = self._stream_thread = None
+    
+    def _live_tickers(self) -> set:
+        """
+        Tickers with a streamed bar in the last STREAM_STALE_SECONDS
+        
+        Empty when polling. A stream whose thread has ended (a rejected
+        subscription, a dropped connection) is closed and the monitor goes
+        back to polling yfinance.
+        """
+        if self._stream is None:
+            return set()
+        if self._stream_thread is not None and not self._stream_thread.is_alive():
+            print("Alpaca stream stopped, polling instead")
+            self.stop_stream()
+            return set()
+        now = time.monotonic()
+        return {ticker for ticker, at in self._last_bar_at.items() if now - at <= STREAM_STALE_SECONDS}
+    
+    async def _on_bar(self, bar):
+        """Stream handler for one pushed minute bar"""
+        self._update_from_bar(bar)
+    
+    def _update_from_bar(self, bar):
+        """
+        Apply a streamed minute bar
+        
+        SIP bars are consolidated like yfinance's and are appended to the
+        held session bars; IEX bars only update the ticker's live price.
+        """
+        self._last_bar_at[bar.symbol] = time.monotonic()
+        if self._stream_feed != 'sip':
+            self._live_price[bar.symbol] = float(bar.close)
+            return
+        
+        index = pd.DatetimeIndex([pd.Timestamp(bar.timestamp)]).tz_convert('America/New_York')
+        new = pd.DataFrame({
+            'Open': [float(bar.open)],
+            'High': [float(bar.high)],
+            'Low': [float(bar.low)],
+            'Close': [float(bar.close)],
+            'Volume': [float(bar.volume)]
+        }, index=index)
+        self._merge_bars(bar.symbol, new)
     
     def monitor_continuous(self, refresh_seconds: int = 60, duration_minutes: int = 60):
         """Monitor watchlist continuously"""
         
+        streaming = self.start_stream()
+        
         print(f"\n{'='*100}")
         print(f"MONITORING {len(self.watchlist)} STOCKS")
+        print(f"Data: {f'Alpaca minute-bar stream ({self._stream_feed})' if streaming else 'yfinance polling'}")
         print(f"Alert threshold: {self.alert_threshold}%")
         print(f"Refresh rate: {refresh_seconds}s")
         print(f"Duration: {duration_minutes} minutes")
         print(f"{'='*100}\n")
         print(f"Watchlist: {', '.join(self.watchlist)}\n")
         
-        start_time = time.time()
+        # Refreshes run on a fixed monotonic schedule: time spent fetching
+        # comes out of the wait rather than pushing every later tick back
+        start_time = time.monotonic()
+        next_tick = start_time
         iterations = 0
         
         try:
             while True:
-                elapsed = (time.time() - start_time) / 60
+                elapsed = (time.monotonic() - start_time) / 60
                 if elapsed >= duration_minutes:
                     print(f"\nMonitoring complete ({duration_minutes} minutes elapsed)")
                     break
@@ -136,34 +481,42 @@ class WatchlistMonitor:
                 print(f"UPDATE #{iterations} at {current_time} (Elapsed: {elapsed:.1f} min)")
                 print(f"{'='*100}")
                 
-                df = self.monitor_once()
+                rows = self.monitor_once()
                 
-                if not df.empty:
-                    # Sort by biggest movers
-                    df_sorted = df.sort_values('day_change_%', key=abs, ascending=False)
+                if rows:
+                    # Sort by biggest movers; a handful of rows needs no DataFrame
+                    rows.sort(key=lambda r: abs(r['day_change_%']), reverse=True)
                     
-                    display_cols = ['ticker', 'price', 'day_change_%', 'last_5min_%', 
-                                  'day_range_%', 'volume', 'volatility']
-                    print(df_sorted[display_cols].to_string(index=False))
+                    print(_format_rows(rows))
                     
                     # Show top movers
-                    print(f"\n📈 Biggest Gainer: {df_sorted.iloc[0]['ticker']} "
-                          f"({df_sorted.iloc[0]['day_change_%']:+.2f}%)")
+                    gainer = max(rows, key=lambda r: r['day_change_%'])
+                    if gainer['day_change_%'] > 0:
+                        print(f"\n📈 Biggest Gainer: {gainer['ticker']} "
+                              f"({gainer['day_change_%']:+.2f}%)")
                     
-                    losers = df_sorted[df_sorted['day_change_%'] < 0]
-                    if not losers.empty:
-                        print(f"📉 Biggest Loser: {losers.iloc[0]['ticker']} "
-                              f"({losers.iloc[0]['day_change_%']:+.2f}%)")
+                    loser = min(rows, key=lambda r: r['day_change_%'])
+                    if loser['day_change_%'] < 0:
+                        print(f"📉 Biggest Loser: {loser['ticker']} "
+                              f"({loser['day_change_%']:+.2f}%)")
                 else:
                     print("No data retrieved")
                 
-                # Wait before next refresh
-                print(f"\nNext update in {refresh_seconds} seconds...")
-                time.sleep(refresh_seconds)
+                # Wait out the rest of this refresh period; after an overrun,
+                # skip the missed ticks and restart the schedule from now
+                next_tick += refresh_seconds
+                wait = next_tick - time.monotonic()
+                if wait > 0:
+                    print(f"\nNext update in {wait:.0f} seconds...")
+                    time.sleep(wait)
+                else:
+                    next_tick = time.monotonic()
                 
         except KeyboardInterrupt:
             print("\n\nMonitoring stopped by user")
         
+        self.stop_stream()
+        self.save_bars()
         print(f"\nTotal updates: {iterations}")
 
 
@@ -0,0 +1,67 @@
+"""
+Shared fake market data for the unit tests
+
+The helpers are exposed as fixtures returning factories: a test asks for one
+by name and calls it.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+
+def random_walk_bars(index: pd.DatetimeIndex, seed: int, start: float, step: float,
+                     open_step: float, spread: float, volume: tuple) -> pd.DataFrame:
+    """OHLCV bars on index whose closes follow a noisy random walk"""
+    n_bars = len(index)
+    rng = np.random.RandomState(seed)
+    close = start * np.cumprod(1 + rng.randn(n_bars) * step)
+    return pd.DataFrame({
+        'Open': close * (1 + rng.randn(n_bars) * open_step),
+        'High': close * (1 + spread),
+        'Low': close * (1 - spread),
+        'Close': close,
+        'Volume': rng.randint(*volume, n_bars).astype(float)
+    }, index=index)
+
+
+def panel_from_frames(frames: dict) -> pd.DataFrame:
+    """Build a yf.download(group_by='ticker') style panel from {ticker: frame}"""
+    return pd.concat(frames, axis=1)
+
+
+@pytest.fixture
+def make_hist():
+    """Factory for daily OHLCV bars (business days from 2024-01-01)"""
+    def make(n_days: int = 60, seed: int = 0, start: float = 5.0) -> pd.DataFrame:
+        index = pd.date_range('2024-01-01', periods=n_days, freq='B')
+        return random_walk_bars(index, seed, start, step=0.05, open_step=0.01, spread=0.03, volume=(1_000_000, 3_000_000))
+    return make
+
+
+@pytest.fixture
+def make_minutes():
+    """Factory for one session's 1-minute OHLCV bars (New York time, from the open)"""
+    def make(n_bars: int = 120, seed: int = 0, start: float = 10.0) -> pd.DataFrame:
+        index = pd.date_range('2024-01-02 09:30', periods=n_bars, freq='min', tz='America/New_York')
+        return random_walk_bars(index, seed, start, step=0.002, open_step=0.001, spread=0.002, volume=(1_000, 50_000))
+    return make
+
+
+@pytest.fixture
+def make_panel():
+    """Factory for a yf.download(group_by='ticker') panel from {ticker: frame}"""
+    return panel_from_frames
+
+
+@pytest.fixture
+def make_close_panel():
+    """Factory for a Close/Volume-only panel from {ticker: closes} with a flat volume"""
+    def make(closes: dict, volume: float = 1_000_000) -> pd.DataFrame:
+        n_days = len(next(iter(closes.values())))
+        index = pd.date_range('2024-01-01', periods=n_days, freq='B')
+        return panel_from_frames({
+            ticker: pd.DataFrame({'Close': values, 'Volume': [volume] * n_days}, index=index)
+            for ticker, values in closes.items()
+        })
+    return make
@@ -21,6 +21,12 @@ from config.config import (
     LIMIT_ORDER_BUFFER,
     HOT_SIGNAL_ENABLED,
     HOT_SIGNAL_MIN_SCORE,
+    SCORE_TIER_STANDARD,
+    POSITION_SIZE_STANDARD,
+    SCORE_TIER_STRONG,
+    POSITION_SIZE_STRONG,
+    SCORE_TIER_MAXIMUM,
+    POSITION_SIZE_MAXIMUM,
 )
 
 
@@ -81,82 +87,46 @@ class TestSignalExpiry:
 class TestSlippageCalculation:
     """Tests for slippage calculation"""
 
-    def test_no_slippage(self):
-        """Same price = 0% slippage"""
-        signal_price = 10.0
-        current_price = 10.0
+    @pytest.mark.parametrize('signal_price,current_price,expected,acceptable', [
+        (10.0, 10.0, 0.0, True),     # Same price = 0% slippage
+        (10.0, 10.10, 0.01, True),   # 1% higher is acceptable
+        (10.0, 10.30, 0.03, False),  # 3% higher is rejected
+        (10.0, 9.90, -0.01, True),   # Price dropped 1% is acceptable
+    ], ids=['none', 'positive_acceptable', 'excessive_rejected', 'negative_acceptable'])
+    def test_slippage(self, signal_price, current_price, expected, acceptable):
+        """Slippage is the move from the signal price, accepted within MAX_SLIPPAGE_PCT either way"""
         slippage = (current_price - signal_price) / signal_price
-        assert slippage == 0.0
-
-    def test_positive_slippage_acceptable(self):
-        """1% slippage should be acceptable"""
-        signal_price = 10.0
-        current_price = 10.10  # 1% higher
-        slippage = (current_price - signal_price) / signal_price
-        assert slippage == pytest.approx(0.01, rel=0.01)
-        assert slippage <= MAX_SLIPPAGE_PCT
-
-    def test_excessive_slippage_rejected(self):
-        """3% slippage should be rejected"""
-        signal_price = 10.0
-        current_price = 10.30  # 3% higher
-        slippage = (current_price - signal_price) / signal_price
-        assert slippage == pytest.approx(0.03, rel=0.01)
-        assert slippage > MAX_SLIPPAGE_PCT
-
-    def test_negative_slippage_acceptable(self):
-        """Negative slippage (price dropped) should be acceptable"""
-        signal_price = 10.0
-        current_price = 9.90  # 1% lower
-        slippage = (current_price - signal_price) / signal_price
-        assert slippage == pytest.approx(-0.01, rel=0.01)
-        assert abs(slippage) <= MAX_SLIPPAGE_PCT
+        assert slippage == pytest.approx(expected, rel=0.01)
+        assert (abs(slippage) <= MAX_SLIPPAGE_PCT) is acceptable
 
 
 class TestSpreadCalculation:
     """Tests for bid-ask spread calculation"""
 
-    def test_tight_spread_acceptable(self):
-        """0.5% spread should be acceptable"""
-        bid = 10.00
-        ask = 10.05
+    @pytest.mark.parametrize('bid,ask,expected,acceptable', [
+        (10.00, 10.05, 0.005, True),    # 0.5% spread is acceptable
+        (10.00, 10.30, 0.0296, False),  # 3% spread is rejected
+        (10.00, 10.20, 0.0198, True),   # 2% spread is at the limit
+    ], ids=['tight_acceptable', 'wide_rejected', 'at_limit'])
+    def test_spread(self, bid, ask, expected, acceptable):
+        """Spread is measured against the mid price and accepted up to MAX_SPREAD_PCT"""
         mid = (bid + ask) / 2
         spread_pct = (ask - bid) / mid
-        assert spread_pct == pytest.approx(0.005, rel=0.01)
-        assert spread_pct <= MAX_SPREAD_PCT
-
-    def test_wide_spread_rejected(self):
-        """3% spread should be rejected"""
-        bid = 10.00
-        ask = 10.30
-        mid = (bid + ask) / 2
-        spread_pct = (ask - bid) / mid
-        assert spread_pct > MAX_SPREAD_PCT
-
-    def test_spread_at_limit(self):
-        """2% spread should be at limit"""
-        bid = 10.00
-        ask = 10.20
-        mid = (bid + ask) / 2
-        spread_pct = (ask - bid) / mid
-        assert spread_pct == pytest.approx(0.0198, rel=0.01)
-        assert spread_pct <= MAX_SPREAD_PCT
+        assert spread_pct == pytest.approx(expected, rel=0.01)
+        assert (spread_pct <= MAX_SPREAD_PCT) is acceptable
 
 
 class TestLimitOrderBuffer:
     """Tests for limit order price calculation"""
 
-    def test_limit_price_with_buffer(self):
-        """Limit order should add buffer to ask price"""
-        ask_price = 10.00
+    @pytest.mark.parametrize('ask_price,expected,rel', [
+        (10.00, 10.05, 0.01),    # Buffer added to the ask price
+        (100.0, 100.5, 0.001),   # Buffer is 0.5%
+    ], ids=['with_buffer', 'buffer_percentage'])
+    def test_limit_price(self, ask_price, expected, rel):
+        """Limit order price should add LIMIT_ORDER_BUFFER to the ask"""
         limit_price = ask_price * (1 + LIMIT_ORDER_BUFFER)
-        assert limit_price == pytest.approx(10.05, rel=0.01)
-
-    def test_buffer_percentage(self):
-        """Buffer should be 0.5%"""
-        base = 100.0
-        buffered = base * (1 + LIMIT_ORDER_BUFFER)
-        assert buffered == pytest.approx(100.5, rel=0.001)
+        assert limit_price == pytest.approx(expected, rel=rel)
 
 
 class TestHotSignalCriteria:
@@ -183,7 +153,6 @@ class TestPositionSizing:
 
     def test_standard_tier(self):
         """Score 60-84 should use standard size (5%)"""
-        from config.config import SCORE_TIER_STANDARD, POSITION_SIZE_STANDARD
         score = 65
         # SCORE_TIER_STANDARD is a tuple (min, max)
         assert SCORE_TIER_STANDARD[0] <= score <= SCORE_TIER_STANDARD[1]
@@ -191,7 +160,6 @@ class TestPositionSizing:
 
     def test_strong_tier(self):
         """Score 85-94 should use strong size (7%)"""
-        from config.config import SCORE_TIER_STRONG, POSITION_SIZE_STRONG
         score = 90
         # SCORE_TIER_STRONG is a tuple (min, max)
         assert SCORE_TIER_STRONG[0] <= score <= SCORE_TIER_STRONG[1]
@@ -199,7 +167,6 @@ class TestPositionSizing:
 
     def test_maximum_tier(self):
         """Score 95+ should use maximum size (10%)"""
-        from config.config import SCORE_TIER_MAXIMUM, POSITION_SIZE_MAXIMUM
         score = 95
         # SCORE_TIER_MAXIMUM is a tuple (min, max)
         assert SCORE_TIER_MAXIMUM[0] <= score <= SCORE_TIER_MAXIMUM[1]
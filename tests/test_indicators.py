@@ -14,6 +14,37 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.indicators import TechnicalIndicators
 
 
+def _series(values) -> pd.Series:
+    """Float64 price series, as the bars fed to the indicators in production"""
+    return pd.Series(np.asarray(values, dtype=np.float64))
+
+
+# Shared inputs are built once; the indicator functions never modify them
+
+@pytest.fixture(scope='session')
+def empty_bars():
+    """A bar frame with no rows"""
+    return pd.DataFrame()
+
+
+@pytest.fixture(scope='module')
+def flat_volume_bars():
+    """20 bars trading 1,000 shares each"""
+    return pd.DataFrame({'volume': np.full(20, 1000, dtype=np.int64)})
+
+
+@pytest.fixture(scope='module')
+def uptrend_prices():
+    """Closes rising by 1 every bar"""
+    return _series(np.arange(1, 25))
+
+
+@pytest.fixture(scope='module')
+def downtrend_prices():
+    """Closes falling by 1 every bar"""
+    return _series(np.arange(25, 1, -1))
+
+
 class TestVWAP:
     """Tests for VWAP calculation"""
 
@@ -30,10 +61,9 @@ class TestVWAP:
         assert len(vwap) == 3
         assert vwap.iloc[-1] > 0
 
-    def test_vwap_empty(self):
+    def test_vwap_empty(self, empty_bars):
         """VWAP of empty dataframe should be empty"""
-        bars = pd.DataFrame()
-        vwap = TechnicalIndicators.calculate_vwap(bars)
+        vwap = TechnicalIndicators.calculate_vwap(empty_bars)
         assert len(vwap) == 0
 
     def test_vwap_single_bar(self):
@@ -69,25 +99,23 @@ class TestRSI:
 
     def test_rsi_range(self):
         """RSI should be between 0 and 100"""
-        prices = pd.Series([10, 11, 12, 11, 10, 9, 10, 11, 12, 13, 14, 15, 14, 13, 12])
+        prices = _series([10, 11, 12, 11, 10, 9, 10, 11, 12, 13, 14, 15, 14, 13, 12])
         rsi = TechnicalIndicators.calculate_rsi(prices)
         assert all(0 <= r <= 100 for r in rsi.dropna())
 
-    def test_rsi_uptrend(self):
+    def test_rsi_uptrend(self, uptrend_prices):
         """RSI should be high in strong uptrend"""
-        prices = pd.Series(range(1, 25))  # Continuous uptrend
-        rsi = TechnicalIndicators.calculate_rsi(prices)
+        rsi = TechnicalIndicators.calculate_rsi(uptrend_prices)
         assert rsi.iloc[-1] > 70
 
-    def test_rsi_downtrend(self):
+    def test_rsi_downtrend(self, downtrend_prices):
         """RSI should be low in strong downtrend"""
-        prices = pd.Series(range(25, 1, -1))  # Continuous downtrend
-        rsi = TechnicalIndicators.calculate_rsi(prices)
+        rsi = TechnicalIndicators.calculate_rsi(downtrend_prices)
         assert rsi.iloc[-1] < 30
 
     def test_rsi_short_series(self):
         """RSI with short series should return default values"""
-        prices = pd.Series([10, 11, 12])
+        prices = _series([10, 11, 12])
         rsi = TechnicalIndicators.calculate_rsi(prices, period=14)
         # Should return default value (50) for series shorter than period
         assert all(r == 50 for r in rsi)
@@ -95,7 +123,7 @@ class TestRSI:
     def test_rsi_neutral(self):
         """RSI with mixed movement should be around 50"""
         # Alternating up/down should give RSI around 50
-        prices = pd.Series([10, 11, 10, 11, 10, 11, 10, 11, 10, 11, 10, 11, 10, 11, 10, 11])
+        prices = _series([10, 11, 10, 11, 10, 11, 10, 11, 10, 11, 10, 11, 10, 11, 10, 11])
         rsi = TechnicalIndicators.calculate_rsi(prices)
         assert 40 <= rsi.iloc[-1] <= 60
 
@@ -103,28 +131,24 @@ class TestRSI:
 class TestRelativeVolume:
     """Tests for relative volume calculation"""
 
-    def test_relative_volume_2x(self):
+    def test_relative_volume_2x(self, flat_volume_bars):
         """2x volume should return ~2.0"""
-        bars = pd.DataFrame({'volume': [1000] * 20})
-        rel_vol = TechnicalIndicators.calculate_relative_volume(2000, bars)
+        rel_vol = TechnicalIndicators.calculate_relative_volume(2000, flat_volume_bars)
         assert abs(rel_vol - 2.0) < 0.1
 
-    def test_relative_volume_normal(self):
+    def test_relative_volume_normal(self, flat_volume_bars):
         """Average volume should return ~1.0"""
-        bars = pd.DataFrame({'volume': [1000] * 20})
-        rel_vol = TechnicalIndicators.calculate_relative_volume(1000, bars)
+        rel_vol = TechnicalIndicators.calculate_relative_volume(1000, flat_volume_bars)
         assert abs(rel_vol - 1.0) < 0.1
 
-    def test_relative_volume_empty(self):
+    def test_relative_volume_empty(self, empty_bars):
         """Empty bars should return 1.0"""
-        bars = pd.DataFrame()
-        rel_vol = TechnicalIndicators.calculate_relative_volume(1000, bars)
+        rel_vol = TechnicalIndicators.calculate_relative_volume(1000, empty_bars)
         assert rel_vol == 1.0
 
-    def test_relative_volume_half(self):
+    def test_relative_volume_half(self, flat_volume_bars):
         """Half volume should return ~0.5"""
-        bars = pd.DataFrame({'volume': [1000] * 20})
-        rel_vol = TechnicalIndicators.calculate_relative_volume(500, bars)
+        rel_vol = TechnicalIndicators.calculate_relative_volume(500, flat_volume_bars)
         assert abs(rel_vol - 0.5) < 0.1
 
 
@@ -156,25 +180,16 @@ class TestATR:
 class TestBreakout:
     """Tests for breakout calculation"""
 
-    def test_breakout_positive(self):
-        """Price above reference should give positive breakout"""
-        pct = TechnicalIndicators.calculate_breakout_percent(10.5, 10.0)
-        assert pct == pytest.approx(0.05, rel=0.01)
-
-    def test_breakout_negative(self):
-        """Price below reference should give negative breakout"""
-        pct = TechnicalIndicators.calculate_breakout_percent(9.5, 10.0)
-        assert pct == pytest.approx(-0.05, rel=0.01)
-
-    def test_breakout_zero_reference(self):
-        """Zero reference price should return 0"""
-        pct = TechnicalIndicators.calculate_breakout_percent(10.0, 0)
-        assert pct == 0.0
-
-    def test_breakout_exact(self):
-        """Price at reference should give 0% breakout"""
-        pct = TechnicalIndicators.calculate_breakout_percent(10.0, 10.0)
-        assert pct == 0.0
+    @pytest.mark.parametrize('price,reference,expected', [
+        (10.5, 10.0, 0.05),    # Above reference gives a positive breakout
+        (9.5, 10.0, -0.05),    # Below reference gives a negative breakout
+        (10.0, 0, 0.0),        # Zero reference price returns 0
+        (10.0, 10.0, 0.0),     # At reference gives 0% breakout
+    ], ids=['positive', 'negative', 'zero_reference', 'exact'])
+    def test_breakout(self, price, reference, expected):
+        """Breakout is the fractional move of price over the reference"""
+        pct = TechnicalIndicators.calculate_breakout_percent(price, reference)
+        assert pct == pytest.approx(expected, rel=0.01)
 
 
 class TestRSIValidation:
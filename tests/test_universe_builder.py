@@ -0,0 +1,295 @@
+"""
+Unit tests for the UniverseBuilder screening helpers
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import json
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.universe_builder import UniverseBuilder, observed_periods_per_year, _link_or_copy
+from scripts._njit_kernels import compute_annualized_vol
+
+
+class TestScreenHistoryPanel:
+    """Tests for the vectorized panel screen"""
+
+    def test_volatile_ticker_passes(self, make_close_panel):
+        """Alternating +/-10% moves should pass the 50% volatility screen"""
+        closes = [10.0 * (1.1 if i % 2 else 1.0) for i in range(40)]
+        panel = make_close_panel({'VOL': closes})
+        result = UniverseBuilder(use_cache=False).screen_history_panel(panel)
+        assert result['ticker'].tolist() == ['VOL']
+        assert result['volatility'].iloc[0] > 50
+
+    def test_flat_ticker_rejected(self, make_close_panel):
+        """A constant price has zero volatility and should be dropped"""
+        panel = make_close_panel({'FLAT': [10.0] * 40})
+        result = UniverseBuilder(use_cache=False).screen_history_panel(panel)
+        assert result.empty
+
+    def test_price_out_of_range_rejected(self, make_close_panel):
+        """Tickers priced above $50 should be dropped"""
+        closes = [100.0 * (1.1 if i % 2 else 1.0) for i in range(40)]
+        panel = make_close_panel({'BIG': closes})
+        result = UniverseBuilder(use_cache=False).screen_history_panel(panel)
+        assert result.empty
+
+    def test_illiquid_ticker_rejected(self, make_close_panel):
+        """Average volume below 500K should be dropped"""
+        closes = [10.0 * (1.1 if i % 2 else 1.0) for i in range(40)]
+        panel = make_close_panel({'THIN': closes}, volume=10_000)
+        result = UniverseBuilder(use_cache=False).screen_history_panel(panel)
+        assert result.empty
+
+    def test_volume_averaged_over_three_months(self, make_close_panel):
+        """Average volume should span ~63 sessions like Yahoo's averageVolume, not just the last 20"""
+        closes = [10.0 * (1.1 if i % 2 else 1.0) for i in range(63)]
+        panel = make_close_panel({'VOL': closes})
+        panel[('VOL', 'Volume')] = [2_000_000.0] * 43 + [100_000.0] * 20
+        result = UniverseBuilder(use_cache=False).screen_history_panel(panel)
+        assert result['volume'].tolist() == [(43 * 2_000_000 + 20 * 100_000) // 63]
+
+    def test_missing_data_rejected(self, make_close_panel):
+        """An all-NaN column (unknown symbol) should be dropped without warnings"""
+        closes = [10.0 * (1.1 if i % 2 else 1.0) for i in range(40)]
+        panel = make_close_panel({'VOL': closes, 'GONE': [np.nan] * 40})
+        result = UniverseBuilder(use_cache=False).screen_history_panel(panel)
+        assert result['ticker'].tolist() == ['VOL']
+
+    def test_empty_panel(self):
+        """Empty download should return an empty frame"""
+        result = UniverseBuilder(use_cache=False).screen_history_panel(pd.DataFrame())
+        assert result.empty
+
+
+    def test_fused_kernel_matches_numpy_path(self, make_close_panel):
+        """screen_kernel should select the same tickers with the same metrics"""
+        rng = np.random.RandomState(7)
+        closes = {f'T{i}': 5 * np.cumprod(1 + rng.randn(60) * 0.05) for i in range(12)}
+        closes['T0'][-3:] = np.nan
+        closes['T1'][:] = np.nan
+        panel = make_close_panel(closes)
+        builder = UniverseBuilder(use_cache=False)
+        with patch('scripts.universe_builder.NUMBA_AVAILABLE', False):
+            expected = builder.screen_history_panel(panel, min_volatility=75)
+        with patch('scripts.universe_builder.NUMBA_AVAILABLE', True):
+            fused = builder.screen_history_panel(panel, min_volatility=75)
+        assert fused['ticker'].tolist() == expected['ticker'].tolist()
+        assert fused['volatility'].to_numpy() == pytest.approx(expected['volatility'].to_numpy(), abs=0.02)
+
+class TestBulkScreen:
+    """Tests for the concurrent chunked download screen"""
+
+    def test_results_keep_input_order(self, make_close_panel):
+        """Chunks finishing out of order should still concatenate in ticker order"""
+        closes = [10.0 * (1.1 if i % 2 else 1.0) for i in range(40)]
+        tickers = [f'T{i}' for i in range(10)]
+        with patch('scripts.universe_builder.yf.download',
+                   side_effect=lambda chunk, **kwargs: make_close_panel({t: closes for t in chunk})):
+            result = UniverseBuilder(use_cache=False).bulk_screen(tickers, chunk_size=3, max_workers=4)
+        assert result['ticker'].tolist() == tickers
+
+    def test_repeat_run_served_from_memo(self, tmp_path, monkeypatch, make_close_panel):
+        """Tickers screened earlier today should not be downloaded again"""
+        monkeypatch.chdir(tmp_path)
+        closes = [10.0 * (1.1 if i % 2 else 1.0) for i in range(40)]
+        builder = UniverseBuilder()
+        with patch('scripts.universe_builder.yf.download',
+                   side_effect=lambda chunk, **kwargs: make_close_panel({t: closes for t in chunk})) as download:
+            first = builder.bulk_screen(['A', 'B', 'A'])
+            second = builder.bulk_screen(['A', 'B'])
+        assert download.call_count == 1
+        assert first['ticker'].tolist() == second['ticker'].tolist() == ['A', 'B']
+        assert builder.screen_stats == {'cache_hits': 2, 'inflight_dedupes': 1, 'upstream_calls': 1}
+
+    def test_stats_counted_across_threads(self, make_close_panel):
+        """Concurrent screens should not lose counter increments"""
+        closes = [10.0 * (1.1 if i % 2 else 1.0) for i in range(40)]
+        builder = UniverseBuilder(use_cache=False)
+        with patch('scripts.universe_builder.yf.download',
+                   side_effect=lambda chunk, **kwargs: make_close_panel({t: closes for t in chunk})):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda i: builder.bulk_screen([f'T{i}', f'U{i}', f'T{i}'], chunk_size=1),
+                              range(16)))
+        assert builder.screen_stats == {'cache_hits': 0, 'inflight_dedupes': 16, 'upstream_calls': 32}
+
+    def test_empty_download_retried(self, make_close_panel):
+        """A chunk that comes back empty (rate limited) should be retried"""
+        closes = [10.0 * (1.1 if i % 2 else 1.0) for i in range(40)]
+        responses = [pd.DataFrame(), make_close_panel({'VOL': closes})]
+        with patch('scripts.universe_builder.yf.download', side_effect=responses) as download, \
+                patch('scripts.universe_builder.time.sleep') as sleep:
+            data = UniverseBuilder(use_cache=False).download_chunk(['VOL'])
+        assert download.call_count == 2
+        assert sleep.call_count == 1
+        assert not data.empty
+
+    def test_gives_up_after_retries(self):
+        """A chunk that never returns data should yield None"""
+        with patch('scripts.universe_builder.yf.download', return_value=pd.DataFrame()), \
+                patch('scripts.universe_builder.time.sleep'):
+            assert UniverseBuilder(use_cache=False).download_chunk(['GONE']) is None
+
+
+class TestAddMarketCaps:
+    """Tests for the survivor market cap lookup"""
+
+    @pytest.fixture
+    def screened(self):
+        """History-screen output for three tickers"""
+        return pd.DataFrame({
+            'ticker': ['SMALL', 'HUGE', 'NONE'],
+            'price': [5.0, 6.0, 7.0],
+            'volume': [1_000_000] * 3,
+            'volatility': [80.0, 90.0, 100.0]
+        })
+
+    def test_filters_and_orders_columns(self, screened):
+        """Large and missing market caps should be dropped, columns in saved order"""
+        caps = {'SMALL': 1e9, 'HUGE': 1e11, 'NONE': None}
+        builder = UniverseBuilder(use_cache=False)
+        with patch.object(builder, 'get_ticker_quote',
+                          side_effect=lambda t, stock: {'market_cap': caps[t], 'exchange': 'NMS'}):
+            result = builder.add_market_caps(screened)
+        assert result['ticker'].tolist() == ['SMALL']
+        assert result['market_cap'].iloc[0] == 1_000_000_000
+        assert result.columns.tolist() == ['ticker', 'price', 'volume', 'market_cap', 'volatility', 'exchange']
+
+    def test_empty_input(self):
+        """Nothing to look up for an empty screen"""
+        result = UniverseBuilder(use_cache=False).add_market_caps(pd.DataFrame())
+        assert result.empty
+
+
+class TestGetAllMarketTickers:
+    """Tests for the exchange listing merge and stock filter"""
+
+    def test_filters_non_stocks(self):
+        """Warrants, units, rights, long and dotted symbols should be dropped, duplicates once"""
+        builder = UniverseBuilder(use_cache=False)
+        nasdaq = ['AAPL', 'ABCDE', 'AB-WS', 'XY-WT', 'XY-U', 'XY-R', 'TOOLONG', 'A.B', '-ABC', '']
+        nyse = ['BRK-B', 'AAPL', 'F']
+        with patch.object(builder, 'get_all_nasdaq_tickers', return_value=nasdaq), \
+                patch.object(builder, 'get_all_nyse_tickers', return_value=nyse):
+            tickers = builder.get_all_market_tickers()
+        assert tickers == ['AAPL', 'ABCDE', 'BRK-B', 'F']
+
+    def test_exchanges_optional(self):
+        """Excluded exchanges should not be fetched"""
+        builder = UniverseBuilder(use_cache=False)
+        with patch.object(builder, 'get_all_nasdaq_tickers', return_value=['AAA']), \
+                patch.object(builder, 'get_all_nyse_tickers') as nyse:
+            assert builder.get_all_market_tickers(include_nyse=False) == ['AAA']
+        nyse.assert_not_called()
+
+
+class TestSaveUniverse:
+    """Tests for the saved universe directory and its main-directory links"""
+
+    @pytest.fixture
+    def saved(self, tmp_path, monkeypatch):
+        """Save a three-stock universe from tmp_path, returning its directory"""
+        monkeypatch.chdir(tmp_path)
+        df = pd.DataFrame({
+            'ticker': ['AAA', 'BBB', 'CCC'],
+            'price': [5.0, 6.0, 7.0],
+            'volume': [1_000_000] * 3,
+            'market_cap': [1e9] * 3,
+            'volatility': [80.0, 90.0, 100.0],
+            'exchange': ['NMS'] * 3
+        })
+        return tmp_path / UniverseBuilder(use_cache=False).save_universe(df)
+
+    def test_main_module_linked(self, saved, tmp_path):
+        """custom_universe.py should be the saved universe.py, linked rather than rewritten"""
+        assert os.path.samefile(tmp_path / 'custom_universe.py', saved / 'universe.py')
+        assert not os.path.exists(tmp_path / 'custom_universe.py.tmp')
+
+    def test_sidecar_linked(self, saved, tmp_path):
+        """The ticker sidecar should sit next to both modules"""
+        assert json.loads((saved / 'universe.json').read_text()) == ['AAA', 'BBB', 'CCC']
+        assert os.path.samefile(tmp_path / 'custom_universe.json', saved / 'universe.json')
+
+    def test_module_loads_sidecar(self, saved, tmp_path):
+        """Importing the linked module should read the tickers from its sidecar"""
+        namespace = {'__file__': str(tmp_path / 'custom_universe.py')}
+        exec((tmp_path / 'custom_universe.py').read_text(), namespace)
+        assert namespace['CUSTOM_UNIVERSE'] == ['AAA', 'BBB', 'CCC']
+
+    def test_index_rebuilt(self, saved, tmp_path):
+        """Saving should fold the new universe into universes/index.json"""
+        with open(tmp_path / 'universes' / 'index.json') as f:
+            index = json.load(f)
+        assert list(index['universes']) == [saved.name]
+
+    def test_relink_leaves_old_universe_intact(self, saved, tmp_path):
+        """Pointing custom_universe.py at a newer universe should replace the link, not write through it"""
+        newer = saved.parent / 'universe_99990101_000000'
+        os.makedirs(newer)
+        (newer / 'universe.py').write_text('# newer\n')
+        (newer / 'universe.json').write_text('[]')
+        _link_or_copy(str(newer / 'universe.py'), 'custom_universe.py')
+        assert (tmp_path / 'custom_universe.py').read_text() == '# newer\n'
+        assert (saved / 'universe.py').read_text() != '# newer\n'
+
+
+class TestComputeAnnualizedVol:
+    """Tests for the per-ticker volatility kernel"""
+
+    def test_matches_numpy_std(self):
+        """Kernel should equal the sample std of the last 20 log returns, annualized"""
+        np.random.seed(42)
+        closes = 10 + np.random.rand(60)
+        returns = np.diff(np.log(closes))
+        expected = returns[-20:].std(ddof=1) * np.sqrt(252) * 100
+        assert compute_annualized_vol(closes) == pytest.approx(expected)
+
+    def test_skips_nan_returns(self):
+        """Returns touching a NaN close should be ignored"""
+        closes = np.array([10.0, 11.0, np.nan, 10.0, 11.0, 10.0, 11.0, 10.0, 11.0])
+        returns = np.diff(np.log(closes))
+        returns = returns[np.isfinite(returns)]
+        expected = returns.std(ddof=1) * np.sqrt(252) * 100
+        assert compute_annualized_vol(closes) == pytest.approx(expected)
+
+    def test_short_series(self):
+        """Fewer than 5 returns should return -1"""
+        assert compute_annualized_vol(np.array([10.0, 11.0, 12.0])) == -1.0
+
+
+class TestObservedPeriodsPerYear:
+    """Tests for the gap-aware annualization factor"""
+
+    def test_daily_bars(self):
+        """Gap-free daily bars should annualize with 252"""
+        index = pd.bdate_range('2024-01-01', periods=60)
+        assert observed_periods_per_year(index) == 252.0
+
+    def test_holiday_ignored(self):
+        """A single missing weekday (exchange holiday) should not change the factor"""
+        index = pd.bdate_range('2024-01-01', periods=60).delete(50)
+        assert observed_periods_per_year(index) == 252.0
+
+    def test_every_other_day(self):
+        """Bars on every other session should halve the periods per year"""
+        index = pd.bdate_range('2024-01-01', periods=60)[::2]
+        assert observed_periods_per_year(index) == pytest.approx(126.0)
+
+    def test_kernel_scales_with_periods(self):
+        """Volatility should scale with the square root of periods per year"""
+        closes = 10 + np.random.RandomState(0).rand(60)
+        full = compute_annualized_vol(closes)
+        half = compute_annualized_vol(closes, periods_per_year=126.0)
+        assert half == pytest.approx(full / np.sqrt(2))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
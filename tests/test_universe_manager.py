@@ -0,0 +1,484 @@
+"""
+Unit tests for the UniverseManager listing helpers
+"""
+
+import pytest
+import json
+import subprocess
+import sys
+import os
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.universe_manager import UniverseManager, _fast_copy
+
+
+def make_universe(base_dir, name: str, created: str, tickers=('AAA', 'BBB'), all_tickers: bool = False):
+    """Write a universe directory with metadata.json and universe_data.csv"""
+    path = os.path.join(base_dir, name)
+    os.makedirs(path)
+    metadata = {
+        'created': created,
+        'total_stocks': len(tickers),
+        'avg_volatility': 80.0,
+        'min_volatility': 60.0,
+        'max_volatility': 100.0,
+        'avg_volume': 1_000_000,
+        'avg_market_cap': 500_000_000,
+        'price_range': {'min': 2.0, 'max': 20.0},
+        'top_10_tickers': list(tickers)
+    }
+    if all_tickers:
+        metadata['all_tickers'] = list(tickers)
+    with open(os.path.join(path, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f)
+    with open(os.path.join(path, 'universe_data.csv'), 'w') as f:
+        f.write('ticker,price,volatility\n')
+        f.write(''.join(f'{t},5.0,80.0\n' for t in tickers))
+    return path
+
+
+class TestListUniverses:
+    """Tests for the cached universe listing"""
+
+    def test_newest_first(self, tmp_path):
+        """Universes should be sorted by creation time, newest first"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        make_universe(tmp_path, 'universe_b', '20240201_000000')
+        universes = UniverseManager(str(tmp_path)).list_universes()
+        assert [u['name'] for u in universes] == ['universe_b', 'universe_a']
+
+    def test_warm_call_skips_rescan(self, tmp_path):
+        """An unchanged directory should be served from the cache"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        manager = UniverseManager(str(tmp_path))
+        first = manager.list_universes()
+        with patch('scripts.universe_manager.os.scandir') as scandir:
+            second = manager.list_universes()
+        scandir.assert_not_called()
+        assert second == first
+
+    def test_new_universe_picked_up(self, tmp_path):
+        """Adding a universe directory should invalidate the cached list"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        manager = UniverseManager(str(tmp_path))
+        manager.list_universes()
+        make_universe(tmp_path, 'universe_b', '20240201_000000')
+        os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 1))
+        assert len(manager.list_universes()) == 2
+
+    def test_invalidate_forces_reload(self, tmp_path):
+        """invalidate() should make the next call read from disk again"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        manager = UniverseManager(str(tmp_path))
+        manager.list_universes()
+        manager.invalidate()
+        with patch.object(manager, '_read_index', wraps=manager._read_index) as read_index:
+            manager.list_universes()
+        read_index.assert_called_once()
+
+    def test_index_serves_new_manager(self, tmp_path):
+        """A fresh manager should list from index.json without parsing any metadata.json"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        make_universe(tmp_path, 'universe_b', '20240201_000000')
+        expected = UniverseManager(str(tmp_path)).list_universes()
+        assert os.path.exists(tmp_path / 'index.json')
+        manager = UniverseManager(str(tmp_path))
+        with patch.object(manager, '_scan_universes') as scan:
+            universes = manager.list_universes()
+        scan.assert_not_called()
+        assert universes == expected
+
+    def test_stale_index_rebuilt(self, tmp_path):
+        """A universe added after the index was written should trigger a rescan"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        UniverseManager(str(tmp_path)).list_universes()
+        make_universe(tmp_path, 'universe_b', '20240201_000000')
+        universes = UniverseManager(str(tmp_path)).list_universes()
+        assert [u['name'] for u in universes] == ['universe_b', 'universe_a']
+        with open(tmp_path / 'index.json') as f:
+            assert sorted(json.load(f)['universes']) == ['universe_a', 'universe_b']
+
+    def test_edited_metadata_invalidates_index(self, tmp_path):
+        """Rewriting a metadata.json (parent mtime unchanged) should not serve the old index"""
+        path = make_universe(tmp_path, 'universe_a', '20240101_000000')
+        UniverseManager(str(tmp_path)).list_universes()
+        metadata_file = os.path.join(path, 'metadata.json')
+        with open(metadata_file) as f:
+            metadata = json.load(f)
+        metadata['total_stocks'] = 99
+        with open(metadata_file, 'w') as f:
+            json.dump(metadata, f)
+        os.utime(metadata_file, ns=(0, os.stat(metadata_file).st_mtime_ns + 1))
+        assert UniverseManager(str(tmp_path)).list_universes()[0]['total_stocks'] == 99
+
+    def test_metadata_written_after_index(self, tmp_path):
+        """A directory listed before its metadata.json existed should appear once it is written"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        os.makedirs(tmp_path / 'universe_b')
+        assert len(UniverseManager(str(tmp_path)).list_universes()) == 1
+        os.rmdir(tmp_path / 'universe_b')
+        make_universe(tmp_path, 'universe_b', '20240201_000000')
+        assert len(UniverseManager(str(tmp_path)).list_universes()) == 2
+
+    @pytest.mark.parametrize('contents', [b'', b'{"stamp": [', b'[]', b'{"universe_a": {}}'])
+    def test_unreadable_index_rescanned(self, tmp_path, contents):
+        """A corrupt or old-format index.json should be treated as a cache miss"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        (tmp_path / 'index.json').write_bytes(contents)
+        universes = UniverseManager(str(tmp_path)).list_universes()
+        assert [u['name'] for u in universes] == ['universe_a']
+        with open(tmp_path / 'index.json') as f:
+            assert list(json.load(f)['universes']) == ['universe_a']
+
+    def test_read_only_directory_still_listed(self, tmp_path):
+        """A base_dir the index cannot be written to should still list its universes"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        with patch('scripts.universe_manager.tempfile.mkstemp', side_effect=PermissionError('read-only')):
+            universes = UniverseManager(str(tmp_path)).list_universes()
+        assert [u['name'] for u in universes] == ['universe_a']
+        assert not os.path.exists(tmp_path / 'index.json')
+
+    def test_failed_index_write_cleaned_up(self, tmp_path):
+        """A rebuild that cannot replace index.json should remove its temp file"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        with patch('scripts.universe_manager.os.replace', side_effect=OSError('busy')):
+            assert len(UniverseManager(str(tmp_path)).list_universes()) == 1
+        assert sorted(os.listdir(tmp_path)) == ['universe_a']
+
+    def test_concurrent_rebuilds_use_own_temp_files(self, tmp_path):
+        """Parallel rebuilds should each write a temp file of their own and all succeed"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        manager = UniverseManager(str(tmp_path))
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: manager.rebuild_index(), range(32)))
+        assert sorted(os.listdir(tmp_path)) == ['index.json', 'universe_a']
+        with open(tmp_path / 'index.json') as f:
+            assert list(json.load(f)['universes']) == ['universe_a']
+
+    def test_directory_without_metadata_skipped(self, tmp_path):
+        """A universe_* directory with no metadata.json should be ignored"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        os.makedirs(tmp_path / 'universe_partial')
+        universes = UniverseManager(str(tmp_path)).list_universes()
+        assert [u['name'] for u in universes] == ['universe_a']
+
+    def test_many_universes_loaded_in_parallel(self, tmp_path):
+        """Above the threshold the pooled load should return the same sorted list"""
+        for i in range(12):
+            make_universe(tmp_path, f'universe_{i:02d}', f'2024{i + 1:02d}01_000000')
+        os.makedirs(tmp_path / 'universe_partial')
+        universes = UniverseManager(str(tmp_path)).list_universes()
+        assert [u['name'] for u in universes] == [f'universe_{i:02d}' for i in reversed(range(12))]
+
+    def test_missing_directory(self, tmp_path):
+        """A missing base directory should yield an empty list"""
+        assert UniverseManager(str(tmp_path / 'nope')).list_universes() == []
+
+    def test_listing_does_not_import_pandas(self, tmp_path):
+        """Listing universes should not pay for the pandas import"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        code = ("import sys; from scripts.universe_manager import UniverseManager; "
+                f"UniverseManager({str(tmp_path)!r}).list_universes(); print('pandas' in sys.modules)")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True)
+        assert result.stdout.strip() == 'False'
+
+
+class TestReadUniverseDf:
+    """Tests for the Parquet-first dataset reader"""
+
+    def test_csv_fallback_with_columns(self, tmp_path):
+        """Without a Parquet copy only the requested CSV columns should load"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        manager = UniverseManager(str(tmp_path))
+        df = manager._read_universe_df(manager.list_universes()[0], columns=['ticker'])
+        assert df.columns.tolist() == ['ticker']
+        assert df['ticker'].tolist() == ['AAA', 'BBB']
+
+    def test_read_tickers(self, tmp_path):
+        """The ticker-only reader should return the dataset's ticker column"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000', tickers=('AAA', 'BBB', 'CCC'))
+        manager = UniverseManager(str(tmp_path))
+        assert manager._read_tickers(manager.list_universes()[0]) == ['AAA', 'BBB', 'CCC']
+
+    def test_migration_writes_parquet(self, tmp_path):
+        """migrate_csv_to_parquet should add a Parquet copy that is read back first"""
+        pytest.importorskip('pyarrow')
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        manager = UniverseManager(str(tmp_path))
+        assert manager.migrate_csv_to_parquet() == 1
+        assert os.path.exists(tmp_path / 'universe_a' / 'universe_data.parquet')
+        assert manager.migrate_csv_to_parquet() == 0
+
+    def test_migration_needs_pyarrow(self, tmp_path):
+        """Without pyarrow nothing should be migrated"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        with patch('scripts.universe_manager.PYARROW_AVAILABLE', False):
+            assert UniverseManager(str(tmp_path)).migrate_csv_to_parquet() == 0
+
+
+class TestShowUniverses:
+    """Tests for the universe table"""
+
+    def test_rows_in_listing_order(self, tmp_path, capsys):
+        """Each universe should get one numbered row, newest first"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        make_universe(tmp_path, 'universe_b', '20240201_000000', tickers=('ZZZ',))
+        UniverseManager(str(tmp_path)).show_universes()
+        rows = [line.split() for line in capsys.readouterr().out.splitlines() if 'universe_' in line]
+        assert rows == [['1', '20240201_000000', '1', '80.0', 'ZZZ', 'universe_b'],
+                        ['2', '20240101_000000', '2', '80.0', 'AAA', 'universe_a']]
+
+    def test_uses_tabulate_when_installed(self, tmp_path, capsys):
+        """With tabulate available the rows should be handed to it as tuples"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        with patch('scripts.universe_manager.tabulate', return_value='<table>') as tabulate:
+            UniverseManager(str(tmp_path)).show_universes()
+        rows = tabulate.call_args[0][0]
+        assert rows == [(1, '20240101_000000', 2, 80.0, 'AAA', 'universe_a')]
+        assert '<table>' in capsys.readouterr().out
+
+
+class TestResolve:
+    """Tests for the shared ID / name lookup"""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Manager over two universes"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        make_universe(tmp_path, 'universe_b', '20240201_000000')
+        return UniverseManager(str(tmp_path))
+
+    @pytest.mark.parametrize('universe_id', [3, -1])
+    def test_out_of_range_id(self, manager, capsys, universe_id):
+        """IDs outside 1..N should print an error and return None"""
+        assert manager._resolve(universe_id=universe_id) is None
+        assert capsys.readouterr().out.strip() == f'Invalid universe ID: {universe_id}'
+
+    def test_passed_list_not_rescanned(self, manager):
+        """A list passed in by the caller should be used as-is"""
+        universes = manager.list_universes()
+        with patch.object(manager, 'list_universes') as list_universes:
+            assert manager._resolve(universes, universe_id=2)['name'] == 'universe_a'
+            assert manager._resolve(universes, universe_name='universe_b')['name'] == 'universe_b'
+        list_universes.assert_not_called()
+
+
+class TestUniverseDetails:
+    """Tests for the cached details view"""
+
+    def test_details_rendered_once(self, tmp_path, capsys):
+        """Viewing the same universe twice should reuse the rendered page"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        manager = UniverseManager(str(tmp_path))
+        with patch.object(manager, '_render_details', wraps=manager._render_details) as render:
+            assert manager.get_universe_details(universe_id=1)['name'] == 'universe_a'
+            manager.get_universe_details(universe_name='universe_a')
+        assert render.call_count == 1
+        assert capsys.readouterr().out.count('UNIVERSE DETAILS: universe_a') == 2
+
+    def test_edited_metadata_rerendered(self, tmp_path, capsys):
+        """Rewriting metadata.json should show the new values on the next view"""
+        path = make_universe(tmp_path, 'universe_a', '20240101_000000')
+        manager = UniverseManager(str(tmp_path))
+        manager.get_universe_details(universe_name='universe_a')
+        metadata_file = os.path.join(path, 'metadata.json')
+        with open(metadata_file) as f:
+            metadata = json.load(f)
+        metadata['total_stocks'] = 99
+        with open(metadata_file, 'w') as f:
+            json.dump(metadata, f)
+        os.utime(metadata_file, ns=(0, os.stat(metadata_file).st_mtime_ns + 1))
+        manager.get_universe_details(universe_name='universe_a')
+        assert capsys.readouterr().out.count('Total Stocks: 99') == 1
+
+    def test_cache_is_per_instance(self, tmp_path):
+        """Rendered pages live on the manager, so dropping it frees them"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        first, second = UniverseManager(str(tmp_path)), UniverseManager(str(tmp_path))
+        first.get_universe_details(universe_id=1)
+        assert list(first._details_cache) == ['universe_a']
+        assert second._details_cache == {}
+
+    def test_invalidate_drops_rendered_pages(self, tmp_path):
+        """invalidate() should empty the details cache along with the listing"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        manager = UniverseManager(str(tmp_path))
+        manager.get_universe_details(universe_id=1)
+        manager.invalidate()
+        assert manager._details_cache == {}
+        with patch.object(manager, '_render_details', wraps=manager._render_details) as render:
+            manager.get_universe_details(universe_id=1)
+        assert render.call_count == 1
+
+    def test_unknown_name(self, tmp_path, capsys):
+        """An unknown name should print an error and return None"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        assert UniverseManager(str(tmp_path)).get_universe_details(universe_name='universe_x') is None
+        assert 'Universe not found: universe_x' in capsys.readouterr().out
+
+
+class TestActivateUniverse:
+    """Tests for switching the active universe"""
+
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        """Manager over two universes with universe.py modules, run from tmp_path"""
+        for name, created in (('universe_a', '20240101_000000'), ('universe_b', '20240201_000000')):
+            path = make_universe(tmp_path / 'universes', name, created)
+            with open(os.path.join(path, 'universe.py'), 'w') as f:
+                f.write(f'# {name}\n')
+            with open(os.path.join(path, 'universe.json'), 'w') as f:
+                json.dump([name], f)
+        monkeypatch.chdir(tmp_path)
+        return UniverseManager(str(tmp_path / 'universes'))
+
+    def test_copies_module_and_sidecar(self, manager, tmp_path):
+        """Activation should copy universe.py and universe.json into place"""
+        assert manager.activate_universe(universe_name='universe_a')
+        assert (tmp_path / 'custom_universe.py').read_text() == '# universe_a\n'
+        assert json.loads((tmp_path / 'custom_universe.json').read_text()) == ['universe_a']
+
+    def test_activation_rebuilds_index(self, manager, tmp_path):
+        """Activating should leave an up-to-date index.json behind"""
+        manager.activate_universe(universe_name='universe_a')
+        with open(tmp_path / 'universes' / 'index.json') as f:
+            assert sorted(json.load(f)['universes']) == ['universe_a', 'universe_b']
+
+    def test_already_active_skips_copy(self, manager, tmp_path, capsys):
+        """Re-activating the same universe should not back up or copy anything"""
+        manager.activate_universe(universe_name='universe_a')
+        with patch('scripts.universe_manager._fast_copy') as fast_copy:
+            assert manager.activate_universe(universe_name='universe_a')
+        fast_copy.assert_not_called()
+        assert 'Already active: universe_a' in capsys.readouterr().out
+        assert not any(p.startswith('custom_universe_backup_') for p in os.listdir(tmp_path))
+
+
+class TestDeleteUniverse:
+    """Tests for removing a universe"""
+
+    def test_delete_rebuilds_index_and_caches(self, tmp_path, capsys):
+        """A deleted universe should leave the listing, the details cache and index.json"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        make_universe(tmp_path, 'universe_b', '20240201_000000')
+        manager = UniverseManager(str(tmp_path))
+        manager.get_universe_details(universe_name='universe_a')
+        with patch('builtins.input', return_value='DELETE'):
+            assert manager.delete_universe(universe_name='universe_a')
+        assert 'universe_a' not in manager._details_cache
+        assert [u['name'] for u in manager.list_universes()] == ['universe_b']
+        with open(tmp_path / 'index.json') as f:
+            assert list(json.load(f)['universes']) == ['universe_b']
+
+    def test_cancelled_delete_keeps_universe(self, tmp_path, capsys):
+        """Anything but DELETE at the prompt should leave the universe in place"""
+        path = make_universe(tmp_path, 'universe_a', '20240101_000000')
+        with patch('builtins.input', return_value='no'):
+            assert not UniverseManager(str(tmp_path)).delete_universe(universe_id=1)
+        assert os.path.isdir(path)
+
+
+class TestCompareUniverses:
+    """Tests for the side-by-side universe comparison"""
+
+    def test_overlap_counts(self, tmp_path, capsys):
+        """Common and unique ticker counts should reflect both universes"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000', tickers=('AAA', 'BBB', 'CCC'))
+        make_universe(tmp_path, 'universe_b', '20240201_000000', tickers=('BBB', 'CCC', 'DDD', 'EEE'))
+        UniverseManager(str(tmp_path)).compare_universes(1, 2)
+        out = capsys.readouterr().out
+        assert 'Common Stocks             2' in out
+        # Universe 1 is the newest (universe_b)
+        assert 'Unique to Universe 1      2' in out
+        assert 'Unique to Universe 2      1' in out
+        assert 'Sample Common Stocks: BBB, CCC' in out
+
+    def test_uses_metadata_tickers(self, tmp_path, capsys):
+        """all_tickers in metadata.json should make the dataset files unnecessary"""
+        for name, created, tickers in (('universe_a', '20240101_000000', ('AAA', 'BBB')),
+                                       ('universe_b', '20240201_000000', ('BBB', 'CCC'))):
+            path = make_universe(tmp_path, name, created, tickers=tickers, all_tickers=True)
+            os.remove(os.path.join(path, 'universe_data.csv'))
+        UniverseManager(str(tmp_path)).compare_universes(1, 2)
+        assert 'Common Stocks             1' in capsys.readouterr().out
+
+
+class TestExportUniverse:
+    """Tests for exporting a universe dataset"""
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_json_records(self, tmp_path, monkeypatch, use_orjson):
+        """JSON export should hold one record per ticker with or without orjson"""
+        make_universe(tmp_path, 'universe_a', '20240101_000000')
+        monkeypatch.chdir(tmp_path)
+        manager = UniverseManager(str(tmp_path))
+        if not use_orjson:
+            monkeypatch.setattr('scripts.universe_manager.orjson', None)
+        manager.export_universe(1, 'json')
+        exported = next(p for p in os.listdir(tmp_path) if p.startswith('universe_export_'))
+        with open(tmp_path / exported) as f:
+            records = json.load(f)
+        assert records == [{'ticker': 'AAA', 'price': 5.0, 'volatility': 80.0},
+                           {'ticker': 'BBB', 'price': 5.0, 'volatility': 80.0}]
+
+    def test_csv_streamed_in_chunks(self, tmp_path, monkeypatch):
+        """Chunked CSV export should reproduce the dataset with a single header"""
+        tickers = tuple(f'T{i}' for i in range(7))
+        make_universe(tmp_path, 'universe_a', '20240101_000000', tickers=tickers)
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr('scripts.universe_manager.EXPORT_CHUNK_ROWS', 3)
+        UniverseManager(str(tmp_path)).export_universe(1, 'csv')
+        exported = next(p for p in os.listdir(tmp_path) if p.startswith('universe_export_'))
+        with open(tmp_path / exported) as f, open(tmp_path / 'universe_a' / 'universe_data.csv') as src:
+            assert f.read() == src.read()
+
+
+
+class TestFastCopy:
+    """Tests for the in-kernel file copy helper"""
+
+    def test_copies_bytes_and_mode(self, tmp_path):
+        """The copy should match the source contents and permission bits"""
+        src = tmp_path / 'src.py'
+        src.write_bytes(os.urandom(200_000))
+        os.chmod(src, 0o640)
+        _fast_copy(str(src), str(tmp_path / 'dst.py'))
+        assert (tmp_path / 'dst.py').read_bytes() == src.read_bytes()
+        assert os.stat(tmp_path / 'dst.py').st_mode == os.stat(src).st_mode
+
+    def test_userspace_fallback(self, tmp_path):
+        """When every kernel path fails the copy should still complete"""
+        src = tmp_path / 'src.py'
+        src.write_bytes(b'CUSTOM_UNIVERSE = []\n' * 1000)
+        with patch('scripts.universe_manager._copy_file_range', side_effect=OSError), \
+                patch('scripts.universe_manager._ficlone', side_effect=OSError), \
+                patch('scripts.universe_manager._sendfile', side_effect=OSError):
+            _fast_copy(str(src), str(tmp_path / 'dst.py'))
+        assert (tmp_path / 'dst.py').read_bytes() == src.read_bytes()
+
+    def test_short_kernel_copy_falls_back(self, tmp_path):
+        """A copy_file_range that reports 0 early must not leave a truncated file"""
+        src = tmp_path / 'src.py'
+        src.write_bytes(os.urandom(100_000))
+        real = os.copy_file_range
+        calls = []
+
+        def short_copy(infd, outfd, count, offset_src, offset_dst):
+            calls.append(offset_src)
+            return real(infd, outfd, min(count, 4096), offset_src, offset_dst) if len(calls) == 1 else 0
+
+        with patch('scripts.universe_manager.os.copy_file_range', side_effect=short_copy), \
+                patch('scripts.universe_manager._ficlone', side_effect=OSError), \
+                patch('scripts.universe_manager._sendfile', side_effect=OSError):
+            _fast_copy(str(src), str(tmp_path / 'dst.py'))
+        assert len(calls) == 2
+        assert (tmp_path / 'dst.py').read_bytes() == src.read_bytes()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
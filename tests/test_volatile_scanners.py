@@ -0,0 +1,519 @@
+"""
+Unit tests for the volatile stock scanners
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import time
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.volatile_scanner_advanced import (
+    AdvancedVolatilityScanner, _multi_vol, _array_metrics, _UNIVERSE, _SECTOR_MAP
+)
+from scripts._njit_kernels import compute_metrics_nb, _tail_stds
+from scripts.volatile_stock_scanner import VolatileStockScanner
+from scripts import volatile_scanner_advanced, volatile_stock_scanner, _scan_data
+
+
+INFO = {'beta': 1.8, 'marketCap': 500_000_000, 'exchange': 'NMS'}
+
+
+@pytest.fixture(autouse=True)
+def no_alpaca_credentials(monkeypatch):
+    """Keep scans on the (patched) yfinance path unless a test opts into Alpaca"""
+    monkeypatch.delenv('ALPACA_API_KEY', raising=False)
+    monkeypatch.delenv('ALPACA_SECRET_KEY', raising=False)
+    monkeypatch.delenv('ALPACA_DATA_FEED', raising=False)
+
+
+def alpaca_response(bars: dict, next_page_token=None) -> MagicMock:
+    """Fake /v2/stocks/bars response for {symbol: hist} frames"""
+    payload = {
+        'bars': {
+            symbol: [{'t': ts.isoformat() + 'Z', 'o': row.Open, 'h': row.High, 'l': row.Low,
+                      'c': row.Close, 'v': row.Volume} for ts, row in hist.iterrows()]
+            for symbol, hist in bars.items()
+        },
+        'next_page_token': next_page_token
+    }
+    return MagicMock(**{'json.return_value': payload})
+
+
+class TestExpandedUniverse:
+    """Tests for the import-time sector universe"""
+
+    def test_sorted_without_duplicates(self):
+        """Tickers listed under several sectors should appear once, in sorted order"""
+        universe = AdvancedVolatilityScanner(use_cache=False).get_expanded_universe()
+        assert universe == sorted(set(universe))
+        assert universe.count('COIN') == 1
+
+    def test_first_sector_wins(self):
+        """A ticker in several sector lists is tagged with the first one"""
+        assert _SECTOR_MAP['COIN'] == 'Crypto'
+        assert _SECTOR_MAP['ARM'] == 'Semiconductors'
+        assert set(_SECTOR_MAP) == set(_UNIVERSE)
+
+
+class TestDownloadHistory:
+    """Tests for the batched history download"""
+
+    @pytest.mark.parametrize('scanner_cls', [AdvancedVolatilityScanner, VolatileStockScanner])
+    def test_splits_panel_per_ticker(self, scanner_cls, make_hist, make_panel):
+        """Each ticker should get its own OHLCV frame; missing tickers are skipped"""
+        panel = make_panel({'AAA': make_hist(seed=1), 'BBB': make_hist(seed=2)})
+        panel.loc[:, 'BBB'] = np.nan
+        with patch('yfinance.download', return_value=panel) as download:
+            frames = scanner_cls(use_cache=False).download_history(['AAA', 'BBB', 'GONE'])
+        assert download.call_count == 1
+        assert list(frames) == ['AAA']
+        assert frames['AAA']['Close'].tolist() == make_hist(seed=1)['Close'].tolist()
+
+    @pytest.mark.parametrize('scanner_cls', [AdvancedVolatilityScanner, VolatileStockScanner])
+    def test_failed_download(self, scanner_cls):
+        """A raised error or empty frame should yield no histories"""
+        with patch('yfinance.download', side_effect=RuntimeError('429')):
+            assert scanner_cls(use_cache=False).download_history(['AAA']) == {}
+        with patch('yfinance.download', return_value=pd.DataFrame()):
+            assert scanner_cls(use_cache=False).download_history(['AAA']) == {}
+
+
+class TestComputeMetricsFromHist:
+    """Tests for the per-ticker metric computation on downloaded bars"""
+
+    def test_advanced_matches_single_ticker_path(self, make_hist):
+        """Batched metrics should equal the per-ticker get_real_time_metrics row"""
+        hist = make_hist()
+        stock = MagicMock(info=INFO)
+        stock.history.side_effect = lambda period, interval: hist if interval == '1d' else pd.DataFrame()
+        scanner = AdvancedVolatilityScanner(use_cache=False)
+        with patch('yfinance.Ticker', return_value=stock):
+            expected = scanner.get_real_time_metrics('AAA')
+        assert scanner._compute_metrics_from_hist('AAA', hist, INFO) == expected
+
+    def test_single_ticker_memoized_with_ttl(self, make_hist):
+        """Repeat lookups within SCAN_CACHE_TTL reuse the row; an older row is refetched"""
+        stock = MagicMock(info=INFO)
+        stock.history.return_value = make_hist()
+        scanner = AdvancedVolatilityScanner(use_cache=False)
+        with patch('yfinance.Ticker', return_value=stock) as ticker, \
+                patch('scripts.volatile_scanner_advanced.time.monotonic', return_value=1000.0) as clock:
+            first = scanner.get_real_time_metrics('AAA')
+            first['price'] = -1
+            clock.return_value += volatile_scanner_advanced.SCAN_CACHE_TTL
+            assert scanner.get_real_time_metrics('AAA')['price'] != -1
+            assert ticker.call_count == 1
+            clock.return_value += 1
+            scanner.get_real_time_metrics('AAA')
+            assert ticker.call_count == 2
+
+    def test_single_ticker_cache_per_instance(self, make_hist):
+        """Rows are cached on the scanner, not shared across instances"""
+        stock = MagicMock(info=INFO)
+        stock.history.return_value = make_hist()
+        with patch('yfinance.Ticker', return_value=stock) as ticker:
+            AdvancedVolatilityScanner(use_cache=False).get_real_time_metrics('AAA')
+            AdvancedVolatilityScanner(use_cache=False).get_real_time_metrics('AAA')
+        assert ticker.call_count == 2
+
+    def test_single_ticker_errors_not_memoized(self, make_hist):
+        """A failed lookup returns None and is retried on the next call"""
+        scanner = AdvancedVolatilityScanner(use_cache=False)
+        with patch('yfinance.Ticker', side_effect=RuntimeError('429')):
+            assert scanner.get_real_time_metrics('AAA') is None
+        stock = MagicMock(info=INFO)
+        stock.history.return_value = make_hist()
+        with patch('yfinance.Ticker', return_value=stock):
+            assert scanner.get_real_time_metrics('AAA')['ticker'] == 'AAA'
+
+    def test_basic_matches_single_ticker_path(self, make_hist):
+        """Batched metrics should equal the per-ticker calculate_metrics row"""
+        hist = make_hist()
+        stock = MagicMock(info=INFO)
+        stock.history.return_value = hist
+        scanner = VolatileStockScanner(use_cache=False)
+        with patch('yfinance.Ticker', return_value=stock):
+            expected = scanner.calculate_metrics('AAA')
+        assert scanner._compute_metrics_from_hist('AAA', hist, INFO) == expected
+
+    @pytest.mark.parametrize('scanner_cls', [AdvancedVolatilityScanner, VolatileStockScanner])
+    def test_atr_matches_rolling_true_range(self, scanner_cls, make_hist):
+        """ATR should equal the 14-bar rolling mean of the pandas true range"""
+        hist = make_hist(seed=3)
+        ranges = pd.concat([
+            hist['High'] - hist['Low'],
+            (hist['High'] - hist['Close'].shift()).abs(),
+            (hist['Low'] - hist['Close'].shift()).abs()
+        ], axis=1)
+        expected = ranges.max(axis=1).rolling(14).mean().iloc[-1]
+        row = scanner_cls(use_cache=False)._compute_metrics_from_hist('AAA', hist, INFO)
+        assert row['atr'] == round(expected, 2)
+        assert row['atr_%'] == round(expected / hist['Close'].iloc[-1] * 100, 2)
+
+    def test_volatility_from_log_returns(self, make_hist):
+        """Volatility columns should be annualized log-return std; daily_vol stays a plain % move"""
+        hist = make_hist(seed=6)
+        log_returns = np.log(hist['Close']).diff().dropna()
+        scale = np.sqrt(252) * 100
+        advanced = AdvancedVolatilityScanner(use_cache=False)._compute_metrics_from_hist('AAA', hist, INFO)
+        basic = VolatileStockScanner(use_cache=False)._compute_metrics_from_hist('AAA', hist, INFO)
+        assert advanced['annual_vol_%'] == round(log_returns.std() * scale, 2)
+        assert advanced['monthly_vol_%'] == round(log_returns.tail(20).std() * scale, 2)
+        assert advanced['daily_vol_%'] == round(abs(hist['Close'].pct_change().iloc[-1]) * 100, 2)
+        assert basic['hist_volatility_%'] == round(log_returns.std() * scale, 2)
+        assert basic['recent_volatility_%'] == round(log_returns.tail(20).std() * scale, 2)
+
+    @pytest.mark.parametrize('scanner_cls', [AdvancedVolatilityScanner, VolatileStockScanner])
+    def test_short_history_rejected(self, scanner_cls, make_hist):
+        """Fewer than 20 bars cannot be scored"""
+        assert scanner_cls(use_cache=False)._compute_metrics_from_hist('AAA', make_hist(10), INFO) is None
+
+    @pytest.mark.parametrize('scanner_cls', [AdvancedVolatilityScanner, VolatileStockScanner])
+    def test_empty_info(self, scanner_cls, make_hist):
+        """Missing quote info should leave the info-derived fields empty"""
+        row = scanner_cls(use_cache=False)._compute_metrics_from_hist('AAA', make_hist(), {})
+        assert row['ticker'] == 'AAA'
+        assert row['beta'] is None
+        assert row['exchange'] == 'Unknown'
+
+
+class TestMultiVol:
+    """Tests for the single-array multi-window volatility helper"""
+
+    def test_matches_pandas_tail_std(self):
+        """Each window should equal the annualized pandas tail(k).std()"""
+        returns = pd.Series(np.random.RandomState(5).randn(62) * 0.04)
+        vols = _multi_vol(returns.to_numpy())
+        scale = np.sqrt(252) * 100
+        for name, window in (('weekly', 5), ('recent', 10), ('monthly', 20), ('30d', 30), ('quarterly', 60)):
+            assert vols[name] == pytest.approx(returns.tail(window).std() * scale)
+        assert vols['annual'] == pytest.approx(returns.std() * scale)
+
+    def test_short_history(self):
+        """Windows longer than the history should be NaN"""
+        vols = _multi_vol(np.random.RandomState(5).randn(19) * 0.04)
+        assert np.isnan(vols['quarterly'])
+        assert np.isnan(vols['monthly'])
+        assert np.isfinite(vols['weekly'])
+
+
+class TestComputeMetricsKernel:
+    """Tests for the fused per-ticker metric kernel"""
+
+    @pytest.mark.parametrize('n_days', [20, 35, 70])
+    def test_kernel_matches_numpy_path(self, n_days, make_hist):
+        """compute_metrics_nb should agree with the NumPy fallback, NaN gaps included"""
+        hist = make_hist(n_days, seed=n_days)
+        hist.iloc[n_days // 2, hist.columns.get_loc('Close')] = np.nan
+        arrays = [hist[col].to_numpy() for col in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        expected = _array_metrics(*arrays)
+        result = compute_metrics_nb(*arrays)
+        assert len(result) == len(expected)
+        for value, reference in zip(result, expected):
+            assert value == pytest.approx(reference, nan_ok=True)
+
+    def test_compiled_kernel_matches_python(self, make_hist):
+        """The numba build (fastmath) should skip a NaN close like the interpreted kernel"""
+        if not hasattr(compute_metrics_nb, 'py_func'):
+            pytest.skip('numba not installed')
+        hist = make_hist(70, seed=70)
+        hist.iloc[35, hist.columns.get_loc('Close')] = np.nan
+        arrays = [hist[col].to_numpy() for col in ('Open', 'High', 'Low', 'Close', 'Volume')]
+        arrays[:4] = [prices.astype(np.float32) for prices in arrays[:4]]
+        compiled = compute_metrics_nb(*arrays)
+        assert np.isfinite(compiled[:7]).all()
+        for value, reference in zip(compiled, compute_metrics_nb.py_func(*arrays)):
+            assert value == pytest.approx(reference, rel=1e-6, nan_ok=True)
+
+    def test_float32_prices_give_float64_returns(self, make_hist):
+        """Volatilities from float32 closes should match float64 log returns of the same closes"""
+        hist = make_hist(70, seed=9)
+        arrays = [hist[col].to_numpy(dtype=np.float32) for col in ('Open', 'High', 'Low', 'Close')]
+        arrays.append(hist['Volume'].to_numpy())
+        returns = np.diff(np.log(arrays[3].astype(np.float64)))
+        expected = returns.std(ddof=1) * np.sqrt(252) * 100
+        assert compute_metrics_nb(*arrays)[4] == pytest.approx(expected, rel=1e-9)
+        assert _array_metrics(*arrays)[4] == pytest.approx(expected, rel=1e-9)
+
+    def test_tail_stds_match_numpy(self):
+        """One Welford pass should give every trailing-window std, capped at k values"""
+        r = np.random.RandomState(7).randn(40) * 0.03
+        stds = _tail_stds(r, 25, (5, 20, 60, 25, 1))
+        for value, window in zip(stds[:4], (5, 20, 25, 25)):
+            assert value == pytest.approx(r[25 - window:25].std(ddof=1))
+        assert np.isnan(stds[4])
+
+    def test_scanner_rows_match(self, make_hist):
+        """Rows built through the kernel should equal the NumPy path rows"""
+        hist = make_hist(seed=4)
+        scanner = AdvancedVolatilityScanner(use_cache=False)
+        with patch('scripts.volatile_scanner_advanced.NUMBA_AVAILABLE', False):
+            expected = scanner._compute_metrics_from_hist('AAA', hist, INFO)
+        with patch('scripts.volatile_scanner_advanced.NUMBA_AVAILABLE', True):
+            assert scanner._compute_metrics_from_hist('AAA', hist, INFO) == expected
+
+
+class TestScanCache:
+    """Tests for the on-disk cache shared by repeat scans"""
+
+    @pytest.mark.parametrize('scanner_cls', [AdvancedVolatilityScanner, VolatileStockScanner])
+    def test_repeat_download_served_from_cache(self, scanner_cls, tmp_path, monkeypatch, make_hist, make_panel):
+        """A second scan should only download tickers missing from the cache"""
+        monkeypatch.chdir(tmp_path)
+        scanner = scanner_cls()
+        with patch('yfinance.download', return_value=make_panel({'AAA': make_hist()})) as download:
+            scanner.download_history(['AAA'])
+            download.return_value = make_panel({'BBB': make_hist(seed=1)})
+            frames = scanner.download_history(['AAA', 'BBB'])
+        assert download.call_args_list[1].args[0] == ['BBB']
+        assert list(frames) == ['AAA', 'BBB']
+        pd.testing.assert_frame_equal(frames['AAA'], make_hist(), check_freq=False)
+
+    @pytest.mark.parametrize('scanner_cls', [AdvancedVolatilityScanner, VolatileStockScanner])
+    def test_info_cached_but_not_failures(self, scanner_cls, tmp_path, monkeypatch):
+        """Successful lookups are reused; failed ones are retried next time"""
+        monkeypatch.chdir(tmp_path)
+        scanner = scanner_cls()
+        with patch('yfinance.Ticker', side_effect=RuntimeError('429')):
+            assert scanner.get_info('AAA') == {}
+        with patch('yfinance.Ticker', return_value=MagicMock(info=INFO)) as ticker:
+            assert scanner.get_info('AAA') == INFO
+            assert scanner.get_info('AAA') == INFO
+        assert ticker.call_count == 1
+
+
+class TestAlpacaBars:
+    """Tests for the Alpaca multi-symbol bars download"""
+
+    def test_pages_and_chunks(self, monkeypatch, make_hist):
+        """Symbols go out 200 per request and next_page_token pages are concatenated"""
+        monkeypatch.setenv('ALPACA_API_KEY', 'key')
+        monkeypatch.setenv('ALPACA_SECRET_KEY', 'secret')
+        hist = make_hist(seed=1)
+        tickers = [f'T{i}' for i in range(201)]
+        scanner = AdvancedVolatilityScanner(use_cache=False)
+        pages = {
+            (tickers[0], None): alpaca_response({'T0': hist.iloc[:30]}, next_page_token='p2'),
+            (tickers[0], 'p2'): alpaca_response({'T0': hist.iloc[30:]}),
+            (tickers[200], None): alpaca_response({'T200': hist})
+        }
+        def get(url, params, headers, timeout):
+            assert headers['APCA-API-KEY-ID'] == 'key'
+            return pages[(params['symbols'].split(',')[0], params.get('page_token'))]
+        with patch.object(scanner.session, 'get', side_effect=get) as session_get:
+            frames = scanner.fetch_alpaca_bars(tickers)
+        assert session_get.call_count == 3
+        assert list(frames) == ['T0', 'T200']
+        assert frames['T0']['Close'].tolist() == hist['Close'].tolist()
+        assert frames['T0'].columns.tolist() == ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    def test_scan_market_falls_back_to_yfinance(self, monkeypatch, make_hist, make_panel):
+        """Tickers Alpaca has no bars for should be downloaded from yfinance"""
+        monkeypatch.setenv('ALPACA_API_KEY', 'key')
+        monkeypatch.setenv('ALPACA_SECRET_KEY', 'secret')
+        monkeypatch.setenv('ALPACA_DATA_FEED', 'sip')
+        scanner = AdvancedVolatilityScanner(use_cache=False)
+        with patch.object(scanner.session, 'get', return_value=alpaca_response({'AAA': make_hist(seed=1)})), \
+                patch('yfinance.download', return_value=make_panel({'BBB': make_hist(seed=2)})) as download, \
+                patch('yfinance.Ticker', return_value=MagicMock(info=INFO)):
+            df = scanner.scan_market(['AAA', 'BBB'])
+        assert download.call_args.args[0] == ['BBB']
+        assert df['ticker'].tolist() == ['AAA', 'BBB']
+
+
+    def test_failed_page_drops_chunk(self, monkeypatch, make_hist):
+        """An error after the first page should discard the chunk, not keep partial bars"""
+        monkeypatch.setenv('ALPACA_API_KEY', 'key')
+        monkeypatch.setenv('ALPACA_SECRET_KEY', 'secret')
+        hist = make_hist(seed=1)
+        scanner = AdvancedVolatilityScanner(use_cache=False)
+        responses = [alpaca_response({'AAA': hist.iloc[:30]}, next_page_token='p2'), RuntimeError('503')]
+        with patch.object(scanner.session, 'get', side_effect=responses):
+            assert scanner.fetch_alpaca_bars(['AAA']) == {}
+
+    def test_iex_feed_by_default(self, monkeypatch, make_hist, make_panel):
+        """Without ALPACA_DATA_FEED the free iex feed is used and scans stay on yfinance bars"""
+        monkeypatch.setenv('ALPACA_API_KEY', 'key')
+        monkeypatch.setenv('ALPACA_SECRET_KEY', 'secret')
+        monkeypatch.delenv('ALPACA_DATA_FEED', raising=False)
+        scanner = AdvancedVolatilityScanner(use_cache=False)
+        assert scanner.data_feed == 'iex'
+        with patch.object(scanner.session, 'get') as session_get, \
+                patch('yfinance.download', return_value=make_panel({'AAA': make_hist(seed=1)})), \
+                patch('yfinance.Ticker', return_value=MagicMock(info=INFO)):
+            df = scanner.scan_market(['AAA'])
+        session_get.assert_not_called()
+        assert df['ticker'].tolist() == ['AAA']
+
+
+class TestFetchInfos:
+    """Tests for the concurrent quote lookups"""
+
+    @pytest.mark.parametrize('scanner_cls', [AdvancedVolatilityScanner, VolatileStockScanner])
+    def test_results_keep_input_order(self, scanner_cls):
+        """Lookups finishing out of order should still line up with the tickers"""
+        def slow_ticker(symbol):
+            time.sleep(0.01 * (5 - int(symbol[1])))
+            return MagicMock(info={'symbol': symbol})
+        tickers = [f'T{i}' for i in range(5)]
+        with patch('yfinance.Ticker', side_effect=slow_ticker):
+            infos = scanner_cls(use_cache=False).fetch_infos(tickers, max_workers=5)
+        assert [info['symbol'] for info in infos] == tickers
+
+    @pytest.mark.parametrize('scanner_cls', [AdvancedVolatilityScanner, VolatileStockScanner])
+    def test_failed_lookup_is_empty(self, scanner_cls):
+        """A lookup that raises should yield an empty dict instead of aborting the scan"""
+        with patch('yfinance.Ticker', side_effect=RuntimeError('429')):
+            assert scanner_cls(use_cache=False).fetch_infos(['AAA', 'BBB']) == [{}, {}]
+
+
+class TestScan:
+    """Tests for the full scan loops"""
+
+    def test_scan_market_fetches_info_for_survivors_only(self, make_hist, make_panel):
+        """Tickers failing the pre-filter keep their bar metrics but never reach the .info lookup"""
+        panel = make_panel({
+            'AAA': make_hist(seed=1),
+            'BBB': make_hist(seed=2),
+            'BIG': make_hist(seed=3, start=500.0)
+        })
+        panel.loc[panel.index[:-10], 'BBB'] = np.nan
+        with patch('yfinance.download', return_value=panel), \
+                patch('yfinance.Ticker', return_value=MagicMock(info=INFO)) as ticker:
+            df = AdvancedVolatilityScanner(use_cache=False).scan_market(['AAA', 'BBB', 'BIG'])
+        # BBB has too few bars for any metrics; BIG is priced above the pre-filter
+        assert df['ticker'].tolist() == ['AAA', 'BIG']
+        assert df['sector'].tolist() == ['Other', 'Other']
+        assert df['market_cap_$M'].tolist()[0] == 500.0
+        assert np.isnan(df['market_cap_$M'].iloc[1])
+        assert df['exchange'].tolist() == ['NMS', 'Unknown']
+        assert df['price'].iloc[1] > 200
+        ticker.assert_called_once_with('AAA')
+
+    def test_scan_market_column_dtypes(self, make_hist, make_panel):
+        """Numeric columns should be float64/int64 even when every value is None"""
+        panel = make_panel({'AAA': make_hist(30, seed=1), 'BBB': make_hist(seed=2)})
+        with patch('yfinance.download', return_value=panel), \
+                patch('yfinance.Ticker', return_value=MagicMock(info={})):
+            df = AdvancedVolatilityScanner(use_cache=False).scan_market(['AAA', 'BBB'])
+        assert df['quarterly_vol_%'].dtype == np.float64
+        assert df['intraday_vol_%'].dtype == np.float64
+        assert df['beta'].isna().all() and df['beta'].dtype == np.float64
+        assert df['volume'].dtype == np.int64
+        assert df['exchange'].tolist() == ['Unknown', 'Unknown']
+
+    def test_intraday_bars_are_opt_in(self, make_hist, make_panel):
+        """Default scans skip the 1-minute download; compute_intraday fills intraday_vol_%"""
+        panel = make_panel({'AAA': make_hist(seed=1)})
+        minute_panel = make_panel({'AAA': make_hist(30, seed=2)})
+        scanner = AdvancedVolatilityScanner(use_cache=False)
+        with patch('yfinance.download', return_value=panel) as download, \
+                patch('yfinance.Ticker', return_value=MagicMock(info=INFO)):
+            df = scanner.scan_market(['AAA'])
+        assert download.call_count == 1
+        assert df['intraday_vol_%'].isna().all()
+        
+        with patch('yfinance.download', side_effect=[panel, minute_panel]) as download, \
+                patch('yfinance.Ticker', return_value=MagicMock(info=INFO)):
+            df = scanner.scan_market(['AAA'], compute_intraday=True)
+        assert download.call_args_list[1].kwargs['interval'] == '1m'
+        assert df['intraday_vol_%'].iloc[0] > 0
+
+    def test_get_intraday_vol(self, make_hist):
+        """get_intraday_vol should use today's 1-minute closes and need more than 10 bars"""
+        bars = make_hist(30, seed=2)
+        expected = bars['Close'].pct_change().std() * 100
+        scanner = AdvancedVolatilityScanner(use_cache=False)
+        with patch('yfinance.Ticker', return_value=MagicMock(**{'history.return_value': bars})):
+            assert scanner.get_intraday_vol('AAA') == pytest.approx(expected)
+        with patch('yfinance.Ticker', return_value=MagicMock(**{'history.return_value': bars.head(10)})):
+            assert scanner.get_intraday_vol('AAA') is None
+
+    def test_scan_stocks_keeps_input_order(self, make_hist, make_panel):
+        """Rows should come back in the order the tickers were given"""
+        panel = make_panel({t: make_hist(seed=i) for i, t in enumerate(['CCC', 'AAA', 'BBB'])})
+        with patch('yfinance.download', return_value=panel), \
+                patch('yfinance.Ticker', return_value=MagicMock(info=INFO)):
+            df = VolatileStockScanner(use_cache=False).scan_stocks(['BBB', 'CCC', 'AAA'])
+        assert df['ticker'].tolist() == ['BBB', 'CCC', 'AAA']
+
+
+class TestStrategyScores:
+    """Tests for the find_* strategy scores"""
+
+    @pytest.fixture
+    def scan(self):
+        """Two rows passing every strategy filter, one with short-window volatility missing"""
+        return pd.DataFrame({
+            'ticker': ['AAA', 'BBB'],
+            'price': [5.0, 8.0],
+            'day_change_%': [-10.0, 6.0],
+            'week_change_%': [20.0, 12.0],
+            'vol_ratio': [2.0, 3.0],
+            'atr_%': [5.0, 6.0],
+            'vol_regime': ['Accelerating', 'Accelerating'],
+            'weekly_vol_%': [np.nan, 90.0],
+            'monthly_vol_%': [np.nan, 80.0],
+            'annual_vol_%': [100.0, 75.0],
+            'avg_volume': [2_000_000, 3_000_000],
+            'market_cap_$M': [500.0, 900.0]
+        })
+
+    def test_breakout_score(self, scan):
+        """|day change| * 0.3 + volume ratio * 6 + ATR% * 4, highest first"""
+        result = AdvancedVolatilityScanner(use_cache=False).find_breakout_candidates(scan)
+        assert result['ticker'].tolist() == ['BBB', 'AAA']
+        assert result['breakout_score'].tolist() == pytest.approx([6 * 0.3 + 18 + 24, 10 * 0.3 + 12 + 20])
+
+    def test_momentum_score_falls_back_to_annual_vol(self, scan):
+        """A missing weekly volatility should be replaced by the annual one"""
+        result = AdvancedVolatilityScanner(use_cache=False).find_momentum_plays(scan)
+        scores = dict(zip(result['ticker'], result['momentum_score']))
+        assert scores['AAA'] == pytest.approx(20 * 0.4 + 100 * 0.3 + 2 * 9)
+        assert scores['BBB'] == pytest.approx(12 * 0.4 + 90 * 0.3 + 3 * 9)
+
+    def test_aggression_score_falls_back_to_annual_vol(self, scan):
+        """A missing monthly volatility should be replaced by the annual one"""
+        result = AdvancedVolatilityScanner(use_cache=False).find_high_risk_high_reward(scan)
+        scores = dict(zip(result['ticker'], result['aggression_score']))
+        assert scores['AAA'] == pytest.approx(100 * 0.35 + 100 * 0.35 + 5 * 1.5)
+        assert scores['BBB'] == pytest.approx(75 * 0.35 + 80 * 0.35 + 6 * 1.5)
+
+
+class TestSaveResults:
+    """Tests for the scan result writer"""
+
+    def test_csv_fallback_without_pyarrow(self, tmp_path):
+        """Without pyarrow results should still be saved, as CSV"""
+        df = pd.DataFrame({'ticker': ['AAA'], 'price': [5.0]})
+        with patch.object(_scan_data, 'PYARROW_AVAILABLE', False):
+            saved = _scan_data.save_results(df, str(tmp_path / 'scan'))
+        assert saved == 'scan.csv'
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'scan.csv'), df)
+
+    def test_parquet_with_optional_csv(self, tmp_path):
+        """With pyarrow the primary file is Parquet; export_csv adds a CSV copy"""
+        df = pd.DataFrame({'ticker': ['AAA'], 'price': [5.0]})
+        with patch.object(_scan_data, 'PYARROW_AVAILABLE', True), \
+                patch.object(pd.DataFrame, 'to_parquet') as to_parquet:
+            assert _scan_data.save_results(df, str(tmp_path / 'scan')) == 'scan.parquet'
+            assert not (tmp_path / 'scan.csv').exists()
+            _scan_data.save_results(df, str(tmp_path / 'scan'), export_csv=True)
+        assert to_parquet.call_args.args[0] == str(tmp_path / 'scan.parquet')
+        assert to_parquet.call_args.kwargs['compression'] == 'snappy'
+        assert (tmp_path / 'scan.csv').exists()
+
+    @pytest.mark.parametrize('module', [volatile_scanner_advanced, volatile_stock_scanner])
+    def test_scanners_share_one_writer(self, module):
+        """Both scanners should save through the shared helper, not a copy of it"""
+        assert module.save_results is _scan_data.save_results
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,417 @@
+"""
+Unit tests for the real-time watchlist monitor
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import time
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.watchlist_monitor import WatchlistMonitor, _format_rows
+from scripts import watchlist_monitor
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep the on-disk bar cache of each test in its own directory, and stay off the Alpaca stream"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('ALPACA_API_KEY', raising=False)
+    monkeypatch.delenv('ALPACA_SECRET_KEY', raising=False)
+    monkeypatch.delenv('ALPACA_DATA_FEED', raising=False)
+
+
+class TestSnapshot:
+    """Tests for the per-ticker snapshot metrics"""
+
+    def test_snapshot_metrics(self, make_minutes):
+        """Snapshot fields should follow the minute bars"""
+        today = make_minutes()
+        snap = WatchlistMonitor(['AAA'])._snapshot_from_frame('AAA', today)
+        close = today['Close']
+        assert snap['price'] == round(close.iloc[-1], 2)
+        assert snap['day_change_%'] == round((close.iloc[-1] - today['Open'].iloc[0]) / today['Open'].iloc[0] * 100, 2)
+        assert snap['last_5min_%'] == round((close.iloc[-1] - close.iloc[-6]) / close.iloc[-6] * 100, 2)
+        assert snap['volatility'] == round(np.log(close).diff().std() * 100, 2)
+        assert snap['volume'] == int(today['Volume'].sum())
+
+    def test_short_session(self, make_minutes):
+        """Fewer than 6 bars should measure the 5-minute trend from the first close"""
+        today = make_minutes(5)
+        snap = WatchlistMonitor(['AAA'])._snapshot_from_frame('AAA', today)
+        close = today['Close']
+        assert snap['last_5min_%'] == round((close.iloc[-1] - close.iloc[0]) / close.iloc[0] * 100, 2)
+
+    def test_empty_frame(self, make_minutes):
+        """No bars means no snapshot"""
+        assert WatchlistMonitor(['AAA'])._snapshot_from_frame('AAA', make_minutes().head(0)) is None
+
+    def test_get_snapshot_matches_batched_path(self, make_minutes):
+        """The single-ticker path should give the same row as the batched one"""
+        today = make_minutes(seed=3)
+        monitor = WatchlistMonitor(['AAA'])
+        with patch('yfinance.Ticker', return_value=MagicMock(**{'history.return_value': today})):
+            snap = monitor.get_snapshot('AAA')
+        expected = monitor._snapshot_from_frame('AAA', today)
+        snap.pop('timestamp'), expected.pop('timestamp')
+        assert snap == expected
+
+
+class TestTickerReuse:
+    """Tests for keeping one yf.Ticker per symbol"""
+
+    def test_ticker_built_once(self, make_minutes):
+        """Refreshes in later minutes should reuse the first Ticker object"""
+        monitor = WatchlistMonitor(['AAA'])
+        with patch('yfinance.Ticker', return_value=MagicMock(**{'history.return_value': make_minutes()})) as ticker, \
+                patch('scripts.watchlist_monitor.time.time', side_effect=[600.0, 660.0, 720.0]):
+            for _ in range(3):
+                assert monitor.get_snapshot('AAA')['ticker'] == 'AAA'
+        ticker.assert_called_once_with('AAA')
+
+
+class TestSnapshotCache:
+    """Tests for reusing snapshots within the same minute"""
+
+    def test_get_snapshot_reused_within_minute(self, make_minutes):
+        """A second call in the same minute is served from memory; the next minute refetches"""
+        stock = MagicMock(**{'history.return_value': make_minutes()})
+        monitor = WatchlistMonitor(['AAA'])
+        with patch('yfinance.Ticker', return_value=stock), \
+                patch('scripts.watchlist_monitor.time.time', return_value=600.0) as clock:
+            first = monitor.get_snapshot('AAA')
+            first['price'] = -1
+            assert monitor.get_snapshot('AAA')['price'] != -1
+            assert stock.history.call_count == 1
+            clock.return_value = 660.0
+            monitor.get_snapshot('AAA')
+        assert stock.history.call_count == 2
+
+    def test_failures_not_cached(self, make_minutes):
+        """A failed lookup should be retried on the next call"""
+        monitor = WatchlistMonitor(['AAA'])
+        with patch('yfinance.Ticker', side_effect=RuntimeError('429')):
+            assert monitor.get_snapshot('AAA') is None
+        with patch('yfinance.Ticker', return_value=MagicMock(**{'history.return_value': make_minutes()})):
+            assert monitor.get_snapshot('AAA')['ticker'] == 'AAA'
+
+    def test_monitor_once_downloads_only_stale_tickers(self, make_minutes, make_panel):
+        """Tickers snapshotted this minute should be left out of the batched download"""
+        monitor = WatchlistMonitor(['AAA', 'BBB'])
+        with patch('scripts.watchlist_monitor.time.time', return_value=600.0):
+            with patch('yfinance.Ticker', return_value=MagicMock(**{'history.return_value': make_minutes()})):
+                monitor.get_snapshot('AAA')
+            with patch('yfinance.download', return_value=make_panel({'BBB': make_minutes(seed=2)})) as download:
+                rows = monitor.monitor_once()
+        assert download.call_args.args[0] == ['BBB']
+        assert [r['ticker'] for r in rows] == ['AAA', 'BBB']
+
+
+class TestMonitorOnce:
+    """Tests for one refresh of the whole watchlist"""
+
+    def test_one_download_for_the_watchlist(self, make_minutes, make_panel):
+        """monitor_once should make a single batched download covering every ticker"""
+        panel = make_panel({'AAA': make_minutes(seed=1), 'BBB': make_minutes(seed=2)})
+        monitor = WatchlistMonitor(['aaa', 'bbb'])
+        with patch('yfinance.download', return_value=panel) as download, \
+                patch('yfinance.Ticker') as ticker:
+            rows = monitor.monitor_once()
+        download.assert_called_once()
+        assert download.call_args.args[0] == ['AAA', 'BBB']
+        assert download.call_args.kwargs['interval'] == '1m'
+        ticker.assert_not_called()
+        assert [r['ticker'] for r in rows] == ['AAA', 'BBB']
+
+    def test_missing_tickers_fetched_individually(self, make_minutes, make_panel):
+        """Tickers the batch missed are looked up one by one; ones without bars are skipped"""
+        panel = make_panel({'AAA': make_minutes(seed=1)})
+        bars = {'BBB': make_minutes(seed=2), 'CCC': make_minutes().head(0)}
+        monitor = WatchlistMonitor(['AAA', 'BBB', 'CCC'])
+        with patch('yfinance.download', return_value=panel), \
+                patch('yfinance.Ticker', side_effect=lambda t: MagicMock(**{'history.return_value': bars[t]})) as ticker:
+            rows = monitor.monitor_once()
+        assert sorted(call.args[0] for call in ticker.call_args_list) == ['BBB', 'CCC']
+        assert [r['ticker'] for r in rows] == ['AAA', 'BBB']
+
+    def test_download_failure(self):
+        """A failed download falls back to single lookups, and total failure gives no rows"""
+        monitor = WatchlistMonitor(['AAA'])
+        with patch('yfinance.download', side_effect=RuntimeError('429')), \
+                patch('yfinance.Ticker', side_effect=RuntimeError('429')):
+            assert monitor.monitor_once() == []
+
+
+
+class TestIncrementalBars:
+    """Tests for extending held minute bars instead of refetching the day"""
+
+    def test_refresh_downloads_from_last_bar(self, make_minutes, make_panel):
+        """A held ticker is refreshed from its last bar, which the new download replaces"""
+        day = make_minutes(120)
+        monitor = WatchlistMonitor(['AAA'])
+        with patch('yfinance.download', return_value=make_panel({'AAA': day.iloc[:100]})) as download:
+            monitor.download_today()
+        assert download.call_args.kwargs['period'] == '1d'
+        
+        with patch('yfinance.download', return_value=make_panel({'AAA': day.iloc[99:]})) as download:
+            bars = monitor.download_today()['AAA']
+        assert download.call_args.kwargs['start'] == day.index[99]
+        assert 'period' not in download.call_args.kwargs
+        pd.testing.assert_frame_equal(bars, day, check_freq=False)
+
+    def test_new_session_drops_old_bars(self, make_minutes, make_panel):
+        """Bars from an earlier session should not leak into today's frame"""
+        yesterday = make_minutes(30)
+        today = make_minutes(10, seed=1)
+        today.index = today.index + pd.Timedelta(days=1)
+        monitor = WatchlistMonitor(['AAA'])
+        with patch('yfinance.download', return_value=make_panel({'AAA': yesterday})):
+            monitor.download_today()
+        with patch('yfinance.download', return_value=make_panel({'AAA': today})):
+            bars = monitor.download_today()['AAA']
+        pd.testing.assert_frame_equal(bars, today, check_freq=False)
+
+    def test_saved_bars_seed_next_run(self, make_minutes, make_panel):
+        """Bars saved at the end of a run let the next monitor download incrementally"""
+        day = make_minutes(60)
+        first = WatchlistMonitor(['AAA'])
+        with patch('yfinance.download', return_value=make_panel({'AAA': day})):
+            first.download_today()
+        first.save_bars()
+        
+        with patch('yfinance.download', return_value=make_panel({'AAA': day.iloc[-1:]})) as download:
+            bars = WatchlistMonitor(['AAA']).download_today()['AAA']
+        assert download.call_args.kwargs['start'] == day.index[-1]
+        assert len(bars) == 60
+
+    def test_use_cache_false_skips_disk(self, make_minutes, make_panel):
+        """use_cache=False should neither read nor write the bar cache"""
+        monitor = WatchlistMonitor(['AAA'], use_cache=False)
+        with patch('yfinance.download', return_value=make_panel({'AAA': make_minutes()})):
+            monitor.download_today()
+        monitor.save_bars()
+        assert not os.path.exists('.cache')
+
+
+class FakeStream:
+    """Stand-in for StockDataStream whose run() blocks until stop()"""
+
+    def __init__(self, connects=True, dies=False):
+        self._running = False
+        self._connects = connects
+        self._dies = dies
+        self._stopped = threading.Event()
+        self.subscribe_bars = MagicMock()
+        self.stop_calls = 0
+
+    def run(self):
+        if self._dies:
+            return
+        self._running = self._connects
+        self._stopped.wait(5)
+
+    def stop(self):
+        self.stop_calls += 1
+        self._stopped.set()
+
+
+def make_bar(symbol, timestamp, close, volume=5000):
+    """A pushed Alpaca minute bar"""
+    return SimpleNamespace(symbol=symbol, timestamp=timestamp.tz_convert('UTC').to_pydatetime(),
+                           open=close, high=close, low=close, close=close, volume=volume)
+
+
+class TestAlpacaStream:
+    """Tests for the Alpaca minute-bar stream"""
+
+    @pytest.fixture
+    def credentials(self, monkeypatch):
+        """Alpaca keys in the environment"""
+        monkeypatch.setenv('ALPACA_API_KEY', 'key')
+        monkeypatch.setenv('ALPACA_SECRET_KEY', 'secret')
+
+    def start(self, monitor, stream, panel):
+        """start_stream against a fake websocket, seeding the session from panel"""
+        with patch.object(watchlist_monitor, 'ALPACA_PY_AVAILABLE', True), \
+                patch.object(watchlist_monitor, 'StockDataStream', create=True, return_value=stream), \
+                patch.object(watchlist_monitor, 'DataFeed', create=True) as feed, \
+                patch.object(watchlist_monitor, 'STREAM_CONNECT_TIMEOUT', 0.5), \
+                patch('yfinance.download', return_value=panel) as download:
+            started = monitor.start_stream()
+        return started, feed, download
+
+    def test_polls_without_credentials(self):
+        """Without Alpaca keys the monitor should stay on yfinance polling"""
+        monitor = WatchlistMonitor(['AAA'])
+        with patch.object(watchlist_monitor, 'ALPACA_PY_AVAILABLE', True):
+            assert monitor.start_stream() is False
+        assert monitor._stream is None
+
+    def test_feed_default_shared_with_scanners(self, monkeypatch):
+        """The stream feed should come from ALPACA_DATA_FEED, iex when unset"""
+        monkeypatch.delenv('ALPACA_DATA_FEED', raising=False)
+        assert WatchlistMonitor(['AAA'])._stream_feed == 'iex'
+        monkeypatch.setenv('ALPACA_DATA_FEED', 'SIP')
+        assert WatchlistMonitor(['AAA'])._stream_feed == 'sip'
+
+    def test_stream_seeds_and_subscribes(self, credentials, monkeypatch, make_minutes, make_panel):
+        """start_stream downloads the session once, subscribes the watchlist and waits for the connection"""
+        monkeypatch.setenv('ALPACA_DATA_FEED', 'sip')
+        stream = FakeStream()
+        monitor = WatchlistMonitor(['AAA', 'BBB'], use_cache=False)
+        started, feed, download = self.start(monitor, stream, make_panel({'AAA': make_minutes()}))
+        assert started is True
+        download.assert_called_once()
+        feed.assert_called_once_with('sip')
+        assert stream.subscribe_bars.call_args.args[1:] == ('AAA', 'BBB')
+        with patch('yfinance.download') as download:
+            monitor.monitor_once()
+        assert download.call_args.args[0] == ['BBB']
+        monitor.stop_stream()
+        assert stream.stop_calls == 1
+
+    def test_unconnected_stream_falls_back(self, credentials, make_minutes, make_panel):
+        """A websocket that never authenticates should be closed and leave the monitor polling"""
+        stream = FakeStream(connects=False)
+        monitor = WatchlistMonitor(['AAA'], use_cache=False)
+        started, _, _ = self.start(monitor, stream, make_panel({'AAA': make_minutes()}))
+        assert started is False
+        assert monitor._stream is None
+        assert stream.stop_calls == 1
+
+    def test_dead_stream_thread_falls_back(self, credentials, make_minutes, make_panel):
+        """A stream thread that exits before connecting should not count as streaming"""
+        monitor = WatchlistMonitor(['AAA'], use_cache=False)
+        started, _, _ = self.start(monitor, FakeStream(dies=True), make_panel({'AAA': make_minutes()}))
+        assert started is False
+        assert monitor._stream is None
+
+    def test_stream_ending_resumes_polling(self, credentials, make_minutes, make_panel):
+        """Once the stream thread ends, monitor_once should close it and poll yfinance"""
+        stream = FakeStream()
+        monitor = WatchlistMonitor(['AAA'], use_cache=False)
+        assert self.start(monitor, stream, make_panel({'AAA': make_minutes()}))[0] is True
+        stream.stop()
+        monitor._stream_thread.join(1)
+        with patch('yfinance.download', return_value=make_panel({'AAA': make_minutes()})):
+            rows = monitor.monitor_once()
+        assert monitor._stream is None
+        assert rows[0]['ticker'] == 'AAA'
+
+    def test_sip_bars_extend_session(self, monkeypatch, make_minutes, make_panel):
+        """Pushed SIP bars append to the held frame and feed the next snapshot without downloads"""
+        monkeypatch.setenv('ALPACA_DATA_FEED', 'sip')
+        day = make_minutes(30)
+        monitor = WatchlistMonitor(['AAA'], use_cache=False)
+        with patch('yfinance.download', return_value=make_panel({'AAA': day})):
+            monitor.download_today()
+        monitor._stream = MagicMock()
+        
+        monitor._update_from_bar(make_bar('AAA', day.index[-1] + pd.Timedelta(minutes=1), 11.4))
+        with patch('yfinance.download') as download:
+            rows = monitor.monitor_once()
+        download.assert_not_called()
+        assert len(monitor._bars['AAA']) == 31
+        assert monitor._bars['AAA'].index[-1] == day.index[-1] + pd.Timedelta(minutes=1)
+        assert rows[0]['price'] == 11.4
+
+    def test_stale_ticker_refreshed_from_yfinance(self, monkeypatch, make_minutes, make_panel):
+        """A ticker without a streamed bar for STREAM_STALE_SECONDS should be downloaded again"""
+        monkeypatch.setenv('ALPACA_DATA_FEED', 'sip')
+        day = make_minutes(30)
+        monitor = WatchlistMonitor(['AAA'], use_cache=False)
+        with patch('yfinance.download', return_value=make_panel({'AAA': day})):
+            monitor.download_today()
+        monitor._stream = MagicMock()
+        monitor._last_bar_at['AAA'] = time.monotonic() - watchlist_monitor.STREAM_STALE_SECONDS - 1
+        
+        with patch('yfinance.download', return_value=make_panel({'AAA': make_minutes(31)})) as download:
+            monitor.monitor_once()
+        download.assert_called_once()
+        assert len(monitor._bars['AAA']) == 31
+
+    def test_iex_bars_only_move_price(self, make_minutes, make_panel):
+        """IEX bars should set the price but leave the consolidated bars and volume alone"""
+        day = make_minutes(30)
+        monitor = WatchlistMonitor(['AAA'], use_cache=False)
+        now = time.time()
+        with patch('scripts.watchlist_monitor.time.time', return_value=now):
+            with patch('yfinance.download', return_value=make_panel({'AAA': day})):
+                polled = monitor.monitor_once()[0]
+            monitor._stream = MagicMock()
+            
+            monitor._update_from_bar(make_bar('AAA', day.index[-1] + pd.Timedelta(minutes=1), 11.4, volume=10 ** 9))
+            with patch('yfinance.download') as download:
+                row = monitor.monitor_once()[0]
+        download.assert_not_called()
+        assert len(monitor._bars['AAA']) == 30
+        assert row['price'] == 11.4
+        assert row['volume'] == polled['volume']
+        assert row['day_change_%'] == round((11.4 - day['Open'].iloc[0]) / day['Open'].iloc[0] * 100, 2)
+
+
+class TestMonitorContinuous:
+    """Tests for the refresh loop's table output"""
+
+    def test_table_sorted_by_biggest_move(self, capsys):
+        """Rows print biggest absolute move first, with the top gainer and loser after"""
+        rows = [
+            {'ticker': 'AAA', 'price': 10.0, 'day_change_%': 2.5, 'last_5min_%': 0.1,
+             'day_range_%': 3.0, 'volume': 1000, 'volatility': 0.2},
+            {'ticker': 'BBB', 'price': 20.0, 'day_change_%': -7.0, 'last_5min_%': -0.4,
+             'day_range_%': 8.0, 'volume': 2000, 'volatility': 0.5}
+        ]
+        monitor = WatchlistMonitor(['AAA', 'BBB'])
+        with patch.object(WatchlistMonitor, 'monitor_once', return_value=rows), \
+                patch('scripts.watchlist_monitor.time.sleep', side_effect=KeyboardInterrupt):
+            monitor.monitor_continuous(refresh_seconds=1, duration_minutes=1)
+        out = capsys.readouterr().out
+        assert out.index('BBB ') < out.index('AAA ')
+        assert 'Biggest Gainer: AAA (+2.50%)' in out
+        assert 'Biggest Loser: BBB (-7.00%)' in out
+
+
+    def test_refresh_schedule_does_not_drift(self):
+        """Fetch time comes out of the wait; an overrun skips ahead instead of queueing ticks"""
+        clock = [0.0]
+        work = iter([5.0, 75.0, 5.0])
+        
+        def monitor_once():
+            clock[0] += next(work)
+            return []
+        
+        sleeps = []
+        
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+        
+        monitor = WatchlistMonitor(['AAA'])
+        with patch.object(monitor, 'monitor_once', side_effect=monitor_once), \
+                patch('scripts.watchlist_monitor.time.monotonic', side_effect=lambda: clock[0]), \
+                patch('scripts.watchlist_monitor.time.sleep', side_effect=sleep):
+            monitor.monitor_continuous(refresh_seconds=60, duration_minutes=2.5)
+        assert sleeps == [55.0, 55.0]
+        assert clock[0] == 195.0
+
+    def test_format_rows(self):
+        """The table should line the header up with signed, comma-grouped values"""
+        row = {'ticker': 'AAA', 'price': 10.5, 'day_change_%': 2.5, 'last_5min_%': -0.1,
+               'day_range_%': 3.0, 'volume': 1234567, 'volatility': 0.2, 'high': 11.0}
+        header, line = _format_rows([row]).split('\n')
+        assert header.split() == ['ticker', 'price', 'day_change_%', 'last_5min_%',
+                                  'day_range_%', 'volume', 'volatility']
+        assert line.split() == ['AAA', '10.50', '+2.50', '-0.10', '3.00', '1,234,567', '0.20']
+        assert len(header) == len(line)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])